@@ -1,135 +1,250 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+"""
+Historical sales analysis (ventas_historicas_3anos.csv)
+compute_metrics() gets every metric of the report from one factorized pass:
+order_id, item_name, item_type and order_date are turned into integer codes
+once and each per-group total is an np.bincount over those codes. The menu
+(unique item/type/price rows) is tiny, so its stats come from that table.
+
+compute_metrics_multipass() is the original groupby/drop_duplicates/resample
+version, kept as the reference for verify_pipeline.py.
+
+Usage:
+    python analyze_restaurant_data.py
+"""
+
 import os
+import numpy as np
+import pandas as pd
 
-# Create output directory
-os.makedirs('output', exist_ok=True)
+DATA_PATH = 'ventas_historicas_3anos.csv'
+OUTPUT_DIR = 'output'
+LARGE_ORDER_QTY = 12
 
-# Load Data
-try:
-    df = pd.read_csv('ventas_historicas_3anos.csv')
+
+class SalesMetrics:
+    """Everything the report prints, charts and exports (attributes set by compute_metrics)"""
+
+    def summary(self):
+        return pd.DataFrame({
+            'Metric': ['Total Unique Items', 'Total Orders', 'Total Items Sold', 'Max Order Quantity', 'Total Revenue'],
+            'Value': [self.num_unique_items, self.total_orders, self.total_items_sold,
+                      self.largest_order_qty, self.total_revenue]
+        })
+
+
+def load_sales(path=DATA_PATH):
+    df = pd.read_csv(path)
     df['order_date'] = pd.to_datetime(df['order_date'])
     # Calculate Total Price for each row (assuming item_price is per unit)
     df['total_line_price'] = df['item_price'] * df['quantity']
-except Exception as e:
-    print(f"Error loading data: {e}")
-    exit()
-
-print("--- ANALYSIS START ---")
-
-# --- Objective 1: Menu Items Analysis ---
-print("\n### Objective 1: Menu Items Analysis")
-unique_items = df['item_name'].unique()
-num_unique_items = len(unique_items)
-print(f"1. Total Unique Menu Items: {num_unique_items}")
-
-# Most and Least Expensive Items (unit price)
-# Drop duplicates to get unique menu items list with their prices
-menu_df = df[['item_name', 'item_type', 'item_price']].drop_duplicates()
-max_price_item = menu_df.loc[menu_df['item_price'].idxmax()]
-min_price_item = menu_df.loc[menu_df['item_price'].idxmin()]
-print(f"2. Most Expensive: {max_price_item['item_name']} (${max_price_item['item_price']})")
-print(f"   Least Expensive: {min_price_item['item_name']} (${min_price_item['item_price']})")
-
-# Items per category
-items_per_category = menu_df['item_type'].value_counts()
-print("\n3. Items per Category:")
-print(items_per_category.to_string())
-
-# Avg price per category
-avg_price_category = menu_df.groupby('item_type')['item_price'].mean().sort_values(ascending=False)
-print("\n4. Average Price per Category:")
-print(avg_price_category.to_string())
-
-# Italian-style (Pizzas)
-pizzas = menu_df[menu_df['item_type'] == 'Pizzas']
-pizza_min = pizzas['item_price'].min()
-pizza_max = pizzas['item_price'].max()
-print(f"\n5. Italian-style (Pizzas) Price Range: ${pizza_min} - ${pizza_max}")
-
-
-# --- Objective 2: Order Details Analysis ---
-print("\n### Objective 2: Order Details Analysis")
-date_min = df['order_date'].min().date()
-date_max = df['order_date'].max().date()
-print(f"1. Date Range: {date_min} to {date_max}")
-
-total_orders = df['order_id'].nunique()
-total_items_sold = df['quantity'].sum()
-print(f"2. Total Unique Orders: {total_orders}")
-print(f"   Total Items Sold: {total_items_sold}")
-
-# Largest order by quantity
-order_sizes = df.groupby('order_id')['quantity'].sum()
-largest_order_id = order_sizes.idxmax()
-largest_order_qty = order_sizes.max()
-print(f"3. Largest Order (Quantity): {largest_order_id} with {largest_order_qty} items")
-
-# Orders with > 12 items
-orders_gt_12 = order_sizes[order_sizes > 12]
-print(f"4. Count of Orders with >12 items: {len(orders_gt_12)}")
-if len(orders_gt_12) > 0:
-    print(f"   Sample IDs: {orders_gt_12.head(3).index.tolist()}...")
-
-
-# --- Objective 3: Customer Behavior Analysis ---
-print("\n### Objective 3: Customer Behavior Analysis")
-
-# Top 5 Most and Least ordered items (by quantity)
-item_popularity = df.groupby('item_name')['quantity'].sum().sort_values(ascending=False)
-print("\n1. Top 5 MOST Ordered Items:")
-print(item_popularity.head(5).to_string())
-print("\n   Top 5 LEAST Ordered Items:")
-print(item_popularity.tail(5).to_string())
-
-# Revenue breakdown by category
-revenue_by_cat = df.groupby('item_type')['total_line_price'].sum().sort_values(ascending=False)
-print("\n2. Revenue Breakdown by Category:")
-print(revenue_by_cat.to_string())
-
-# Top 5 highest-spending orders
-order_revenue = df.groupby('order_id')['total_line_price'].sum().sort_values(ascending=False)
-top_5_orders = order_revenue.head(5)
-print("\n3. Top 5 Highest-Spending Orders:")
-print(top_5_orders.to_string())
-
-# Details of #1 Highest Spending Order
-top_order_id = top_5_orders.index[0]
-top_order_details = df[df['order_id'] == top_order_id]
-print(f"\n   Details of #1 Highest Spender ({top_order_id}):")
-print(top_order_details[['item_name', 'item_type', 'quantity', 'item_price', 'total_line_price']].to_string())
-
-
-# --- Charts ---
-# 1. Monthly Sales Trend
-monthly_sales = df.set_index('order_date').resample('M')['total_line_price'].sum()
-plt.figure(figsize=(10, 6))
-monthly_sales.plot(kind='line', marker='o', color='green')
-plt.title('Monthly Sales Trend (2023-2025)')
-plt.ylabel('Revenue ($)')
-plt.grid(True)
-plt.tight_layout()
-plt.savefig('output/monthly_sales_trend.png')
-print("\n[Chart Generated] output/monthly_sales_trend.png")
-
-# 2. Top 10 Items Bar Chart
-top_10_items = item_popularity.head(10)
-plt.figure(figsize=(10, 6))
-sns.barplot(x=top_10_items.values, y=top_10_items.index, palette='viridis')
-plt.title('Top 10 Menu Items by Quantity Sold')
-plt.xlabel('Quantity Sold')
-plt.tight_layout()
-plt.savefig('output/top_10_items.png')
-print("[Chart Generated] output/top_10_items.png")
-
-# --- Export Summary CSV ---
-# Creating a simple summary dataframe for export
-summary_data = {
-    'Metric': ['Total Unique Items', 'Total Orders', 'Total Items Sold', 'Max Order Quantity', 'Total Revenue'],
-    'Value': [num_unique_items, total_orders, total_items_sold, largest_order_qty, df['total_line_price'].sum()]
-}
-pd.DataFrame(summary_data).to_csv('output/analysis_summary.csv', index=False)
-print("[CSV Exported] output/analysis_summary.csv")
-
-print("--- ANALYSIS COMPLETE ---")
+    return df
+
+
+def _key_order(uniques):
+    """Positions of the factorized keys in sorted order (fixed-width strings sort much faster than objects)"""
+    keys = np.asarray(uniques)
+    return np.argsort(keys.astype(str) if keys.dtype == object else keys)
+
+
+def _grouped(uniques, values, order=None):
+    """Series like groupby(key)[col].sum(): keys sorted"""
+    order = _key_order(uniques) if order is None else order
+    return pd.Series(values[order], index=pd.Index(np.asarray(uniques)[order]))
+
+
+def _menu_metrics(m, menu_df):
+    m.menu = menu_df
+    m.max_price_item = menu_df.loc[menu_df['item_price'].idxmax()]
+    m.min_price_item = menu_df.loc[menu_df['item_price'].idxmin()]
+    m.items_per_category = menu_df['item_type'].value_counts()
+    m.avg_price_category = menu_df.groupby('item_type')['item_price'].mean().sort_values(ascending=False)
+    pizzas = menu_df[menu_df['item_type'] == 'Pizzas']
+    m.pizza_min = pizzas['item_price'].min()
+    m.pizza_max = pizzas['item_price'].max()
+
+
+def compute_metrics(df):
+    """
+    Single factorized pass. df: raw historical sales (order_date may be
+    strings or datetimes; total_line_price is computed if missing).
+    Returns SalesMetrics
+    """
+    m = SalesMetrics()
+    qty = df['quantity'].values
+    price = df['item_price'].values
+    line = df['total_line_price'].values if 'total_line_price' in df.columns else price * qty
+
+    order_codes, order_ids = pd.factorize(df['order_id'])
+    item_codes, items = pd.factorize(df['item_name'])
+    type_codes, types = pd.factorize(df['item_type'])
+    date_codes, dates = pd.factorize(df['order_date'])
+    dates = pd.DatetimeIndex(pd.to_datetime(dates))  # Parse the few unique dates only
+
+    # Menu: first occurrence of each (item, type, price) in row order = drop_duplicates
+    price_codes, prices = pd.factorize(price)
+    triple = (item_codes.astype(np.int64) * len(types) + type_codes) * len(prices) + price_codes
+    _, first_rows = np.unique(triple, return_index=True)
+    first_rows = np.sort(first_rows)
+    menu_df = pd.DataFrame({
+        'item_name': items[item_codes[first_rows]],
+        'item_type': types[type_codes[first_rows]],
+        'item_price': price[first_rows],
+    }, index=first_rows)
+    _menu_metrics(m, menu_df)
+    m.num_unique_items = len(items)
+
+    # Orders
+    m.date_min = dates.min().date()
+    m.date_max = dates.max().date()
+    m.total_orders = len(order_ids)
+    m.total_items_sold = qty.sum()
+    m.total_revenue = line.sum()
+    order_rank = _key_order(order_ids)  # Shared by every per-order series
+    m.order_sizes = _grouped(order_ids, np.bincount(order_codes, weights=qty, minlength=len(order_ids)).astype(qty.dtype), order_rank)
+    m.order_sizes.index.name = 'order_id'
+    m.largest_order_id = m.order_sizes.idxmax()
+    m.largest_order_qty = m.order_sizes.max()
+    m.orders_gt_12 = m.order_sizes[m.order_sizes > LARGE_ORDER_QTY]
+
+    # Customer behavior
+    m.item_popularity = _grouped(items, np.bincount(item_codes, weights=qty, minlength=len(items)).astype(qty.dtype)) \
+        .rename_axis('item_name').sort_values(ascending=False).rename('quantity')
+    m.revenue_by_cat = _grouped(types, np.bincount(type_codes, weights=line, minlength=len(types)).astype(line.dtype)) \
+        .rename_axis('item_type').sort_values(ascending=False).rename('total_line_price')
+    m.order_revenue = _grouped(order_ids, np.bincount(order_codes, weights=line, minlength=len(order_ids)).astype(line.dtype), order_rank) \
+        .rename_axis('order_id').sort_values(ascending=False).rename('total_line_price')
+    m.order_sizes = m.order_sizes.rename('quantity')
+    m.orders_gt_12 = m.orders_gt_12.rename('quantity')
+    m.top_order_id = m.order_revenue.index[0]
+    top_code = order_ids.get_loc(m.top_order_id)
+    m.top_order_details = df[order_codes == top_code].assign(total_line_price=line[order_codes == top_code])
+
+    # Monthly trend: month index of each unique date, then of each row
+    month_of_date = (dates.year.values - dates.year.min()) * 12 + dates.month.values - 1
+    first_month = month_of_date.min()
+    n_months = month_of_date.max() - first_month + 1
+    monthly = np.bincount(month_of_date[date_codes] - first_month, weights=line, minlength=n_months).astype(line.dtype)
+    start = pd.Timestamp(year=dates.year.min(), month=1, day=1) + pd.DateOffset(months=int(first_month))
+    m.monthly_sales = pd.Series(monthly, index=pd.date_range(start, periods=n_months, freq='ME', name='order_date'),
+                                name='total_line_price')
+    return m
+
+
+def compute_metrics_multipass(df):
+    """Original pandas version (one groupby/drop_duplicates/resample per metric)"""
+    m = SalesMetrics()
+    df = df.copy()
+    df['order_date'] = pd.to_datetime(df['order_date'])
+    if 'total_line_price' not in df.columns:
+        df['total_line_price'] = df['item_price'] * df['quantity']
+
+    unique_items = df['item_name'].unique()
+    m.num_unique_items = len(unique_items)
+    # Drop duplicates to get unique menu items list with their prices
+    _menu_metrics(m, df[['item_name', 'item_type', 'item_price']].drop_duplicates())
+
+    m.date_min = df['order_date'].min().date()
+    m.date_max = df['order_date'].max().date()
+    m.total_orders = df['order_id'].nunique()
+    m.total_items_sold = df['quantity'].sum()
+    m.total_revenue = df['total_line_price'].sum()
+    m.order_sizes = df.groupby('order_id')['quantity'].sum()
+    m.largest_order_id = m.order_sizes.idxmax()
+    m.largest_order_qty = m.order_sizes.max()
+    m.orders_gt_12 = m.order_sizes[m.order_sizes > LARGE_ORDER_QTY]
+
+    m.item_popularity = df.groupby('item_name')['quantity'].sum().sort_values(ascending=False)
+    m.revenue_by_cat = df.groupby('item_type')['total_line_price'].sum().sort_values(ascending=False)
+    m.order_revenue = df.groupby('order_id')['total_line_price'].sum().sort_values(ascending=False)
+    m.top_order_id = m.order_revenue.index[0]
+    m.top_order_details = df[df['order_id'] == m.top_order_id]
+    m.monthly_sales = df.set_index('order_date').resample('ME')['total_line_price'].sum()
+    return m
+
+
+# ==========================================
+# REPORT
+# ==========================================
+def print_report(m):
+    print("--- ANALYSIS START ---")
+
+    # --- Objective 1: Menu Items Analysis ---
+    print("\n### Objective 1: Menu Items Analysis")
+    print(f"1. Total Unique Menu Items: {m.num_unique_items}")
+    print(f"2. Most Expensive: {m.max_price_item['item_name']} (${m.max_price_item['item_price']})")
+    print(f"   Least Expensive: {m.min_price_item['item_name']} (${m.min_price_item['item_price']})")
+    print("\n3. Items per Category:")
+    print(m.items_per_category.to_string())
+    print("\n4. Average Price per Category:")
+    print(m.avg_price_category.to_string())
+    print(f"\n5. Italian-style (Pizzas) Price Range: ${m.pizza_min} - ${m.pizza_max}")
+
+    # --- Objective 2: Order Details Analysis ---
+    print("\n### Objective 2: Order Details Analysis")
+    print(f"1. Date Range: {m.date_min} to {m.date_max}")
+    print(f"2. Total Unique Orders: {m.total_orders}")
+    print(f"   Total Items Sold: {m.total_items_sold}")
+    print(f"3. Largest Order (Quantity): {m.largest_order_id} with {m.largest_order_qty} items")
+    print(f"4. Count of Orders with >{LARGE_ORDER_QTY} items: {len(m.orders_gt_12)}")
+    if len(m.orders_gt_12) > 0:
+        print(f"   Sample IDs: {m.orders_gt_12.head(3).index.tolist()}...")
+
+    # --- Objective 3: Customer Behavior Analysis ---
+    print("\n### Objective 3: Customer Behavior Analysis")
+    print("\n1. Top 5 MOST Ordered Items:")
+    print(m.item_popularity.head(5).to_string())
+    print("\n   Top 5 LEAST Ordered Items:")
+    print(m.item_popularity.tail(5).to_string())
+    print("\n2. Revenue Breakdown by Category:")
+    print(m.revenue_by_cat.to_string())
+    print("\n3. Top 5 Highest-Spending Orders:")
+    print(m.order_revenue.head(5).to_string())
+    print(f"\n   Details of #1 Highest Spender ({m.top_order_id}):")
+    print(m.top_order_details[['item_name', 'item_type', 'quantity', 'item_price', 'total_line_price']].to_string())
+
+
+def save_charts(m, output_dir=OUTPUT_DIR):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # 1. Monthly Sales Trend
+    plt.figure(figsize=(10, 6))
+    m.monthly_sales.plot(kind='line', marker='o', color='green')
+    plt.title('Monthly Sales Trend (2023-2025)')
+    plt.ylabel('Revenue ($)')
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, 'monthly_sales_trend.png'))
+    print("\n[Chart Generated] output/monthly_sales_trend.png")
+
+    # 2. Top 10 Items Bar Chart
+    top_10_items = m.item_popularity.head(10)
+    plt.figure(figsize=(10, 6))
+    sns.barplot(x=top_10_items.values, y=top_10_items.index, palette='viridis')
+    plt.title('Top 10 Menu Items by Quantity Sold')
+    plt.xlabel('Quantity Sold')
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, 'top_10_items.png'))
+    print("[Chart Generated] output/top_10_items.png")
+
+
+if __name__ == '__main__':
+    # Create output directory
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    # Load Data
+    try:
+        df = load_sales()
+    except Exception as e:
+        print(f"Error loading data: {e}")
+        exit()
+
+    metrics = compute_metrics(df)
+    print_report(metrics)
+    save_charts(metrics)
+
+    # --- Export Summary CSV ---
+    metrics.summary().to_csv(os.path.join(OUTPUT_DIR, 'analysis_summary.csv'), index=False)
+    print("[CSV Exported] output/analysis_summary.csv")
+
+    print("--- ANALYSIS COMPLETE ---")
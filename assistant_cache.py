@@ -0,0 +1,204 @@
+"""
+Persistent answer cache for the Asistente Virtual (Gemini)
+Stores answers keyed by normalized question text + data version, with TTL,
+size-bounded LRU eviction and optional near-duplicate matching.
+
+A near-duplicate is a question with the same content words as a cached one
+(it differs only in stopwords, accents, punctuation or word order). Any
+other differing word - a year, a month, a dish - may change the answer, so
+it is a miss.
+
+The file is written by put() (and clear()); get() only updates hit/miss
+stats and LRU times in memory, persisted with the next put().
+"""
+
+import json
+import os
+import re
+import time
+import hashlib
+import unicodedata
+
+CACHE_PATH = 'assistant_cache.json'
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600  # Owners repeat questions weekly
+DEFAULT_MAX_ENTRIES = 200
+
+# Words that carry no meaning for matching ("¿cuál es el plato...?", "dime por favor...")
+STOPWORDS = {
+    'el', 'la', 'los', 'las', 'un', 'una', 'unos', 'unas', 'de', 'del', 'al', 'a',
+    'en', 'y', 'o', 'que', 'cual', 'cuales', 'como', 'es', 'son', 'fue', 'por',
+    'para', 'con', 'mi', 'mis', 'me', 'se', 'lo', 'le', 'les', 'su', 'sus', 'mas',
+    'muy', 'hay', 'esta', 'este', 'eso', 'esto', 'nos', 'puedo', 'podemos', 'dime',
+    'favor', 'porfa', 'hola', 'oye', 'quiero', 'saber', 'puedes', 'podrias', 'dame'
+}
+
+
+# ==========================================
+# HELPER FUNCTIONS
+# ==========================================
+def normalize_question(text):
+    """Lowercase, strip accents/punctuation and collapse whitespace."""
+    text = unicodedata.normalize('NFKD', str(text).lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r'[^a-z0-9ñ ]+', ' ', text)
+    return ' '.join(text.split())
+
+
+def question_tokens(normalized):
+    """Content tokens used by the near-duplicate index."""
+    return {t for t in normalized.split() if t not in STOPWORDS}
+
+
+def compute_data_version(paths):
+    """
+    Fingerprint of the data files behind the dashboard (name, size, mtime).
+    Any regenerated CSV changes the version and invalidates old answers.
+    """
+    h = hashlib.sha1()
+    for path in sorted(paths):
+        try:
+            st = os.stat(path)
+            h.update(f"{path}:{st.st_size}:{int(st.st_mtime)}".encode('utf-8'))
+        except OSError:
+            h.update(f"{path}:missing".encode('utf-8'))
+    return h.hexdigest()[:12]
+
+
+# ==========================================
+# CACHE
+# ==========================================
+class AnswerCache:
+    """
+    JSON-backed answer cache.
+    Entries: key -> {question, tokens, version, answer, created, last_access, hits}
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries = {}
+        self.stats = {'hits': 0, 'misses': 0}
+        # Near-duplicate index: (version, sorted content tokens) -> set of entry keys
+        self._token_index = {}
+        self._load()
+
+    # --- persistence ---
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return  # Corrupt cache is simply rebuilt
+        self.entries = payload.get('entries', {})
+        self.stats.update(payload.get('stats', {}))
+        for key, entry in self.entries.items():
+            self._index_add(key, entry)
+
+    def _save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': self.entries, 'stats': self.stats}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    # --- token index ---
+    @staticmethod
+    def _signature(tokens, version):
+        return version, tuple(sorted(tokens))
+
+    def _index_add(self, key, entry):
+        self._token_index.setdefault(self._signature(entry['tokens'], entry['version']), set()).add(key)
+
+    def _index_remove(self, key, entry):
+        signature = self._signature(entry['tokens'], entry['version'])
+        keys = self._token_index.get(signature)
+        if keys:
+            keys.discard(key)
+            if not keys:
+                del self._token_index[signature]
+
+    def _drop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry:
+            self._index_remove(key, entry)
+
+    @staticmethod
+    def _key(normalized, version):
+        return f"{version}|{normalized}"
+
+    def _is_fresh(self, entry, now):
+        return now - entry['created'] <= self.ttl_seconds
+
+    def _find_similar(self, tokens, version, now):
+        """Most recently used fresh entry with exactly the same content tokens (None if any differ)."""
+        if not tokens:
+            return None
+        keys = [k for k in self._token_index.get(self._signature(tokens, version), ())
+                if self._is_fresh(self.entries[k], now)]
+        return max(keys, key=lambda k: self.entries[k]['last_access']) if keys else None
+
+    # --- public API ---
+    def get(self, question, version, fuzzy=False):
+        """Return the cached answer or None. Counts hits/misses (in memory, saved by put())."""
+        now = time.time()
+        normalized = normalize_question(question)
+        key = self._key(normalized, version)
+
+        entry = self.entries.get(key)
+        if entry and not self._is_fresh(entry, now):
+            self._drop(key)
+            entry = None
+
+        if entry is None and fuzzy:
+            similar_key = self._find_similar(question_tokens(normalized), version, now)
+            if similar_key:
+                entry = self.entries[similar_key]
+
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+
+        entry['last_access'] = now
+        entry['hits'] += 1
+        self.stats['hits'] += 1
+        return entry['answer']
+
+    def put(self, question, version, answer):
+        """Store an answer, evicting expired and least-recently-used entries."""
+        now = time.time()
+        normalized = normalize_question(question)
+        key = self._key(normalized, version)
+        tokens = sorted(question_tokens(normalized))
+
+        self._drop(key)
+        self.entries[key] = {
+            'question': question,
+            'tokens': tokens,
+            'version': version,
+            'answer': answer,
+            'created': now,
+            'last_access': now,
+            'hits': 0
+        }
+        self._index_add(key, self.entries[key])
+
+        for k in [k for k, e in self.entries.items() if not self._is_fresh(e, now)]:
+            self._drop(k)
+        if len(self.entries) > self.max_entries:
+            by_access = sorted(self.entries, key=lambda k: self.entries[k]['last_access'])
+            for k in by_access[:len(self.entries) - self.max_entries]:
+                self._drop(k)
+        self._save()
+
+    def hit_rate(self):
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
+
+    def clear(self):
+        self.entries = {}
+        self._token_index = {}
+        self.stats = {'hits': 0, 'misses': 0}
+        self._save()
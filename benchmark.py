@@ -0,0 +1,275 @@
+"""
+Benchmark suite for the dashboard and pipeline hot paths
+Builds (or reuses) one-branch load-test datasets with
+generate_load_test_data.py at 1x / 5x / 20x traffic and, at each scale,
+records wall time and peak memory of:
+
+  - dashboard (dashboard_data.py): load_data, train_model, forecast_week
+    (7-day forecast block), menu_matrix, get_dashboard_context
+  - prepare_features: build_features_batch (full rebuild)
+  - generators: sales + mermas (streamed), generate_operations.py,
+    generate_purchases_v2.py, prepare_features.py (feature store from scratch)
+
+In-process targets: best of --repeat timed runs, then one extra run under
+tracemalloc for the peak of Python/NumPy allocations (tracing slows code
+down, so it is never the timed run). Generators run in a fresh interpreter
+each (best of --repeat), in a scratch copy of the branch, and report that
+process's peak RSS.
+
+Results are written as JSON. With --baseline, every (scale, target) is
+compared with the saved run: slower than baseline x (1 + --tolerance) (and
+by more than MIN_SECONDS), or peak memory above baseline x (1 +
+--memory-tolerance) (and by more than MIN_MB), is a regression and the
+exit code is 1. Timings are machine-specific: save the baseline on the machine that
+runs the comparison.
+
+Usage:
+    python benchmark.py --scales 1 5 20 --save-baseline
+    python benchmark.py --scales 1 5 20 --baseline benchmark_baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import dashboard_data
+from generate_load_test_data import build_load_test_dataset, scale_dir
+from prepare_features import build_features_batch
+from promo_engine import PromotionEngine
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_PATH = 'benchmark_results.json'
+BASELINE_PATH = 'benchmark_baseline.json'
+BENCH_ROOT = os.path.join('loadtest', 'bench')
+DEFAULT_SCALES = [1, 5, 20]
+YEARS = 3
+TOLERANCE = 0.30         # 30% slower than baseline fails
+MEMORY_TOLERANCE = 0.10  # Peak memory is near-deterministic: 10% more fails
+MIN_SECONDS = 0.1        # Ignore slowdowns smaller than this (timer noise on small targets)
+MIN_MB = 5.0
+
+# Generator stages: (target, script run with the scratch branch as cwd; None = sales + mermas)
+GENERATOR_STAGES = [
+    ('gen_sales_mermas', None),
+    ('gen_operations', 'generate_operations.py'),
+    ('gen_purchases', 'generate_purchases_v2.py'),
+    ('gen_features', 'prepare_features.py'),
+]
+# Branch files the downstream generators read (feature_store.pkl left out: full build)
+BRANCH_INPUTS = ['ventas_sinteticas_3anos.csv', 'mermas.csv', 'rrhh_turnos.csv', 'reviews_clientes.csv',
+                 'reservas.csv', 'compras.csv', 'ficha_tecnica.csv', 'promociones_reales.json']
+
+
+# ==========================================
+# MEASUREMENT
+# ==========================================
+def measure(fn, repeat=3):
+    """Best wall time of `repeat` runs and the tracemalloc peak (MB) of one more run"""
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': min(runs), 'runs': runs, 'peak_mb': peak / 1e6}
+
+
+def _quiet(fn):
+    """fn with its prints swallowed (generators and prepare_features are chatty)"""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return run
+
+
+# Child process of measure_generator: only the generator's own imports, so
+# its peak RSS is the stage's (plus the interpreter with pandas / numpy).
+# VmHWM where available: ru_maxrss keeps the parent's peak across fork/exec on Linux
+STAGE_CODE = """
+import contextlib, io, json, os, runpy, sys, time
+sys.path.insert(0, {project!r})
+import pandas as pd
+import generate_synthetic_data_v2 as gen_v2
+
+def peak_mb():
+    try:
+        with open('/proc/self/status') as f:
+            return next(int(l.split()[1]) for l in f if l.startswith('VmHWM:')) / 1024
+    except (OSError, StopIteration):
+        return gen_v2.peak_rss_mb()
+
+os.chdir({workdir!r})
+t0 = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    if {script!r} is None:
+        dates = pd.date_range(end=pd.Timestamp('2025-12-31'), periods=int(round(365.25 * {years!r})), freq='D')
+        _, items_summary = gen_v2.load_items_summary(os.path.join({project!r}, 'ventas_historicas_3anos.csv'))
+        ficha_df = pd.read_csv(os.path.join({project!r}, 'ficha_tecnica.csv'))
+        gen_v2.stream_dataset(dates, items_summary, ficha_df, traffic_multiplier={traffic!r})
+    else:
+        sys.argv = [{script!r}]
+        runpy.run_path(os.path.join({project!r}, {script!r}), run_name='__main__')
+print('RESULT' + json.dumps({{'seconds': time.perf_counter() - t0, 'peak_mb': peak_mb()}}))
+"""
+
+
+def measure_generator(target, branch_dir, traffic, repeat=3):
+    """
+    Best time / peak RSS of a generator stage over `repeat` fresh interpreters,
+    each in a scratch copy of the branch
+    """
+    runs, peaks = [], []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as workdir:
+            for name in BRANCH_INPUTS:
+                if os.path.exists(os.path.join(branch_dir, name)):
+                    shutil.copy(os.path.join(branch_dir, name), workdir)
+            code = STAGE_CODE.format(project=PROJECT_DIR, workdir=workdir, script=dict(GENERATOR_STAGES)[target],
+                                     years=YEARS, traffic=traffic)
+            out = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+        line = [l for l in out.stdout.splitlines() if l.startswith('RESULT')][-1]
+        stats = json.loads(line[len('RESULT'):])
+        runs.append(stats['seconds'])
+        peaks.append(stats['peak_mb'])
+    return {'seconds': min(runs), 'runs': runs, 'peak_mb': max(peaks)}
+
+
+# ==========================================
+# SUITE
+# ==========================================
+def dataset(scale, root=BENCH_ROOT, regenerate=False):
+    """Branch directory of the load-test dataset at this traffic scale (built once, then reused)"""
+    out_dir = scale_dir(root, 1, YEARS, scale)
+    if regenerate or not os.path.exists(os.path.join(out_dir, 'manifest.json')):
+        print(f"[INFO] Building load-test dataset x{scale:g}...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            out_dir, _ = build_load_test_dataset(1, YEARS, scale, root=root)
+    with open(os.path.join(out_dir, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    return os.path.join(out_dir, 'branch=B01'), manifest
+
+
+def run_scale(scale, branch_dir, repeat=3, generators=True):
+    """List of result dicts (scale, group, target, seconds, runs, peak_mb) for one data scale"""
+    results = []
+
+    def record(group, target, stats):
+        results.append({'scale': scale, 'group': group, 'target': target, **stats})
+        print(f"   x{scale:<4g} {target:<24} {stats['seconds'] * 1000:>10,.1f} ms {stats['peak_mb']:>10,.1f} MB")
+
+    record('dashboard', 'load_data', measure(lambda: dashboard_data.load_data(branch_dir), repeat))
+    df, sales, recipes, reviews, mermas, rrhh, reservations = dashboard_data.load_data(branch_dir)
+    record('dashboard', 'train_model', measure(lambda: dashboard_data.train_model(df), repeat))
+    model, features = dashboard_data.train_model(df)
+    record('dashboard', 'forecast_week', measure(lambda: dashboard_data.forecast_week(df, model, features), repeat))
+    record('dashboard', 'menu_matrix', measure(lambda: dashboard_data.menu_matrix(sales, recipes), repeat))
+    record('dashboard', 'get_dashboard_context', measure(
+        lambda: dashboard_data.get_dashboard_context(df, sales, mermas, reviews, recipes, rrhh, reservations), repeat))
+
+    with open(os.path.join(branch_dir, 'promociones_reales.json'), encoding='utf-8') as f:
+        engine = PromotionEngine(json.load(f))
+    raw_sales = sales.drop(columns=['month_str'], errors='ignore')  # get_dashboard_context adds it
+    record('pipeline', 'prepare_features', measure(_quiet(lambda: build_features_batch(raw_sales, reservations, engine)), repeat))
+
+    if generators:
+        for target, _ in GENERATOR_STAGES:
+            record('generator', target, measure_generator(target, branch_dir, scale, repeat))
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE, memory_tolerance=MEMORY_TOLERANCE,
+            min_seconds=MIN_SECONDS, min_mb=MIN_MB):
+    """
+    Table of (scale, target) against the baseline results: time / memory
+    ratios and status ('ok', 'slower', 'more memory', 'slower + more memory',
+    'new' when the baseline has no entry)
+    """
+    base = {(r['scale'], r['target']): r for r in baseline['results']}
+    rows = []
+    for r in results:
+        b = base.get((r['scale'], r['target']))
+        if b is None:
+            rows.append({'scale': r['scale'], 'target': r['target'], 'seconds': r['seconds'], 'peak_mb': r['peak_mb'],
+                         'time_ratio': float('nan'), 'memory_ratio': float('nan'), 'status': 'new'})
+            continue
+        slower = r['seconds'] > b['seconds'] * (1 + tolerance) and r['seconds'] - b['seconds'] > min_seconds
+        heavier = r['peak_mb'] > b['peak_mb'] * (1 + memory_tolerance) and r['peak_mb'] - b['peak_mb'] > min_mb
+        status = ' + '.join([s for s, bad in [('slower', slower), ('more memory', heavier)] if bad]) or 'ok'
+        rows.append({'scale': r['scale'], 'target': r['target'], 'seconds': r['seconds'], 'peak_mb': r['peak_mb'],
+                     'time_ratio': r['seconds'] / max(b['seconds'], 1e-9),
+                     'memory_ratio': r['peak_mb'] / max(b['peak_mb'], 1e-9), 'status': status})
+    return pd.DataFrame(rows)
+
+
+def run_suite(scales=DEFAULT_SCALES, repeat=3, generators=True, root=BENCH_ROOT, regenerate=False):
+    """All scales -> results document (machine info, rows per dataset, results list)"""
+    results, datasets = [], {}
+    for scale in scales:
+        branch_dir, manifest = dataset(scale, root, regenerate)
+        datasets[f"x{scale:g}"] = manifest['total_rows']
+        results.extend(run_scale(scale, branch_dir, repeat, generators))
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'processor': platform.processor() or platform.machine(), 'cpus': os.cpu_count()},
+        'settings': {'scales': list(scales), 'repeat': repeat, 'years': YEARS},
+        'datasets': datasets,
+        'results': results,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark dashboard and pipeline hot paths at several data scales")
+    parser.add_argument('--scales', type=float, nargs='+', default=DEFAULT_SCALES, help="Traffic multipliers of the load-test data")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per target (best is kept)")
+    parser.add_argument('--no-generators', action='store_true', help="Skip the generator stages")
+    parser.add_argument('--root', default=BENCH_ROOT, help="Where the load-test datasets are built / reused")
+    parser.add_argument('--regenerate', action='store_true', help="Rebuild the datasets even if present")
+    parser.add_argument('--out', default=RESULTS_PATH, help="Results JSON")
+    parser.add_argument('--baseline', help="Baseline JSON to compare against (exit 1 on regressions)")
+    parser.add_argument('--save-baseline', action='store_true', help=f"Also write the results to {BASELINE_PATH}")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="Allowed slowdown (0.3 = 30%%)")
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE, help="Allowed peak memory growth")
+    args = parser.parse_args()
+    scales = [int(s) if float(s).is_integer() else s for s in args.scales]
+
+    print(f"Benchmarking at scales {', '.join(f'x{s:g}' for s in scales)} ({args.repeat} runs each)...")
+    doc = run_suite(scales, args.repeat, not args.no_generators, args.root, args.regenerate)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(doc, f, indent=2)
+    print(f"[OK] {len(doc['results'])} measurements written to {args.out}")
+    if args.save_baseline:
+        shutil.copy(args.out, BASELINE_PATH)
+        print(f"[OK] Baseline saved to {BASELINE_PATH}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        table = compare(doc['results'], baseline, args.tolerance, args.memory_tolerance)
+        print(f"\nVs baseline {args.baseline} ({baseline['created']}, tolerance: time {args.tolerance:.0%}, "
+              f"memory {args.memory_tolerance:.0%}):")
+        print(table.round(3).to_string(index=False))
+        regressions = table[~table['status'].isin(['ok', 'new'])]
+        for _, r in regressions.iterrows():
+            print(f"[FAIL] x{r['scale']:g} {r['target']}: {r['status']} "
+                  f"(time x{r['time_ratio']:.2f}, memory x{r['memory_ratio']:.2f})")
+        if len(regressions):
+            print(f"[ERROR] {len(regressions)} performance regression(s) against the baseline.")
+            sys.exit(1)
+        print("[SUCCESS] No regressions against the baseline.")
@@ -0,0 +1,82 @@
+"""
+Recipe bill of materials (BOM)
+Builds an items x ingredient-categories matrix (grams per portion) from
+ficha_tecnica.csv once, so theoretical ingredient usage for any table of
+sold/wasted items is a single sparse matrix product:
+
+    consumption[day, category] = quantities[day, item] @ bom[item, category]
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from ingredient_catalog import IngredientCatalog
+
+# Ingredient categories (same order as SUPPLIERS in generate_purchases_v2.py)
+CATEGORIES = ['meat', 'veg', 'seafood', 'dairy', 'grocery', 'beverage', 'wine']
+
+
+class RecipeBOM:
+    """
+    matrix: sparse (n_items x n_categories) grams per portion.
+    Items missing from the ficha consume nothing (same as the per-row loop).
+    catalog: IngredientCatalog to reuse (default: in-memory, parsed from ficha_df)
+    """
+
+    def __init__(self, ficha_df, categories=CATEGORIES, catalog=None):
+        # Last row wins for duplicated item names (dict semantics of the old loop)
+        ficha = ficha_df.drop_duplicates('item_name', keep='last')
+        self.items = pd.Index(ficha['item_name'])
+        self.categories = pd.Index(categories)
+        self.catalog = catalog if catalog is not None else IngredientCatalog(path=None)
+        self.catalog.update(ficha)
+
+        rows, cols, grams = [], [], []
+        for i, item_name in enumerate(self.items):
+            for ing in self.catalog.dish(item_name):
+                rows.append(i)
+                cols.append(self.categories.get_loc(ing['category']))
+                grams.append(ing['qty_g'])
+        # Duplicate (item, category) entries are summed
+        self.matrix = sparse.csr_matrix(
+            (grams, (rows, cols)), shape=(len(self.items), len(self.categories))
+        )
+
+    @classmethod
+    def from_csv(cls, path='ficha_tecnica.csv', catalog=None):
+        return cls(pd.read_csv(path), catalog=catalog)
+
+    def to_frame(self):
+        """Dense BOM as a DataFrame (items x categories, grams)"""
+        return pd.DataFrame(self.matrix.toarray(), index=self.items, columns=self.categories)
+
+    def quantity_matrix(self, dates, event_dates, item_names, qty):
+        """Sparse (days x items) quantity matrix; rows outside dates or the ficha are dropped"""
+        dates = pd.DatetimeIndex(dates)
+        day_idx = dates.get_indexer(pd.DatetimeIndex(pd.to_datetime(event_dates)).normalize())
+        item_idx = self.items.get_indexer(np.asarray(item_names, dtype=object))
+        keep = (day_idx >= 0) & (item_idx >= 0)
+        return sparse.csr_matrix(
+            (np.asarray(qty, dtype=float)[keep], (day_idx[keep], item_idx[keep])),
+            shape=(len(dates), len(self.items))
+        )
+
+    def usage(self, item_names, qty):
+        """Grams per category for each row of (item, qty): (n_rows x n_categories) array"""
+        item_idx = self.items.get_indexer(np.asarray(item_names, dtype=object))
+        # Unknown items (-1) pick the trailing zero row
+        dense = np.vstack([self.matrix.toarray(), np.zeros((1, len(self.categories)))])
+        return dense[item_idx] * np.asarray(qty, dtype=float)[:, None]
+
+    def daily_consumption(self, dates, ventas, mermas=None):
+        """
+        Theoretical ingredient consumption (grams) per day and category.
+        ventas: date, item_name, qty_sold / mermas: date, item_name, merma_qty
+        """
+        quantities = self.quantity_matrix(dates, ventas['date'], ventas['item_name'], ventas['qty_sold'])
+        if mermas is not None:
+            quantities = quantities + self.quantity_matrix(dates, mermas['date'], mermas['item_name'], mermas['merma_qty'])
+        return pd.DataFrame(
+            (quantities @ self.matrix).toarray(), index=pd.DatetimeIndex(dates), columns=self.categories
+        )
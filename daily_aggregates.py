@@ -0,0 +1,145 @@
+"""
+Out-of-core daily aggregation
+Reads a sales table in bounded chunks (CSV) or row groups (Parquet) and
+folds each chunk into per-key partial states, so peak memory depends on the
+chunk size and the number of days, not on the size of the file.
+
+Partial states are mergeable: sum, count, max, min directly, mean as
+(sum, count). Two aggregators built over different chunks/files/branches
+merge into the same result as one pass over everything.
+
+Usage:
+    python daily_aggregates.py ventas_sinteticas_3anos.csv --chunksize 100000
+"""
+
+import argparse
+import os
+import pandas as pd
+
+CHUNK_ROWS = 100000
+
+# Output column -> (input column, aggregation). Same daily targets as prepare_features.py
+DAILY_SALES_SPEC = {
+    'target_revenue': ('revenue', 'sum'),
+    'qty_sold': ('qty_sold', 'sum'),
+    'weather_temp': ('weather_temp', 'max'),
+    'is_weekend': ('is_weekend', 'max'),
+    'is_holiday': ('is_holiday', 'max'),
+    'foot_traffic_estimate': ('foot_traffic_estimate', 'mean'),
+}
+
+# How each aggregation is stored and merged: list of (state suffix, per-chunk agg, merge agg)
+_STATES = {
+    'sum': [('sum', 'sum', 'sum')],
+    'count': [('count', 'count', 'sum')],
+    'max': [('max', 'max', 'max')],
+    'min': [('min', 'min', 'min')],
+    'mean': [('sum', 'sum', 'sum'), ('count', 'count', 'sum')],
+}
+
+
+def iter_table_chunks(path, columns=None, chunksize=CHUNK_ROWS):
+    """DataFrames of at most `chunksize` rows (CSV) or one per Parquet batch"""
+    if str(path).endswith('.parquet'):
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+class PartialAggregator:
+    """
+    Mergeable group-by: update() folds a chunk, merge() folds another
+    aggregator, result() finalizes (mean = sum / count).
+    spec: output column -> (input column, 'sum'|'count'|'max'|'min'|'mean')
+    """
+
+    def __init__(self, spec=DAILY_SALES_SPEC, by='date'):
+        self.spec = dict(spec)
+        self.by = by
+        self.states = {}  # state column -> (input column, chunk agg, merge agg)
+        for out, (col, how) in self.spec.items():
+            for suffix, chunk_how, merge_how in _STATES[how]:
+                self.states[f'{out}__{suffix}'] = (col, chunk_how, merge_how)
+        self.partials = None
+        self.rows = 0
+
+    @property
+    def input_columns(self):
+        return list(dict.fromkeys([self.by] + [col for col, _ in self.spec.values()]))
+
+    def _fold(self, partials):
+        if self.partials is None:
+            self.partials = partials
+            return
+        combined = pd.concat([self.partials, partials])
+        merge = {name: merge_how for name, (_, _, merge_how) in self.states.items()}
+        self.partials = combined.groupby(level=0).agg(merge)
+
+    def update(self, chunk):
+        if len(chunk) == 0:
+            return self
+        partials = chunk.groupby(self.by).agg(
+            **{name: (col, chunk_how) for name, (col, chunk_how, _) in self.states.items()}
+        )
+        self._fold(partials)
+        self.rows += len(chunk)
+        return self
+
+    def merge(self, other):
+        if other.partials is not None:
+            self._fold(other.partials)
+            self.rows += other.rows
+        return self
+
+    def result(self):
+        if self.partials is None:
+            return pd.DataFrame(columns=list(self.spec))
+        out = pd.DataFrame(index=self.partials.index.rename(self.by))
+        for name, (_, how) in self.spec.items():
+            if how == 'mean':
+                out[name] = self.partials[f'{name}__sum'] / self.partials[f'{name}__count']
+            else:
+                out[name] = self.partials[f'{name}__{_STATES[how][0][0]}']
+        return out.sort_index()
+
+
+def aggregate_file(path, spec=DAILY_SALES_SPEC, by='date', chunksize=CHUNK_ROWS):
+    """Per-`by` aggregates of a CSV/Parquet file, one chunk in memory at a time"""
+    agg = PartialAggregator(spec, by)
+    for chunk in iter_table_chunks(path, agg.input_columns, chunksize):
+        agg.update(chunk)
+    return agg
+
+
+def daily_sales(paths, chunksize=CHUNK_ROWS):
+    """
+    Daily sales aggregates (prepare_features.py targets) over one or more
+    files, e.g. the ventas of every branch of a load-test dataset.
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    total = PartialAggregator(DAILY_SALES_SPEC)
+    for path in paths:
+        total.merge(aggregate_file(path, chunksize=chunksize))
+    daily = total.result()
+    daily.index = pd.to_datetime(daily.index)
+    return daily
+
+
+if __name__ == '__main__':
+    import time
+    parser = argparse.ArgumentParser(description="Chunked daily aggregation of sales files")
+    parser.add_argument('paths', nargs='+', help="Sales CSV/Parquet files (merged)")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--out', help="Write the daily aggregates to this CSV")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    daily = daily_sales(args.paths, args.chunksize)
+    print(f"[OK] {len(daily)} days aggregated in {time.perf_counter() - t0:.2f}s")
+    print(daily.tail())
+    if args.out:
+        daily.to_csv(args.out)
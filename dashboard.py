@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from slot_index import SlotIndex
+
 # Setting Page Configuration
 st.set_page_config(
     page_title="La Estación Restobar - Dashboard",
@@ -22,6 +24,11 @@ def load_data():
         st.error(f"Error loading data: {e}")
         return pd.DataFrame()
 
+@st.cache_resource
+def get_slot_index(_df, n_rows):
+    # Built once per dataset (n_rows keys the cache); filter changes only slice it
+    return SlotIndex(_df)
+
 df = load_data()
 
 if not df.empty:
@@ -95,6 +102,21 @@ if not df.empty:
     fig_bar.update_layout(yaxis={'categoryorder': 'total ascending'})
     st.plotly_chart(fig_bar, use_container_width=True)
     
+    # Chart 4: Peak hours (weekday x time slot), served by the precomputed slot index
+    st.subheader("Horas Punta (Día de la Semana × Hora)")
+    hcol1, hcol2, hcol3 = st.columns(3)
+    measure_labels = {'Órdenes': 'orders', 'Ítems': 'items', 'Ventas ($)': 'revenue'}
+    heat_measure = hcol1.selectbox("Métrica", list(measure_labels))
+    heat_slot = hcol2.radio("Intervalo", ["Hora", "15 min"], horizontal=True)
+    heat_per_day = hcol3.checkbox("Promedio por día", value=False)
+
+    slot_index = get_slot_index(df, len(df))
+    heat = slot_index.heatmap(start_date, end_date, selected_categories, measure_labels[heat_measure],
+                              per_day=heat_per_day, hourly=(heat_slot == "Hora"))
+    fig_heat = px.imshow(heat, aspect='auto', color_continuous_scale='YlOrRd',
+                         labels={'x': 'Hora', 'y': 'Día', 'color': heat_measure})
+    st.plotly_chart(fig_heat, use_container_width=True)
+
     # 6. Raw Data View
     with st.expander("Ver Datos Crudos"):
         st.dataframe(filtered_df.sort_values(by='order_date', ascending=False))
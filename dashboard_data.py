@@ -0,0 +1,273 @@
+"""
+Data and computations behind dashboard_propietario.py (no Streamlit)
+The dashboard wraps these in st.cache_data / st.cache_resource; kept here so
+they can be imported, benchmarked (benchmark.py) and checked outside the app
+against any data directory (e.g. a load-test branch).
+
+Usage:
+    from dashboard_data import load_data, train_model, forecast_week, menu_matrix
+    df, sales, recipes, reviews, mermas, rrhh, reservations = load_data('.')
+"""
+
+import os
+from datetime import timedelta
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from labor_cube import LaborCube
+
+FEATURE_COLS = [
+    'weather_temp', 'is_weekend', 'is_holiday', 'foot_traffic_estimate',
+    'day_of_week', 'promo_pizza_tuesday', 'promo_ladies_thursday',
+    'revenue_t-1', 'revenue_t-7'
+]
+
+
+def load_data(data_dir='.'):
+    """The seven tables of the dashboard, dates parsed"""
+    path = lambda name: os.path.join(data_dir, name)
+    # Load ML Dataset
+    df = pd.read_csv(path('dataset_ml_diario.csv'))
+    df['date'] = pd.to_datetime(df['date'])
+
+    # Load Raw Sales for Menu Analysis
+    sales = pd.read_csv(path('ventas_sinteticas_3anos.csv'))
+    sales['date'] = pd.to_datetime(sales['date'])
+
+    # Load Ficha Tecnica for Costs
+    recipes = pd.read_csv(path('ficha_tecnica.csv'))
+
+    # Load Reviews
+    reviews = pd.read_csv(path('reviews_clientes.csv'))
+    reviews['date'] = pd.to_datetime(reviews['date'])
+
+    # Load Waste Data
+    mermas = pd.read_csv(path('mermas.csv'))
+    mermas['date'] = pd.to_datetime(mermas['date'])
+
+    # Load Staffing Data (RRHH)
+    rrhh = pd.read_csv(path('rrhh_turnos.csv'))
+    rrhh['date'] = pd.to_datetime(rrhh['date'])
+
+    # Load Reservations Data
+    reservations = pd.read_csv(path('reservas.csv'))
+    reservations['date'] = pd.to_datetime(reservations['date'])
+
+    return df, sales, recipes, reviews, mermas, rrhh, reservations
+
+
+def train_model(df):
+    """Revenue RandomForest trained on the days before 2025. Returns (model, feature_cols)"""
+    train_df = df[df['date'] < '2025-01-01']
+    # Simple imputation for demo
+    train_df = train_df.dropna(subset=FEATURE_COLS)
+
+    X = train_df[FEATURE_COLS]
+    y = train_df['target_revenue']
+
+    model = RandomForestRegressor(n_estimators=50, random_state=42)
+    model.fit(X, y)
+
+    return model, list(FEATURE_COLS)
+
+
+def forecast_week(df, model, features, days=7):
+    """Next `days` days after the dataset: simulated features and pred_revenue"""
+    # We take the LAST known days from dataset to simulate 'next week' context
+    last_date = df['date'].max()
+    start_pred = last_date + timedelta(days=1)
+    future_dates = [start_pred + timedelta(days=i) for i in range(days)]
+
+    future_data = []
+    for d in future_dates:
+        # Simulate features for future
+        dow = d.weekday()
+        is_weekend = 1 if dow >= 5 else 0
+        # Assuming recent averages for lags (simplified for dashboard demo)
+        recent_rev = df.iloc[-1]['target_revenue']
+
+        row = {
+            'date': d,
+            'weather_temp': 22, # Forecasted temp
+            'is_weekend': is_weekend,
+            'is_holiday': 0,
+            'foot_traffic_estimate': 80 + (40 if is_weekend else 0) + (100 if dow==3 else 0), # Ladies night Logic
+            'day_of_week': dow,
+            'promo_pizza_tuesday': 1 if dow == 1 else 0,
+            'promo_ladies_thursday': 1 if dow == 3 else 0,
+            'revenue_t-1': recent_rev,
+            'revenue_t-7': recent_rev # Naive lag
+        }
+        future_data.append(row)
+
+    future_df = pd.DataFrame(future_data)
+    future_df['pred_revenue'] = model.predict(future_df[features])
+    return future_df
+
+
+def menu_matrix(sales, recipes):
+    """
+    Menu engineering table per item (qty, revenue, cost, margin, profit, BCG
+    class). Returns (menu_df, median volume, median margin)
+    """
+    item_stats = sales.groupby('item_name').agg({
+        'qty_sold': 'sum',
+        'revenue': 'sum'
+    }).reset_index()
+
+    # Merge with Cost
+    menu_df = pd.merge(item_stats, recipes[['item_name', 'cost_clp', 'category']], on='item_name')
+    menu_df['avg_price'] = menu_df['revenue'] / menu_df['qty_sold']
+    menu_df['margin_clp'] = menu_df['avg_price'] - menu_df['cost_clp']
+    menu_df['total_profit'] = menu_df['margin_clp'] * menu_df['qty_sold']
+
+    # Classification
+    # Star: High Vol, High Margin
+    # Plowhorse: High Vol, Low Margin
+    # Puzzle: Low Vol, High Margin
+    # Dog: Low Vol, Low Margin
+
+    med_vol = menu_df['qty_sold'].median()
+    med_margin = menu_df['margin_clp'].median()
+
+    def classify(row):
+        if row['qty_sold'] >= med_vol and row['margin_clp'] >= med_margin: return 'Star ⭐'
+        if row['qty_sold'] >= med_vol and row['margin_clp'] < med_margin: return 'Plowhorse 🐎'
+        if row['qty_sold'] < med_vol and row['margin_clp'] >= med_margin: return 'Puzzle ❓'
+        return 'Dog 🐕'
+
+    menu_df['class'] = menu_df.apply(classify, axis=1)
+    return menu_df, med_vol, med_margin
+
+
+def get_dashboard_context(df, sales, mermas, reviews, recipes, rrhh, reservations, labor=None):
+    """Prompt context for the Asistente Virtual (labor: a prebuilt LaborCube, else built here)"""
+    # --- 1. GENERAL METRICS (3 Years) ---
+    total_rev = df['target_revenue'].sum()
+    avg_daily_rev = df['target_revenue'].mean()
+    total_days = df['date'].nunique()
+
+    # --- 2. MONTHLY ANALYSIS (Best/Worst) ---
+    # Group Sales by Month
+    df['month_str'] = df['date'].dt.to_period('M').astype(str)
+    monthly_sales = df.groupby('month_str')['target_revenue'].sum().reset_index()
+
+    best_month_row = monthly_sales.loc[monthly_sales['target_revenue'].idxmax()]
+    worst_month_row = monthly_sales.loc[monthly_sales['target_revenue'].idxmin()]
+
+    # Group Waste by Month
+    mermas['month_str'] = mermas['date'].dt.to_period('M').astype(str)
+    monthly_waste = mermas.groupby('month_str')['value_lost_clp'].sum().reset_index()
+
+    # Merge to find waste for best/worst sales months
+    def get_waste_for_month(m_str):
+        row = monthly_waste[monthly_waste['month_str'] == m_str]
+        return row['value_lost_clp'].values[0] if not row.empty else 0
+
+    waste_at_best = get_waste_for_month(best_month_row['month_str'])
+    waste_at_worst = get_waste_for_month(worst_month_row['month_str'])
+
+    # --- 3. MENU ENGINEERING (Stars/Dogs) ---
+    item_stats = sales.groupby('item_name').agg({'qty_sold': 'sum', 'revenue': 'sum'}).reset_index()
+    top_5_items = item_stats.sort_values('revenue', ascending=False).head(5)
+    bottom_5_items = item_stats.sort_values('revenue', ascending=True).head(5)
+
+    stars_str = ", ".join([f"{r['item_name']} (${r['revenue']:,.0f})" for _, r in top_5_items.iterrows()])
+    dogs_str = ", ".join([f"{r['item_name']} (${r['revenue']:,.0f})" for _, r in bottom_5_items.iterrows()])
+
+    # --- 4. CALENDAR PATTERNS ---
+    dow_map = {0:'Lunes', 1:'Martes', 2:'Miércoles', 3:'Jueves', 4:'Viernes', 5:'Sábado', 6:'Domingo'}
+    df['day_name'] = df['day_of_week'].map(dow_map)
+    dow_sales = df.groupby('day_name')['target_revenue'].mean().sort_values(ascending=False)
+    best_day = dow_sales.index[0]
+    worst_day = dow_sales.index[-1]
+
+    # --- 5. RECENT TRENDS (Last 6 Months) ---
+    last_6_months = monthly_sales.tail(6)
+    trend_str = ", ".join([f"{r['month_str']}: ${r['target_revenue']:,.0f}" for _, r in last_6_months.iterrows()])
+
+    # --- 6. FULL RECIPE DATABASE (Injecting all rows) ---
+    recipes_str = recipes.to_csv(index=False)
+
+    # --- 7. FINANCIAL SUMMARY (Monthly per Item) ---
+    # 7.1 Prepare Monthly Sales
+    sales['month_str'] = sales['date'].dt.to_period('M').astype(str)
+    sales_monthly = sales.groupby(['item_name', 'month_str']).agg({
+        'qty_sold': 'sum',
+        'revenue': 'sum'
+    }).reset_index()
+
+    # 7.2 Prepare Monthly Waste
+    mermas['month_str'] = mermas['date'].dt.to_period('M').astype(str)
+    waste_monthly = mermas.groupby(['item_name', 'month_str'])['value_lost_clp'].sum().reset_index()
+    waste_monthly.rename(columns={'value_lost_clp': 'total_waste'}, inplace=True)
+
+    # 7.3 Merge Sales + Waste + Recipes
+    fin_df = pd.merge(sales_monthly, recipes[['item_name', 'cost_clp']], on='item_name', how='left')
+    fin_df = pd.merge(fin_df, waste_monthly, on=['item_name', 'month_str'], how='left')
+
+    # Fill NaNs
+    fin_df['cost_clp'] = fin_df['cost_clp'].fillna(0)
+    fin_df['total_waste'] = fin_df['total_waste'].fillna(0)
+
+    # 7.4 Calculate Monthly Profit
+    fin_df['total_cost'] = fin_df['qty_sold'] * fin_df['cost_clp']
+    fin_df['final_profit'] = fin_df['revenue'] - fin_df['total_cost'] - fin_df['total_waste']
+    fin_df['profit_margin_pct'] = (fin_df['final_profit'] / fin_df['revenue'] * 100).fillna(0).round(1)
+
+    fin_csv_str = fin_df[['month_str', 'item_name', 'revenue', 'total_cost', 'total_waste', 'final_profit']].to_csv(index=False)
+
+    # --- 8. OPERATIONAL DATA (Staffing & Reservations) ---
+    # 8.1 Staffing Analysis (RRHH)
+    # Calculate simple efficiency metrics
+    staff_daily_cost = rrhh.groupby('date')['total_pay'].sum().mean()
+    staff_daily_hours = rrhh.groupby('date')['hours_worked'].sum().mean()
+    staff_role_counts = rrhh['role'].value_counts().to_string() # How many shifts by role historically
+    labor = LaborCube.from_frames(rrhh, sales) if labor is None else labor
+    staff_productivity = labor.summary('role')[
+        ['revenue_per_hour', 'labor_cost_pct']].round(3).to_string()
+
+    # 8.2 Future Reservations (Simulated "Next 7 Days" from end of data)
+    last_date = reservations['date'].max()
+    last_week_reservations = reservations[reservations['date'] > (last_date - pd.Timedelta(days=7))]
+    res_count_next_week = len(last_week_reservations)
+    res_pax_next_week = last_week_reservations['pax'].sum()
+    busiest_res_day = last_week_reservations['date'].dt.day_name().mode()[0] if not last_week_reservations.empty else "N/A"
+
+    context = f"""
+    Eres el 'Gerente de Datos' de 'Estación La Serena'. Tu trabajo es dar respuestas EXACTAS y TÁCTICAS al dueño.
+
+    MEMORIA OPERATIVA:
+    - El dueño ODIA las respuestas vagas. Quiere números.
+    - Siempre analiza la RENTABILIDAD REAL (Venta - Costo - Merma).
+    - Usa emojis para resaltar puntos clave 🔴🟢⚠️.
+
+    DATOS FINANCIEROS CLAVE (3 AÑOS):
+    - Venta Total: ${total_rev:,.0f}
+    - Promedio Diario Venta: ${avg_daily_rev:,.0f}
+
+    DATOS OPERATIVOS (RRHH & CAPACIDAD):
+    - Costo Promedio Diario Personal: ${staff_daily_cost:,.0f} (aprox {staff_daily_hours:.1f} horas hombre/día).
+    - Distribución de Turnos Histórica: 
+    {staff_role_counts}
+    - Productividad por Rol (venta por hora-hombre, costo laboral % venta):
+    {staff_productivity}
+
+    RESERVAS Y DEMANDA (SIMULACIÓN PRÓXIMA SEMANA):
+    - Reservas Agendadas: {res_count_next_week} mesas ({res_pax_next_week} personas).
+    - Día más solicitado: {busiest_res_day}.
+    *Nota: Si hay muchas reservas y el costo de personal es bajo ese día, SUGIERE reforzar turnos.*
+
+    TABLA DE RENTABILIDAD MENSUAL POR PLATO (CSV):
+    (Usa esta tabla para ver tendencias de ganancias, no solo ingresos).
+    {fin_csv_str}
+
+    BASE DE DATOS DE RECETAS (FICHA TÉCNICA):
+    {recipes_str}
+
+    Instrucciones Específicas:
+    1. **Rentabilidad**: Si preguntan "¿Qué plato gano más?" responde con la GANANCIA (Profit), no la Venta (Revenue).
+    2. **Personal**: Si preguntan por eficiencia, compara Venta Diaria vs Costo Diario de Personal. Si la venta es alta y el costo personal bajo, es un día eficiente (o estresante).
+    3. **Mermas**: Siempre menciona cuánto dinero se perdió en mermas si el plato es un "Perro".
+    """
+    return context
@@ -1,12 +1,21 @@
 
 import streamlit as st
 import pandas as pd
-import numpy as np
+import json
 import plotly.express as px
 import plotly.graph_objects as go
-from sklearn.ensemble import RandomForestRegressor
 import google.generativeai as genai
 from datetime import datetime, timedelta
+from assistant_cache import AnswerCache, compute_data_version
+from payables import PayablesLedger, cash_position, projected_revenue
+from market_basket import basket_analysis, pairs_with, HISTORICAL_PATH
+from staff_scheduler import period_shares, weekly_schedule, SCHEDULED_ROLES
+from labor_cube import LaborCube, WEEKDAYS
+from occupancy import OccupancyModel, walk_in_parties, DWELL_MINUTES, TABLES
+from noshow_model import NoShowModel, NoShowScorer, expected_pax, expected_pax_by_period, upcoming_split
+from profiling import Profiler
+import dashboard_data
+from dashboard_data import forecast_week, menu_matrix, get_dashboard_context
 
 # ==========================================
 # PAGE CONFIG
@@ -17,65 +26,90 @@ st.set_page_config(
     layout="wide"
 )
 
+# ==========================================
+# PROFILING (DIAGNÓSTICO PANEL)
+# ==========================================
+# Spans of this run; the sidebar checkbox (key 'diagnostico') is drawn at the
+# bottom but read here so data loading is timed too. Off: no-op spans and the
+# plain plotly modules
+profiler = Profiler(enabled=st.session_state.get('diagnostico', False))
+px = profiler.instrument(px, 'px', 'figure')
+go = profiler.instrument(go, 'go', 'figure')
+
 # ==========================================
 # DATA LOADING (CACHED)
 # ==========================================
+# Files behind the dashboard (used to version cached assistant answers)
+DATA_FILES = [
+    'dataset_ml_diario.csv', 'ventas_sinteticas_3anos.csv', 'ficha_tecnica.csv',
+    'reviews_clientes.csv', 'mermas.csv', 'rrhh_turnos.csv', 'reservas.csv'
+]
+
 @st.cache_data
 def load_data():
-    # Load ML Dataset
-    df = pd.read_csv('dataset_ml_diario.csv')
-    df['date'] = pd.to_datetime(df['date'])
-    
-    # Load Raw Sales for Menu Analysis
-    sales = pd.read_csv('ventas_sinteticas_3anos.csv')
-    sales['date'] = pd.to_datetime(sales['date'])
-    
-    # Load Ficha Tecnica for Costs
-    recipes = pd.read_csv('ficha_tecnica.csv')
-    
-    # Load Reviews
-    reviews = pd.read_csv('reviews_clientes.csv')
-    reviews['date'] = pd.to_datetime(reviews['date'])
-    
-    # Load Waste Data
-    mermas = pd.read_csv('mermas.csv')
-    mermas['date'] = pd.to_datetime(mermas['date'])
-
-    # Load Staffing Data (RRHH)
-    rrhh = pd.read_csv('rrhh_turnos.csv')
-    rrhh['date'] = pd.to_datetime(rrhh['date'])
-
-    # Load Reservations Data
-    reservations = pd.read_csv('reservas.csv')
-    reservations['date'] = pd.to_datetime(reservations['date'])
-    
-    return df, sales, recipes, reviews, mermas, rrhh, reservations
+    # Tables and computations live in dashboard_data.py (no Streamlit, benchmarked there)
+    return dashboard_data.load_data()
 
 @st.cache_resource
 def train_model(df):
     # Train simple model on the fly for the dashboard
-    # Split
-    train_df = df[df['date'] < '2025-01-01']
-    feature_cols = [
-        'weather_temp', 'is_weekend', 'is_holiday', 'foot_traffic_estimate',
-        'day_of_week', 'promo_pizza_tuesday', 'promo_ladies_thursday',
-        'revenue_t-1', 'revenue_t-7'
-    ]
-    # Simple imputation for demo
-    train_df = train_df.dropna(subset=feature_cols)
-    
-    X = train_df[feature_cols]
-    y = train_df['target_revenue']
-    
-    model = RandomForestRegressor(n_estimators=50, random_state=42)
-    model.fit(X, y)
-    
-    return model, feature_cols
+    return dashboard_data.train_model(df)
+
+@st.cache_resource
+def get_answer_cache():
+    return AnswerCache()
+
+@st.cache_resource
+def get_payables_ledger():
+    # Persisted ledger; each rerun only folds POs appended to compras.csv
+    return PayablesLedger()
+
+@st.cache_data
+def daily_revenue(_sales, n_rows):
+    # n_rows keys the cache (sales is not hashed)
+    return _sales.groupby('date')['revenue'].sum()
+
+@st.cache_data
+def service_period_shares(_sales, n_rows):
+    # Share of items per service period and weekday (generator weights if sales have no hour)
+    cols = [c for c in ['date', 'hour', 'qty_sold'] if c in _sales.columns]
+    return period_shares(_sales[cols])
+
+@st.cache_resource
+def get_labor_cube(_rrhh, _sales, n_rows):
+    # Built once per dataset (n_rows keys the cache); the view only slices it
+    return LaborCube.from_frames(_rrhh, _sales)
+
+@st.cache_resource
+def get_occupancy_model(_reservations, _daily, n_rows, dwell_minutes):
+    # Seats per (day, slot) for the whole history; booking checks are array lookups
+    return OccupancyModel(_reservations, walk_in_parties(_daily), dwell_minutes=dwell_minutes)
+
+@st.cache_resource
+def get_noshow_model(_reservations, n_rows):
+    # Trained on everything before the upcoming week (n_rows keys the cache)
+    return NoShowModel().fit(upcoming_split(_reservations)[0])
+
+@st.cache_resource
+def get_noshow_scorer():
+    # Persisted scores per reservation_id; reruns only score new or edited bookings
+    return NoShowScorer()
+
+@st.cache_data
+def load_basket_analysis(min_orders):
+    # Orders with their lines (the synthetic sales have no order_id)
+    lines = pd.read_csv(HISTORICAL_PATH, usecols=['order_id', 'item_name'])
+    n_orders = lines['order_id'].nunique()
+    result = basket_analysis(lines, min_support=min_orders / n_orders, top=10 ** 6)
+    result['multi_item_share'] = (lines.groupby('order_id')['item_name'].nunique() >= 2).mean()
+    return result
 
 # Load EVERYTHING
 try:
-    df, sales, recipes, reviews, mermas, rrhh, reservations = load_data()
-    model, features = train_model(df)
+    with profiler.span('load_data', 'data'):
+        df, sales, recipes, reviews, mermas, rrhh, reservations = load_data()
+    with profiler.span('train_model', 'model'):
+        model, features = train_model(df)
     DATA_LOADED = True
 except Exception as e:
     st.error(f"Error loading data: {e}")
@@ -87,9 +121,10 @@ except Exception as e:
 st.sidebar.title("👨‍🍳 Estación La Serena")
 st.sidebar.info("**Modo Propietario**")
 st.sidebar.markdown("---")
-view_mode = st.sidebar.radio("Ir a:", ["📊 Bola de Cristal (Predicción)", "🍔 Ingeniería de Menú", "⭐ Salud Operacional", "⏳ Historia & Tendencias", "🤖 Asistente Virtual"])
+view_mode = st.sidebar.radio("Ir a:", ["📊 Bola de Cristal (Predicción)", "🍔 Ingeniería de Menú", "⭐ Salud Operacional", "⏳ Historia & Tendencias", "💳 Cuentas por Pagar", "🤖 Asistente Virtual"])
 
 if DATA_LOADED:
+    view_span = profiler.begin(view_mode, 'view')
     
     # ==========================================
     # TAB 1: BOLA DE CRISTAL
@@ -98,61 +133,63 @@ if DATA_LOADED:
         st.title("🔮 Predicción de Demanda & Turnos")
         st.markdown("Planifica tu semana con Inteligencia Artificial.")
         
-        # Forecast for next 7 days (Simulation)
-        # We take the LAST known days from dataset to simulate 'next week' context
-        last_date = df['date'].max()
-        start_pred = last_date + timedelta(days=1)
-        future_dates = [start_pred + timedelta(days=i) for i in range(7)]
-        
-        future_data = []
-        for d in future_dates:
-            # Simulate features for future
-            dow = d.weekday()
-            is_weekend = 1 if dow >= 5 else 0
-            # Assuming recent averages for lags (simplified for dashboard demo)
-            recent_rev = df.iloc[-1]['target_revenue']
-            
-            row = {
-                'date': d,
-                'weather_temp': 22, # Forecasted temp
-                'is_weekend': is_weekend,
-                'is_holiday': 0,
-                'foot_traffic_estimate': 80 + (40 if is_weekend else 0) + (100 if dow==3 else 0), # Ladies night Logic
-                'day_of_week': dow,
-                'promo_pizza_tuesday': 1 if dow == 1 else 0,
-                'promo_ladies_thursday': 1 if dow == 3 else 0,
-                'revenue_t-1': recent_rev,
-                'revenue_t-7': recent_rev # Naive lag
-            }
-            future_data.append(row)
-            
-        future_df = pd.DataFrame(future_data)
-        
-        # Predict
-        preds = model.predict(future_df[features])
-        future_df['pred_revenue'] = preds
-        future_df['rec_staff'] = (future_df['pred_revenue'] / 40000).astype(int) # 1 staff per 40k revenue approx
+        # Forecast for next 7 days (Simulation): recent context rolled forward
+        with profiler.span('forecast_week', 'model'):
+            future_df = forecast_week(df, model, features)
+        start_pred = future_df['date'].iloc[0]
+
+        # Items per day from the revenue forecast (recent revenue per item)
+        recent = df.tail(90)
+        revenue_per_item = recent['target_revenue'].sum() / recent['qty_sold'].sum()
+        future_df['pred_items'] = future_df['pred_revenue'] / revenue_per_item
+
+        # Upcoming reservations (last week of reservas.csv moved onto the forecast week, as in the assistant)
+        # scored for no-show risk: staff for the pax expected to show up, not for every booking
+        with profiler.span('noshow.score', 'model'):
+            upcoming = upcoming_split(reservations)[1].copy()
+            p_no_show = get_noshow_scorer().score(upcoming, get_noshow_model(reservations, len(reservations)))
+        upcoming['date'] = upcoming['date'] + (pd.Timestamp(start_pred) - upcoming['date'].min().normalize())
+        pax = expected_pax(upcoming, p_no_show).reindex(pd.DatetimeIndex(future_df['date']), fill_value=0)
+        future_df['booked_pax'] = pax['booked_pax'].values
+        future_df['expected_pax'] = pax['expected_pax'].values
+        items_per_pax = recent['qty_sold'].sum() / recent['foot_traffic_estimate'].sum()
+        committed = expected_pax_by_period(upcoming, p_no_show, future_df['date']) * items_per_pax
+        with profiler.span('weekly_schedule', 'step'):
+            schedule, staff = weekly_schedule(future_df['date'], future_df['pred_items'].values,
+                                              service_period_shares(sales, len(sales)), committed)
+        future_df['rec_staff'] = staff[:, SCHEDULED_ROLES.index('Garzon')].sum(axis=1)
+        labor_cost = schedule['cost'].sum()
         
         # KPIs
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
         total_proj = future_df['pred_revenue'].sum()
         busiest_day = future_df.loc[future_df['pred_revenue'].idxmax()]['date'].strftime('%A')
         
         col1.metric("Venta Proyectada (7d)", f"${total_proj:,.0f}")
         col2.metric("Día Más Fuerte", busiest_day)
-        col3.metric("Garzones Extra Jueves", "+2 (Ladies Night)")
+        booked, expected = future_df['booked_pax'].sum(), future_df['expected_pax'].sum()
+        col3.metric("Pax Reservados → Esperados", f"{booked:,.0f} → {expected:,.0f}",
+                    f"-{1 - expected / max(booked, 1):.0%} no-show", delta_color="off")
+        col4.metric("Costo Laboral Óptimo (7d)", f"${labor_cost:,.0f}", f"{labor_cost / total_proj:.1%} de la venta", delta_color="off")
         
         # Chart
         fig = px.line(future_df, x='date', y='pred_revenue', title="Proyección de Venta Diaria", markers=True)
         fig.update_layout(yaxis_title="Venta CLP ($)")
         st.plotly_chart(fig, use_container_width=True)
         
-        # Staffing Table
+        # Staffing Table: minimum-cost shifts covering the forecast (staff_scheduler.py)
         st.subheader("📋 Recomendación de Turnos")
-        staff_table = future_df[['date', 'pred_revenue', 'rec_staff']].copy()
-        staff_table['date'] = staff_table['date'].dt.strftime('%Y-%m-%d (%A)')
-        staff_table.columns = ['Fecha', 'Venta Estimada', 'Garzones Sugeridos']
-        st.dataframe(staff_table, hide_index=True)
+        st.caption("Personal por rol y turno que cubre la demanda proyectada de cada servicio al menor costo.")
+        staff_table = schedule.pivot_table(index='date', columns=['role', 'shift_type'], values='staff',
+                                           aggfunc='sum', fill_value=0)
+        staff_table.columns = [f"{role} · {shift}" for role, shift in staff_table.columns]
+        staff_table = future_df.set_index('date')[['pred_revenue', 'booked_pax', 'expected_pax', 'rec_staff']].join(staff_table)
+        staff_table['Costo'] = schedule.groupby('date')['cost'].sum()
+        staff_table.index = staff_table.index.strftime('%Y-%m-%d (%A)')
+        staff_table = staff_table.rename(columns={'pred_revenue': 'Venta Estimada', 'booked_pax': 'Pax Reservados',
+                                                  'expected_pax': 'Pax Esperados', 'rec_staff': 'Garzones Sugeridos'})
+        staff_table['Pax Esperados'] = staff_table['Pax Esperados'].round(1)
+        st.dataframe(staff_table.rename_axis('Fecha').reset_index(), hide_index=True)
 
     # ==========================================
     # TAB 2: INGENIERIA DE MENU
@@ -169,34 +206,9 @@ if DATA_LOADED:
             *   **Dog 🐕 (Perro):** Baja Popularidad y Baja Rentabilidad. Evalúa eliminarlos del menú.
             """)
         
-        # Calculate Item Metrics
-        item_stats = sales.groupby('item_name').agg({
-            'qty_sold': 'sum',
-            'revenue': 'sum'
-        }).reset_index()
-        
-        # Merge with Cost
-        menu_df = pd.merge(item_stats, recipes[['item_name', 'cost_clp', 'category']], on='item_name')
-        menu_df['avg_price'] = menu_df['revenue'] / menu_df['qty_sold']
-        menu_df['margin_clp'] = menu_df['avg_price'] - menu_df['cost_clp']
-        menu_df['total_profit'] = menu_df['margin_clp'] * menu_df['qty_sold']
-        
-        # Classification
-        # Star: High Vol, High Margin
-        # Plowhorse: High Vol, Low Margin
-        # Puzzle: Low Vol, High Margin
-        # Dog: Low Vol, Low Margin
-        
-        med_vol = menu_df['qty_sold'].median()
-        med_margin = menu_df['margin_clp'].median()
-        
-        def classify(row):
-            if row['qty_sold'] >= med_vol and row['margin_clp'] >= med_margin: return 'Star ⭐'
-            if row['qty_sold'] >= med_vol and row['margin_clp'] < med_margin: return 'Plowhorse 🐎'
-            if row['qty_sold'] < med_vol and row['margin_clp'] >= med_margin: return 'Puzzle ❓'
-            return 'Dog 🐕'
-            
-        menu_df['class'] = menu_df.apply(classify, axis=1)
+        # Item metrics + Star / Plowhorse / Puzzle / Dog classification
+        with profiler.span('menu_matrix', 'step'):
+            menu_df, med_vol, med_margin = menu_matrix(sales, recipes)
         
         # Scatter Plot Enhanced
         fig = px.scatter(
@@ -244,6 +256,48 @@ if DATA_LOADED:
         
         st.dataframe(menu_df[['item_name', 'class', 'qty_sold', 'margin_clp', 'total_profit']].sort_values('total_profit', ascending=False))
 
+        # Market basket: which items are ordered together (historical orders)
+        st.markdown("---")
+        st.subheader("🧺 ¿Qué se pide junto? (Combos)")
+        min_orders = st.slider("Mínimo de pedidos en que aparece la combinación", 1, 20, 2)
+        with profiler.span('basket_analysis', 'step'):
+            baskets = load_basket_analysis(min_orders)
+
+        kb1, kb2, kb3 = st.columns(3)
+        kb1.metric("Pedidos analizados", f"{baskets['n_orders']:,}")
+        kb2.metric("Pedidos con 2+ platos", f"{baskets['multi_item_share']:.1%}")
+        kb3.metric("Pares frecuentes", f"{len(baskets['pairs'])}")
+
+        pairs = baskets['pairs']
+        if pairs.empty:
+            st.info("No hay combinaciones que superen el mínimo de pedidos.")
+        else:
+            top_pairs = pairs.head(10).assign(par=lambda p: p['item_a'] + ' + ' + p['item_b'])
+            fig_pairs = px.bar(
+                top_pairs.iloc[::-1], x='lift', y='par', orientation='h', text='orders',
+                title="Top 10 pares por Lift (>1: se piden juntos más que por azar)",
+                labels={'lift': 'Lift', 'par': '', 'orders': 'Pedidos'}
+            )
+            fig_pairs.add_vline(x=1, line_dash="dash", line_color="gray")
+            st.plotly_chart(fig_pairs, use_container_width=True)
+
+            with st.expander("Ver pares y tríos", expanded=False):
+                st.dataframe(pairs.head(30).style.format({'support': '{:.3%}', 'confidence_a_b': '{:.1%}', 'confidence_b_a': '{:.1%}', 'lift': '{:.2f}'}))
+                if baskets['triples'].empty:
+                    st.caption("Ningún trío supera el mínimo de pedidos.")
+                else:
+                    st.dataframe(baskets['triples'].head(30).style.format({'support': '{:.3%}', 'confidence': '{:.1%}', 'lift': '{:.2f}'}))
+
+            # Companions of the After Office 2x1 items
+            with open('promociones_reales.json', 'r', encoding='utf-8') as f:
+                after_office = json.load(f)['promociones_semanales']['after_office']['items_afectados']
+            companions = pairs_with(pairs, after_office)
+            st.markdown(f"**After Office 2x1** ({', '.join(after_office)}): platos que más acompañan")
+            if companions.empty:
+                st.caption("Sin combinaciones frecuentes con los ítems de la promo.")
+            else:
+                st.dataframe(companions.head(10).style.format({'confidence': '{:.1%}', 'lift': '{:.2f}'}))
+
     # ==========================================
     # TAB 3: SALUD OPERACIONAL
     # ==========================================
@@ -268,6 +322,85 @@ if DATA_LOADED:
         for _, row in bad_reviews.iterrows():
             st.error(f"**{row['date'].date()} ({row['platform']})**: {row['text']}")
 
+        # Labor productivity: precomputed (date x role x shift_type) cube joined with daily sales
+        st.subheader("👥 Productividad Laboral")
+        with profiler.span('labor.cube', 'step'):
+            labor = get_labor_cube(rrhh, sales, len(rrhh) + len(sales))
+        lcol1, lcol2, lcol3 = st.columns(3)
+        labor_range = lcol1.slider("Periodo", min_value=labor.dates[0].date(), max_value=labor.dates[-1].date(),
+                                   value=(labor.dates[0].date(), labor.dates[-1].date()))
+        labor_roles = lcol2.multiselect("Rol", labor.roles, default=labor.roles)
+        labor_shifts = lcol3.multiselect("Turno", labor.shift_types, default=labor.shift_types)
+        labor_slice = dict(start=labor_range[0], end=labor_range[1], roles=labor_roles, shift_types=labor_shifts)
+
+        total = labor.summary(**labor_slice).iloc[0]
+        k1, k2, k3, k4 = st.columns(4)
+        k1.metric("Venta por Hora-Hombre", f"${total['revenue_per_hour']:,.0f}" if total['hours'] else "—")
+        k2.metric("Ítems por Hora-Hombre", f"{total['items_per_hour']:.2f}" if total['hours'] else "—")
+        k3.metric("Costo Laboral % Venta", f"{total['labor_cost_pct']:.1%}" if total['revenue'] else "—")
+        k4.metric("Horas-Hombre", f"{total['hours']:,.0f}")
+
+        with profiler.span('labor.summary', 'step'):
+            by_weekday = labor.summary('weekday', **labor_slice).reset_index()
+            by_role = labor.summary('role', **labor_slice).reset_index()
+        c1, c2 = st.columns(2)
+        fig_wd = px.bar(by_weekday, x='weekday', y='revenue_per_hour', title="Venta por Hora-Hombre según Día",
+                        labels={'weekday': 'Día', 'revenue_per_hour': 'Venta / Hora ($)'})
+        c1.plotly_chart(fig_wd, use_container_width=True)
+        fig_role = px.bar(by_role, x='role', y='labor_cost_pct', title="Costo Laboral % Venta por Rol",
+                          labels={'role': 'Rol', 'labor_cost_pct': 'Costo / Venta'})
+        fig_role.update_layout(yaxis_tickformat='.0%')
+        c2.plotly_chart(fig_role, use_container_width=True)
+
+        by_month = labor.summary('month', **labor_slice).reset_index()
+        fig_month = px.line(by_month, x='month', y=['revenue_per_hour'], markers=True, title="Venta por Hora-Hombre (Mensual)",
+                            labels={'month': 'Mes', 'value': 'Venta / Hora ($)'})
+        st.plotly_chart(fig_month, use_container_width=True)
+
+        with profiler.span('labor.outlier_days', 'step'):
+            outliers = labor.outlier_days(roles=labor_roles, shift_types=labor_shifts)
+        outliers = outliers[(outliers.index >= pd.Timestamp(labor_range[0])) & (outliers.index <= pd.Timestamp(labor_range[1]))]
+        with st.expander(f"🚩 Días fuera de norma ({len(outliers)})", expanded=False):
+            st.caption("Venta por hora-hombre lejos de lo habitual para ese día de la semana: "
+                       "baja = sobre-dotado, alta = sub-dotado.")
+            table = outliers[['revenue', 'hours', 'revenue_per_hour', 'expected_revenue_per_hour', 'status']].sort_index(ascending=False)
+            table.index = table.index.strftime('%Y-%m-%d') + ' (' + [WEEKDAYS[d] for d in table.index.dayofweek] + ')'
+            table.columns = ['Venta', 'Horas', 'Venta/Hora', 'Venta/Hora Esperada', 'Estado']
+            st.dataframe(table.round(0), use_container_width=True)
+
+        # Table occupancy: reservations + estimated walk-ins vs the dining room's tables
+        st.subheader("🪑 Ocupación de Mesas")
+        st.caption(f"Mesas: {', '.join(f'{n} de {k}' for k, n in TABLES.items())} · reservas (Show/No-Show) + walk-ins estimados.")
+        dwell = st.select_slider("Tiempo en mesa (min)", options=[60, 90, 120, 150], value=DWELL_MINUTES)
+        with profiler.span('occupancy.model', 'step'):
+            occupancy = get_occupancy_model(reservations, df, len(reservations) + len(df), dwell)
+            overbooked = occupancy.overbooked_slots()
+        bad_booking = reviews[reviews['text'].str.contains('No respetaron mi reserva', na=False)]
+        on_overbooked = bad_booking['date'].dt.normalize().isin(overbooked['date'])
+        o1, o2, o3 = st.columns(3)
+        o1.metric("Franjas Sobrevendidas", f"{len(overbooked):,}")
+        o2.metric("Días con Sobreventa", f"{overbooked['date'].nunique():,}")
+        o3.metric("Reseñas 'No respetaron mi reserva'", f"{len(bad_booking)}", f"{on_overbooked.sum()} en días con sobreventa",
+                  delta_color="off")
+
+        heat = pd.crosstab(overbooked['date'].dt.dayofweek.map(dict(enumerate(WEEKDAYS))), overbooked['time'])
+        if not heat.empty:
+            heat = heat.reindex(index=[d for d in WEEKDAYS if d in heat.index])
+            fig_occ = px.imshow(heat, aspect='auto', color_continuous_scale='Reds', title="Franjas sobrevendidas (Día × Hora)",
+                                labels={'x': 'Hora', 'y': 'Día', 'color': 'Franjas'})
+            st.plotly_chart(fig_occ, use_container_width=True)
+
+        st.markdown("**¿Puedo aceptar esta reserva?**")
+        q1, q2, q3 = st.columns(3)
+        q_date = q1.date_input("Fecha", value=occupancy.dates[-1].date(),
+                               min_value=occupancy.dates[0].date(), max_value=occupancy.dates[-1].date())
+        q_time = q2.selectbox("Hora", list(occupancy.slot_labels()), index=list(occupancy.slot_labels()).index('21:00'))
+        q_pax = q3.number_input("Personas", min_value=1, max_value=20, value=8)
+        if occupancy.can_accept(q_date, q_time, q_pax):
+            st.success(f"✅ Hay mesa para {q_pax} personas el {q_date} a las {q_time} ({dwell} min).")
+        else:
+            st.error(f"❌ Sin mesa para {q_pax} personas el {q_date} a las {q_time}: se sobrevendería.")
+
     # ==========================================
     # TAB 4: HISTORIA & TENDENCIAS
     # ==========================================
@@ -283,7 +416,8 @@ if DATA_LOADED:
             st.subheader("Evolución de Ventas")
             
             # Monthly Aggregation
-            sales_monthly = df.set_index('date').resample('M')['target_revenue'].sum().reset_index()
+            with profiler.span('history.sales_monthly', 'step'):
+                sales_monthly = df.set_index('date').resample('M')['target_revenue'].sum().reset_index()
             
             fig_sales = px.line(sales_monthly, x='date', y='target_revenue', title="Venta Mensual (3 Años)", markers=True)
             fig_sales.update_yaxes(title="Venta Total ($)")
@@ -305,7 +439,8 @@ if DATA_LOADED:
             col1, col2 = st.columns(2)
             
             # Total Waste Cost over time (Monthly)
-            waste_monthly = mermas.set_index('date').resample('M')['value_lost_clp'].sum().reset_index()
+            with profiler.span('history.waste_monthly', 'step'):
+                waste_monthly = mermas.set_index('date').resample('M')['value_lost_clp'].sum().reset_index()
             fig_waste_trend = px.area(waste_monthly, x='date', y='value_lost_clp', title="Costo de Mermas Mensual", color_discrete_sequence=['red'])
             col1.plotly_chart(fig_waste_trend, use_container_width=True)
             
@@ -354,7 +489,71 @@ if DATA_LOADED:
             st.plotly_chart(fig_reviews, use_container_width=True) # type: ignore
 
     # ==========================================
-    # TAB 5: ASISTENTE VIRTUAL (GEMINI)
+    # TAB 5: CUENTAS POR PAGAR
+    # ==========================================
+    elif view_mode == "💳 Cuentas por Pagar":
+        st.title("💳 Cuentas por Pagar & Flujo de Caja")
+        st.markdown("¿Cuánto le debes a cada proveedor y cuándo vence? Proyección de caja día a día.")
+
+        with profiler.span('payables.sync', 'data'):
+            ledger = get_payables_ledger()
+            ledger.sync_csv('compras.csv')
+        last_po_day = ledger.start + timedelta(days=len(ledger.received) - 1)
+
+        col_a, col_b, col_c = st.columns(3)
+        as_of = pd.Timestamp(col_a.date_input("Fecha de corte", value=sales['date'].max().date(),
+                                              min_value=ledger.start.date(), max_value=last_po_day.date()))
+        horizon = col_b.slider("Días a proyectar", 7, 90, 30)
+        opening_cash = col_c.number_input("Caja inicial ($)", value=0, step=500000)
+        end = as_of + timedelta(days=horizon)
+
+        # KPIs
+        owed = ledger.outstanding(as_of)
+        upcoming = ledger.due_calendar(as_of + timedelta(days=1), end)
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Deuda Total con Proveedores", f"${owed.sum():,.0f}")
+        col2.metric("Vence Próximos 7 Días", f"${upcoming.iloc[:7].values.sum():,.0f}")
+        col3.metric(f"Vence Próximos {horizon} Días", f"${upcoming.values.sum():,.0f}")
+
+        # Due-date calendar per supplier
+        st.subheader("📅 Calendario de Vencimientos")
+        weekly_due = upcoming.resample('W-MON', label='left', closed='left').sum()
+        weekly_due = weekly_due.loc[:, weekly_due.sum() > 0].reset_index().melt(id_vars='index', var_name='Proveedor', value_name='Monto')
+        fig_due = px.bar(weekly_due, x='index', y='Monto', color='Proveedor', title="Pagos por Semana y Proveedor", barmode='stack')
+        fig_due.update_layout(xaxis_title="Semana", yaxis_title="Monto ($)")
+        st.plotly_chart(fig_due, use_container_width=True)
+
+        cumulative = ledger.cumulative_obligations(as_of + timedelta(days=1), end)
+        fig_cum = px.area(cumulative.reset_index().melt(id_vars='index', var_name='Proveedor', value_name='Acumulado'),
+                          x='index', y='Acumulado', color='Proveedor', title="Obligaciones Acumuladas")
+        fig_cum.update_layout(xaxis_title="Fecha", yaxis_title="Acumulado ($)")
+        st.plotly_chart(fig_cum, use_container_width=True)
+
+        # Cash position (actual revenue where known, projection after)
+        st.subheader("💰 Posición de Caja Proyectada")
+        with profiler.span('payables.cash_position', 'step'):
+            revenue = projected_revenue(daily_revenue(sales, len(sales)), end)
+            cash = cash_position(ledger, revenue, as_of + timedelta(days=1), end, opening_cash)
+        fig_cash = go.Figure()
+        fig_cash.add_bar(x=cash.index, y=-cash['payments_out'], name='Pagos', marker_color='red')
+        fig_cash.add_bar(x=cash.index, y=cash['revenue_in'], name='Ventas', marker_color='green')
+        fig_cash.add_scatter(x=cash.index, y=cash['cash'], name='Caja', mode='lines+markers')
+        fig_cash.update_layout(barmode='relative', yaxis_title="CLP ($)")
+        st.plotly_chart(fig_cash, use_container_width=True)
+        if cash['cash'].min() < 0:
+            st.error(f"⚠️ La caja queda negativa el {cash['cash'].idxmin().date()} (${cash['cash'].min():,.0f}).")
+
+        st.subheader("🏢 Deuda por Proveedor")
+        supplier_table = pd.DataFrame({
+            'Proveedor': owed.index,
+            'Deuda Actual': owed.values,
+            'Vence 7 Días': upcoming.iloc[:7].sum().reindex(owed.index).values,
+            f'Vence {horizon} Días': upcoming.sum().reindex(owed.index).values
+        }).sort_values('Deuda Actual', ascending=False)
+        st.dataframe(supplier_table, hide_index=True, use_container_width=True)
+
+    # ==========================================
+    # TAB 6: ASISTENTE VIRTUAL (GEMINI)
     # ==========================================
     elif view_mode == "🤖 Asistente Virtual":
         st.title("🤖 Asistente Virtual (Powered by Gemini)")
@@ -364,133 +563,14 @@ if DATA_LOADED:
         api_key = st.secrets.get("GEMINI_API_KEY")
         if not api_key:
             api_key = st.sidebar.text_input("Ingresa tu Gemini API Key:", type="password", help="Consíguela en aistudio.google.com")
-        
-        # 2. Context Builder Function
-        def get_dashboard_context(df, sales, mermas, reviews, recipes, rrhh, reservations):
-            # --- 1. GENERAL METRICS (3 Years) ---
-            total_rev = df['target_revenue'].sum()
-            avg_daily_rev = df['target_revenue'].mean()
-            total_days = df['date'].nunique()
-            
-            # --- 2. MONTHLY ANALYSIS (Best/Worst) ---
-            # Group Sales by Month
-            df['month_str'] = df['date'].dt.to_period('M').astype(str)
-            monthly_sales = df.groupby('month_str')['target_revenue'].sum().reset_index()
-            
-            best_month_row = monthly_sales.loc[monthly_sales['target_revenue'].idxmax()]
-            worst_month_row = monthly_sales.loc[monthly_sales['target_revenue'].idxmin()]
-            
-            # Group Waste by Month
-            mermas['month_str'] = mermas['date'].dt.to_period('M').astype(str)
-            monthly_waste = mermas.groupby('month_str')['value_lost_clp'].sum().reset_index()
-            
-            # Merge to find waste for best/worst sales months
-            def get_waste_for_month(m_str):
-                row = monthly_waste[monthly_waste['month_str'] == m_str]
-                return row['value_lost_clp'].values[0] if not row.empty else 0
-                
-            waste_at_best = get_waste_for_month(best_month_row['month_str'])
-            waste_at_worst = get_waste_for_month(worst_month_row['month_str'])
-
-            # --- 3. MENU ENGINEERING (Stars/Dogs) ---
-            item_stats = sales.groupby('item_name').agg({'qty_sold': 'sum', 'revenue': 'sum'}).reset_index()
-            top_5_items = item_stats.sort_values('revenue', ascending=False).head(5)
-            bottom_5_items = item_stats.sort_values('revenue', ascending=True).head(5)
-            
-            stars_str = ", ".join([f"{r['item_name']} (${r['revenue']:,.0f})" for _, r in top_5_items.iterrows()])
-            dogs_str = ", ".join([f"{r['item_name']} (${r['revenue']:,.0f})" for _, r in bottom_5_items.iterrows()])
-
-            # --- 4. CALENDAR PATTERNS ---
-            dow_map = {0:'Lunes', 1:'Martes', 2:'Miércoles', 3:'Jueves', 4:'Viernes', 5:'Sábado', 6:'Domingo'}
-            df['day_name'] = df['day_of_week'].map(dow_map)
-            dow_sales = df.groupby('day_name')['target_revenue'].mean().sort_values(ascending=False)
-            best_day = dow_sales.index[0]
-            worst_day = dow_sales.index[-1]
-
-            # --- 5. RECENT TRENDS (Last 6 Months) ---
-            last_6_months = monthly_sales.tail(6)
-            trend_str = ", ".join([f"{r['month_str']}: ${r['target_revenue']:,.0f}" for _, r in last_6_months.iterrows()])
-            
-            # --- 6. FULL RECIPE DATABASE (Injecting all rows) ---
-            recipes_str = recipes.to_csv(index=False)
-
-            # --- 7. FINANCIAL SUMMARY (Monthly per Item) ---
-            # 7.1 Prepare Monthly Sales
-            sales['month_str'] = sales['date'].dt.to_period('M').astype(str)
-            sales_monthly = sales.groupby(['item_name', 'month_str']).agg({
-                'qty_sold': 'sum',
-                'revenue': 'sum'
-            }).reset_index()
-
-            # 7.2 Prepare Monthly Waste
-            mermas['month_str'] = mermas['date'].dt.to_period('M').astype(str)
-            waste_monthly = mermas.groupby(['item_name', 'month_str'])['value_lost_clp'].sum().reset_index()
-            waste_monthly.rename(columns={'value_lost_clp': 'total_waste'}, inplace=True)
-
-            # 7.3 Merge Sales + Waste + Recipes
-            fin_df = pd.merge(sales_monthly, recipes[['item_name', 'cost_clp']], on='item_name', how='left')
-            fin_df = pd.merge(fin_df, waste_monthly, on=['item_name', 'month_str'], how='left')
-            
-            # Fill NaNs
-            fin_df['cost_clp'] = fin_df['cost_clp'].fillna(0)
-            fin_df['total_waste'] = fin_df['total_waste'].fillna(0)
-            
-            # 7.4 Calculate Monthly Profit
-            fin_df['total_cost'] = fin_df['qty_sold'] * fin_df['cost_clp']
-            fin_df['final_profit'] = fin_df['revenue'] - fin_df['total_cost'] - fin_df['total_waste']
-            fin_df['profit_margin_pct'] = (fin_df['final_profit'] / fin_df['revenue'] * 100).fillna(0).round(1)
-            
-            fin_csv_str = fin_df[['month_str', 'item_name', 'revenue', 'total_cost', 'total_waste', 'final_profit']].to_csv(index=False)
-
-            # --- 8. OPERATIONAL DATA (Staffing & Reservations) ---
-            # 8.1 Staffing Analysis (RRHH)
-            # Calculate simple efficiency metrics
-            staff_daily_cost = rrhh.groupby('date')['total_pay'].sum().mean()
-            staff_daily_hours = rrhh.groupby('date')['hours_worked'].sum().mean()
-            staff_role_counts = rrhh['role'].value_counts().to_string() # How many shifts by role historically
-            
-            # 8.2 Future Reservations (Simulated "Next 7 Days" from end of data)
-            last_date = reservations['date'].max()
-            last_week_reservations = reservations[reservations['date'] > (last_date - pd.Timedelta(days=7))]
-            res_count_next_week = len(last_week_reservations)
-            res_pax_next_week = last_week_reservations['pax'].sum()
-            busiest_res_day = last_week_reservations['date'].dt.day_name().mode()[0] if not last_week_reservations.empty else "N/A"
-
-            context = f"""
-            Eres el 'Gerente de Datos' de 'Estación La Serena'. Tu trabajo es dar respuestas EXACTAS y TÁCTICAS al dueño.
-            
-            MEMORIA OPERATIVA:
-            - El dueño ODIA las respuestas vagas. Quiere números.
-            - Siempre analiza la RENTABILIDAD REAL (Venta - Costo - Merma).
-            - Usa emojis para resaltar puntos clave 🔴🟢⚠️.
-
-            DATOS FINANCIEROS CLAVE (3 AÑOS):
-            - Venta Total: ${total_rev:,.0f}
-            - Promedio Diario Venta: ${avg_daily_rev:,.0f}
-            
-            DATOS OPERATIVOS (RRHH & CAPACIDAD):
-            - Costo Promedio Diario Personal: ${staff_daily_cost:,.0f} (aprox {staff_daily_hours:.1f} horas hombre/día).
-            - Distribución de Turnos Histórica: 
-            {staff_role_counts}
-            
-            RESERVAS Y DEMANDA (SIMULACIÓN PRÓXIMA SEMANA):
-            - Reservas Agendadas: {res_count_next_week} mesas ({res_pax_next_week} personas).
-            - Día más solicitado: {busiest_res_day}.
-            *Nota: Si hay muchas reservas y el costo de personal es bajo ese día, SUGIERE reforzar turnos.*
 
-            TABLA DE RENTABILIDAD MENSUAL POR PLATO (CSV):
-            (Usa esta tabla para ver tendencias de ganancias, no solo ingresos).
-            {fin_csv_str}
-
-            BASE DE DATOS DE RECETAS (FICHA TÉCNICA):
-            {recipes_str}
-
-            Instrucciones Específicas:
-            1. **Rentabilidad**: Si preguntan "¿Qué plato gano más?" responde con la GANANCIA (Profit), no la Venta (Revenue).
-            2. **Personal**: Si preguntan por eficiencia, compara Venta Diaria vs Costo Diario de Personal. Si la venta es alta y el costo personal bajo, es un día eficiente (o estresante).
-            3. **Mermas**: Siempre menciona cuánto dinero se perdió en mermas si el plato es un "Perro".
-            """
-            return context
+        # Answer cache (repeated questions skip context build + Gemini call)
+        answer_cache = get_answer_cache()
+        data_version = compute_data_version(DATA_FILES)
+        use_similar = st.sidebar.checkbox("Reusar respuestas a preguntas similares", value=False,
+                                          help="Misma pregunta con otras palabras de relleno u orden; cualquier otro cambio (año, mes, plato) se vuelve a preguntar")
+        
+        # 2. Context Builder: dashboard_data.get_dashboard_context (labor cube from the app cache)
 
         # 3. Chat Logic
         if "messages" not in st.session_state:
@@ -509,7 +589,10 @@ if DATA_LOADED:
             st.session_state.messages.append({"role": "user", "content": prompt})
             
             # Generate Response
-            if not api_key:
+            cached_answer = answer_cache.get(prompt, data_version, fuzzy=use_similar)
+            if cached_answer is not None:
+                response_text = cached_answer
+            elif not api_key:
                 response_text = "⚠️ Por favor ingresa tu API Key de Google Gemini en la barra lateral para que pueda responderte."
             else:
                 try:
@@ -518,7 +601,8 @@ if DATA_LOADED:
                     # Attempt to find a supported model dynamically
                     active_model_name = 'gemini-pro' # Default fallback
                     try:
-                        available_models = [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
+                        with profiler.span('gemini.list_models', 'llm'):
+                            available_models = [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
                         # Prefer 1.5 Flash, then Pro, then whatever is available
                         preferences = ['models/gemini-1.5-flash', 'models/gemini-pro', 'models/gemini-1.0-pro']
                         
@@ -539,7 +623,9 @@ if DATA_LOADED:
 
                     model = genai.GenerativeModel(active_model_name)
                     
-                    context = get_dashboard_context(df, sales, mermas, reviews, recipes, rrhh, reservations)
+                    with profiler.span('get_dashboard_context', 'step'):
+                        context = get_dashboard_context(df, sales, mermas, reviews, recipes, rrhh, reservations,
+                                                        get_labor_cube(rrhh, sales, len(rrhh) + len(sales)))
 
                     
                         
@@ -547,9 +633,10 @@ if DATA_LOADED:
                         
                     full_prompt = f"{context}\n\nPregunta del Usuario: {prompt}"
                     
-                    with st.spinner("Pensando..."):
+                    with st.spinner("Pensando..."), profiler.span('gemini.generate_content', 'llm', model=active_model_name):
                         response = model.generate_content(full_prompt)
                         response_text = response.text
+                    answer_cache.put(prompt, data_version, response_text)
                 except Exception as e:
                     response_text = f"❌ Error al conectar con Gemini: {str(e)}"
             
@@ -558,5 +645,37 @@ if DATA_LOADED:
                 st.markdown(response_text)
             st.session_state.messages.append({"role": "assistant", "content": response_text})
 
+        # Cache stats (after answering so the current question is counted)
+        st.sidebar.metric(
+            "Cache Asistente (tasa de aciertos)",
+            f"{answer_cache.hit_rate():.0%}",
+            help=f"{answer_cache.stats['hits']} aciertos / {answer_cache.stats['misses']} fallos, {len(answer_cache.entries)} respuestas guardadas"
+        )
+
+    profiler.end(view_span)
+
 else:
     st.warning("Cargando datos... si esto persiste, verifica que los archivos CSV existan.")
+
+# ==========================================
+# DIAGNÓSTICO (PROFILING)
+# ==========================================
+st.sidebar.markdown("---")
+if st.sidebar.checkbox("🩺 Diagnóstico", key='diagnostico', help="Tiempos de carga, cálculos, gráficos y llamadas a Gemini de esta vista"):
+    # Before measuring memory: the panel's own work is not part of the render
+    spans, totals = profiler.table(), profiler.totals()
+    if DATA_LOADED:
+        profiler.record_memory(df=df, sales=sales, recipes=recipes, reviews=reviews,
+                               mermas=mermas, rrhh=rrhh, reservations=reservations)
+    if spans.empty:
+        st.sidebar.caption("Activa el panel y vuelve a cargar la vista para medirla.")
+    else:
+        st.sidebar.metric("Render de la vista", f"{spans['start_ms'].add(spans['duration_ms']).max():,.0f} ms")
+        st.sidebar.caption(" · ".join(f"{kind}: {ms:,.0f} ms" for kind, ms in totals.sort_values(ascending=False).items()))
+        st.sidebar.dataframe(spans[['name', 'kind', 'duration_ms']].round(1), hide_index=True, use_container_width=True)
+    if profiler.memory is not None:
+        st.sidebar.caption(f"Memoria DataFrames: {profiler.memory['MB'].sum():,.1f} MB")
+        st.sidebar.dataframe(profiler.memory[['rows', 'MB']].round(2), use_container_width=True)
+    st.sidebar.download_button("⬇️ Exportar traza (JSON)", json.dumps(profiler.trace(), indent=1),
+                               file_name=f"traza_{datetime.now():%Y%m%d_%H%M%S}.json", mime="application/json",
+                               help="Formato Chrome trace: ábrelo en chrome://tracing o ui.perfetto.dev")
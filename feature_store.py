@@ -0,0 +1,323 @@
+"""
+Incremental daily feature store
+Keeps the per-day table behind dataset_ml_diario.csv persisted
+(feature_store.pkl) so new sales only touch the days they belong to:
+
+  - daily aggregates are kept as mergeable partial states (sums, counts,
+    maxima), so late rows for a stored day are folded in without re-reading
+    its history
+  - lag (t-1, t-7, t-28) and rolling (7d, 30d) revenue features of appended
+    days come from a ring buffer with the last RING_SIZE daily revenues
+  - editing a stored day recomputes only the rows whose lags/windows reach it
+
+ml_dataset() returns the same frame as the batch build of prepare_features.py.
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from daily_aggregates import CHUNK_ROWS
+from incremental_csv import AppendedRows
+from promo_engine import PromotionEngine
+
+STORE_PATH = 'feature_store.pkl'
+SALES_PATH = 'ventas_sinteticas_3anos.csv'
+RESERVAS_PATH = 'reservas.csv'
+PROMOS_PATH = 'promociones_reales.json'
+STORE_VERSION = 1
+
+LAGS = (1, 7, 28)
+ROLLING_WINDOWS = (7, 30)
+RING_SIZE = max(LAGS + ROLLING_WINDOWS)
+
+# Partial state column -> (sales column, how it merges)
+SALES_PARTIALS = {
+    'target_revenue': ('revenue', 'sum'),
+    'qty_sold': ('qty_sold', 'sum'),
+    'weather_temp': ('weather_temp', 'max'),  # Assuming max temp for day
+    'is_weekend': ('is_weekend', 'max'),
+    'is_holiday': ('is_holiday', 'max'),
+    'traffic_sum': ('foot_traffic_estimate', 'sum'),   # mean = sum / count
+    'traffic_count': ('foot_traffic_estimate', 'count'),
+}
+RESERVAS_PARTIALS = {
+    'num_reservations': ('reservation_id', 'count'),
+    'reserved_pax': ('pax', 'sum'),
+}
+SALES_COLUMNS = ['date'] + list(dict.fromkeys(col for col, _ in SALES_PARTIALS.values()))
+RESERVAS_COLUMNS = ['date'] + [col for col, _ in RESERVAS_PARTIALS.values()]
+LAG_COLUMNS = [f'revenue_t-{k}' for k in LAGS] + [f'rolling_{w}d_avg' for w in ROLLING_WINDOWS]
+
+# Column order of dataset_ml_diario.csv
+FEATURE_COLUMNS = [
+    'date', 'target_revenue', 'qty_sold', 'weather_temp', 'is_weekend', 'is_holiday',
+    'foot_traffic_estimate', 'num_reservations', 'reserved_pax', 'day_of_week', 'month',
+    'day_of_month', 'promo_pizza_tuesday', 'promo_ladies_thursday', 'promo_happy_hour'
+] + LAG_COLUMNS
+# Stored per day: partial states + features (partials double as features where they coincide)
+STORE_COLUMNS = list(dict.fromkeys(list(SALES_PARTIALS) + FEATURE_COLUMNS[1:]))
+
+
+def aggregate_partials(rows, partials):
+    """Per-date partial states of a batch of raw rows"""
+    rows = rows.assign(date=pd.to_datetime(rows['date']))
+    return rows.groupby('date').agg(**{name: (col, how) for name, (col, how) in partials.items()})
+
+
+def merge_partials(old, new, partials):
+    """Combine two partial-state frames indexed by date (dates in either)"""
+    old, new = old.align(new, join='outer')
+    merged = {}
+    for name, (_, how) in partials.items():
+        pair = pd.concat([old[name], new[name]], axis=1)
+        merged[name] = pair.max(axis=1) if how == 'max' else pair.sum(axis=1, min_count=1)
+    return pd.DataFrame(merged, index=old.index)
+
+
+class RevenueRing:
+    """Fixed-size ring with the last `size` daily revenues"""
+
+    def __init__(self, size=RING_SIZE, values=()):
+        self.values = np.zeros(size)
+        self.head = 0   # Slot of the next push
+        self.count = 0
+        for v in values:
+            self.push(v)
+
+    def push(self, value):
+        self.values[self.head] = value
+        self.head = (self.head + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+
+    def lag(self, k):
+        """Revenue k days back (k=1: last pushed)"""
+        if k > self.count:
+            return np.nan
+        return self.values[(self.head - k) % len(self.values)]
+
+    def mean(self, window):
+        if window > self.count:
+            return np.nan
+        idx = (self.head - window + np.arange(window)) % len(self.values)  # Oldest first
+        return self.values[idx].sum() / window
+
+
+class FeatureStore:
+    """
+    days: one row per sales day (sorted), partial states + feature columns
+    reservations: reservation partial states per date (also days without sales)
+    """
+
+    def __init__(self, path=STORE_PATH, promos_path=PROMOS_PATH):
+        self.path = path
+        with open(promos_path, 'r', encoding='utf-8') as f:
+            promos = json.load(f)
+        self.promo_engine = PromotionEngine(promos)
+        self.promo_version = hashlib.sha1(json.dumps(promos, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.days = self._blank_days(pd.DatetimeIndex([], name='date'))
+        self.reservations = pd.DataFrame(columns=list(RESERVAS_PARTIALS), dtype=float)
+        self.reservations.index = pd.DatetimeIndex([], name='date')
+        self.ring = RevenueRing()
+        self.cursors = {'sales': None, 'reservas': None}
+
+    @staticmethod
+    def _blank_days(dates, partials=None):
+        days = pd.DataFrame(np.nan, index=pd.DatetimeIndex(dates, name='date'), columns=STORE_COLUMNS)
+        if partials is not None:
+            days[list(SALES_PARTIALS)] = partials[list(SALES_PARTIALS)].values.astype(float)
+        return days
+
+    # --- persistence ---
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            state = pd.read_pickle(self.path)
+        except Exception:
+            return  # Corrupt store is simply rebuilt
+        if state.get('version') != STORE_VERSION:
+            return
+        self.days = state['days']
+        self.reservations = state['reservations']
+        self.cursors = state['cursors']
+        self.ring = RevenueRing(values=self.days['target_revenue'].values[-RING_SIZE:])
+        if state.get('promo_version') != self.promo_version:
+            self._refresh_base(self.days.index)  # Promo calendar edited: flags only
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + '.tmp'
+        pd.to_pickle({
+            'version': STORE_VERSION, 'promo_version': self.promo_version, 'days': self.days,
+            'reservations': self.reservations, 'cursors': self.cursors
+        }, tmp_path)
+        os.replace(tmp_path, self.path)
+
+    # --- updating ---
+    def _base_features(self, days):
+        """Non-lag features of `days` (partial states, DatetimeIndex) as a frame"""
+        dates = days.index
+        res = self.reservations.reindex(dates).fillna(0)
+        promo_flags = self.promo_engine.day_flags(dates)
+        is_holiday = days['is_holiday'].values.astype(int)
+        return pd.DataFrame({
+            'foot_traffic_estimate': days['traffic_sum'].values / days['traffic_count'].values,
+            'num_reservations': res['num_reservations'].values,
+            'reserved_pax': res['reserved_pax'].values,
+            'day_of_week': dates.dayofweek.values,
+            'month': dates.month.values,
+            'day_of_month': dates.day.values,
+            'promo_pizza_tuesday': promo_flags['pizza_libre'].values.astype(int),
+            'promo_ladies_thursday': promo_flags['ladies_night_50'].values.astype(int),
+            'promo_happy_hour': (promo_flags['after_office_2x1'].values & (is_holiday == 0)).astype(int),
+        }, index=dates, dtype=float)
+
+    def _refresh_base(self, dates):
+        """Recompute the non-lag features of stored days from their partial states"""
+        if len(dates) == 0:
+            return
+        base = self._base_features(self.days.loc[pd.DatetimeIndex(dates)])
+        self.days.loc[base.index, list(base.columns)] = base.values
+
+    def _recompute_lags(self, start_pos, end_pos):
+        """Lag/rolling features of rows start_pos..end_pos (inclusive) from the stored revenues"""
+        end_pos = min(end_pos, len(self.days) - 1)
+        if start_pos > end_pos:
+            return 0
+        lo = max(0, start_pos - RING_SIZE)
+        revenue = self.days['target_revenue'].iloc[lo:end_pos + 1]
+        window = pd.DataFrame(index=revenue.index)
+        for k in LAGS:
+            window[f'revenue_t-{k}'] = revenue.shift(k)
+        for w in ROLLING_WINDOWS:
+            window[f'rolling_{w}d_avg'] = revenue.shift(1).rolling(window=w).mean()
+        rows = self.days.index[start_pos:end_pos + 1]
+        self.days.loc[rows, LAG_COLUMNS] = window.loc[rows, LAG_COLUMNS].values
+        return len(rows)
+
+    def _append_days(self, partials):
+        """New days after the last stored one: base features + lags from the ring"""
+        new = self._blank_days(partials.index, partials)
+        base = self._base_features(new)
+        new[list(base.columns)] = base.values
+        lag_values = np.empty((len(new), len(LAG_COLUMNS)))
+        for i, revenue in enumerate(new['target_revenue'].values):
+            lag_values[i] = [self.ring.lag(k) for k in LAGS] + [self.ring.mean(w) for w in ROLLING_WINDOWS]
+            self.ring.push(revenue)
+        new[LAG_COLUMNS] = lag_values
+        self.days = pd.concat([self.days, new]) if len(self.days) else new
+
+    def ingest(self, sales_rows=None, reservas_rows=None):
+        """
+        Fold raw sales / reservation rows (any dates) into the store.
+        Returns {'new_days', 'updated_days', 'recomputed_rows'}
+        """
+        stats = {'new_days': 0, 'updated_days': 0, 'recomputed_rows': 0}
+        touched = pd.DatetimeIndex([])
+        history_changed = False
+
+        if reservas_rows is not None and len(reservas_rows):
+            res = aggregate_partials(reservas_rows, RESERVAS_PARTIALS)
+            self.reservations = merge_partials(self.reservations, res, RESERVAS_PARTIALS)
+            touched = touched.union(res.index.intersection(self.days.index))
+
+        if sales_rows is not None and len(sales_rows):
+            sales = aggregate_partials(sales_rows, SALES_PARTIALS)
+            last = self.days.index.max() if len(self.days) else None
+            stored = sales.index.isin(self.days.index)
+            appended = sales[~stored] if last is None else sales[sales.index > last]
+            backfilled = sales[~stored & ~sales.index.isin(appended.index)]
+
+            # 1. Late rows of stored days: merge partial states
+            if stored.any():
+                updated = sales[stored]
+                old_revenue = self.days.loc[updated.index, 'target_revenue']
+                merged = merge_partials(self.days.loc[updated.index, list(SALES_PARTIALS)], updated, SALES_PARTIALS)
+                self.days.loc[merged.index, list(SALES_PARTIALS)] = merged.values.astype(float)
+                touched = touched.union(updated.index)
+                stats['updated_days'] += len(updated)
+                changed = updated.index[(merged['target_revenue'] != old_revenue).values]
+                if len(changed):
+                    history_changed = True
+                    # Row t only looks back RING_SIZE rows: later rows are untouched
+                    positions = self.days.index.get_indexer(changed)
+                    stats['recomputed_rows'] += self._recompute_lags(positions.min() + 1, positions.max() + RING_SIZE)
+
+            # 2. Days missing in the middle of the history: every later row shifts
+            if len(backfilled):
+                new = self._blank_days(backfilled.index, backfilled)
+                self.days = pd.concat([self.days, new]).sort_index()
+                touched = touched.union(backfilled.index)
+                stats['new_days'] += len(backfilled)
+                history_changed = True
+                first = self.days.index.get_indexer(backfilled.index).min()
+                stats['recomputed_rows'] += self._recompute_lags(first, len(self.days) - 1)
+
+            if history_changed:
+                self.ring = RevenueRing(values=self.days['target_revenue'].values[-RING_SIZE:])
+
+            # 3. Days after the last stored one: ring buffer, O(1) per day
+            if len(appended):
+                self._append_days(appended.sort_index())
+                stats['new_days'] += len(appended)
+
+        self._refresh_base(touched)
+        return stats
+
+    def sync_csv(self, sales_path=SALES_PATH, reservas_path=RESERVAS_PATH, chunksize=CHUNK_ROWS):
+        """
+        Fold rows appended to the sales / reservations CSVs since the last
+        sync. A different, shrunk or rewritten file triggers a full rebuild.
+        """
+        sales = AppendedRows(sales_path, self.cursors['sales'], chunksize, usecols=SALES_COLUMNS)
+        res = AppendedRows(reservas_path, self.cursors['reservas'], chunksize, usecols=RESERVAS_COLUMNS)
+        rebuilt = sales.rebuilt or res.rebuilt
+        if rebuilt:
+            self._reset()
+            # Re-read both files from the start: the store was dropped
+            sales = AppendedRows(sales_path, None, chunksize, usecols=SALES_COLUMNS)
+            res = AppendedRows(reservas_path, None, chunksize, usecols=RESERVAS_COLUMNS)
+
+        # Reservations first so appended days see their bookings; chunked so a
+        # first sync of a large export never holds the whole file in memory
+        stats = {'new_days': 0, 'updated_days': 0, 'recomputed_rows': 0}
+        for chunk in res:
+            chunk_stats = self.ingest(reservas_rows=chunk)
+            stats = {k: stats[k] + chunk_stats[k] for k in stats}
+        for chunk in sales:
+            chunk_stats = self.ingest(sales_rows=chunk)
+            stats = {k: stats[k] + chunk_stats[k] for k in stats}
+        stats['rebuilt'] = rebuilt
+
+        if (sales.cursor, res.cursor) != (self.cursors['sales'], self.cursors['reservas']):
+            self.cursors = {'sales': sales.cursor, 'reservas': res.cursor}
+            self._save()
+        return stats
+
+    # --- queries ---
+    def ml_dataset(self):
+        """Same frame (columns, dtypes, rows) as the batch build of prepare_features.py"""
+        days = self.days.dropna(subset=LAG_COLUMNS)
+        out = pd.DataFrame({'date': days.index}, index=days.index)
+        for col in FEATURE_COLUMNS[1:]:
+            out[col] = days[col]
+        int_cols = ['target_revenue', 'qty_sold', 'is_weekend', 'is_holiday',
+                    'promo_pizza_tuesday', 'promo_ladies_thursday', 'promo_happy_hour']
+        out[int_cols] = out[int_cols].astype('int64')
+        out[['day_of_week', 'month', 'day_of_month']] = out[['day_of_week', 'month', 'day_of_month']].astype('int32')
+        return out.reset_index(drop=True)
+
+
+def load_store(sales_path=SALES_PATH, reservas_path=RESERVAS_PATH, path=STORE_PATH):
+    """Store synced with the CSVs on disk (only appended rows are parsed)"""
+    store = FeatureStore(path)
+    store.sync_csv(sales_path, reservas_path)
+    return store
@@ -0,0 +1,157 @@
+"""
+Multi-branch load-test dataset generator
+Drives the existing generators to build a branch-partitioned dataset at a
+given scale factor (branches x years x traffic multiplier):
+
+    loadtest/b{branches}_y{years}_t{traffic}/
+        manifest.json
+        branch=B01/ ventas_sinteticas_3anos.csv, mermas.csv, rrhh_turnos.csv,
+                    reviews_clientes.csv, reservas.csv, compras.csv, dataset_ml_diario.csv
+        branch=B02/ ...
+
+Each branch directory has the same file names as the project root, so any
+script or dashboard can be pointed at one branch by running it from there.
+This is the standard input for performance tests.
+
+Usage:
+    python generate_load_test_data.py --branches 20 --years 10 --traffic 1.5 --workers 4
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import generate_synthetic_data_v2 as gen_v2
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Static inputs every branch directory needs
+SHARED_FILES = ['promociones_reales.json', 'ficha_tecnica.csv']
+
+# Downstream generators, run in order inside each branch directory
+PIPELINE_STAGES = [
+    ('operations', 'generate_operations.py'),   # rrhh_turnos, reviews_clientes, reservas
+    ('purchases', 'generate_purchases_v2.py'),  # compras
+    ('features', 'prepare_features.py'),        # dataset_ml_diario
+]
+
+
+def scale_dir(root, branches, years, traffic):
+    return os.path.join(root, f"b{branches}_y{years}_t{traffic:g}")
+
+
+def run_stage(script, branch_dir):
+    """Run a generator script with the branch directory as working directory"""
+    t0 = time.perf_counter()
+    with open(os.path.join(branch_dir, 'pipeline.log'), 'a', encoding='utf-8') as log:
+        subprocess.run(
+            [sys.executable, os.path.join(PROJECT_DIR, script)],
+            cwd=branch_dir, stdout=log, stderr=subprocess.STDOUT, check=True
+        )
+    return time.perf_counter() - t0
+
+
+def build_branch(task):
+    """
+    Generate every table for one branch.
+    task: (branch_index, out_dir, dates, traffic, seed, batch_size) - picklable for the process pool
+    """
+    branch_index, out_dir, dates, traffic, seed, batch_size = task
+    branch_id = f"B{branch_index + 1:02d}"
+    branch_dir = os.path.join(out_dir, f"branch={branch_id}")
+    os.makedirs(branch_dir, exist_ok=True)
+
+    for name in SHARED_FILES:
+        shutil.copy(os.path.join(PROJECT_DIR, name), branch_dir)
+
+    # Branch-specific popularity: perturb item weights so branches differ
+    _, items_summary = gen_v2.load_items_summary(os.path.join(PROJECT_DIR, 'ventas_historicas_3anos.csv'))
+    branch_rng = np.random.default_rng([seed, branch_index, 1])
+    items_summary = items_summary.copy()
+    items_summary['quantity'] = items_summary['quantity'] * branch_rng.uniform(0.7, 1.3, len(items_summary))
+    ficha_df = pd.read_csv(os.path.join(PROJECT_DIR, 'ficha_tecnica.csv'))
+
+    timings = {}
+    stats = gen_v2.stream_dataset(
+        dates, items_summary, ficha_df,
+        sales_name=os.path.join(branch_dir, 'ventas_sinteticas_3anos'),
+        mermas_name=os.path.join(branch_dir, 'mermas'),
+        seed=[seed, branch_index], batch_size=batch_size, traffic_multiplier=traffic
+    )
+    timings['sales_mermas'] = stats['seconds']
+
+    for stage, script in PIPELINE_STAGES:
+        timings[stage] = run_stage(script, branch_dir)
+
+    rows = {}
+    for name in sorted(os.listdir(branch_dir)):
+        if name.endswith('.csv') and name not in SHARED_FILES:
+            with open(os.path.join(branch_dir, name), 'rb') as f:
+                rows[name] = sum(1 for _ in f) - 1
+    return {'branch_id': branch_id, 'seconds': timings, 'rows': rows}
+
+
+def build_load_test_dataset(branches=1, years=3, traffic=1.0, seed=42, workers=1,
+                            root='loadtest', end='2025-12-31', batch_size=50000):
+    """
+    Build the branch-partitioned dataset and its manifest.json.
+    Returns (out_dir, manifest)
+    """
+    end_date = pd.Timestamp(end)
+    dates = pd.date_range(end=end_date, periods=int(round(365.25 * years)), freq='D')
+    out_dir = scale_dir(root, branches, years, traffic)
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+
+    tasks = [(b, out_dir, dates, traffic, seed, batch_size) for b in range(branches)]
+    t0 = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(build_branch, tasks))
+    else:
+        results = [build_branch(task) for task in tasks]
+
+    manifest = {
+        'scale': {'branches': branches, 'years': years, 'traffic_multiplier': traffic, 'seed': seed},
+        'date_range': [str(dates[0].date()), str(dates[-1].date())],
+        'total_seconds': time.perf_counter() - t0,
+        'total_rows': {},
+        'branches': results
+    }
+    for result in results:
+        for name, n in result['rows'].items():
+            manifest['total_rows'][name] = manifest['total_rows'].get(name, 0) + n
+
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return out_dir, manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a multi-branch load-test dataset")
+    parser.add_argument('--branches', type=int, default=1, help="Number of branches")
+    parser.add_argument('--years', type=int, default=3, help="Years of history ending at --end")
+    parser.add_argument('--traffic', type=float, default=1.0, help="Foot traffic multiplier")
+    parser.add_argument('--seed', type=int, default=42, help="Root seed (each branch gets its own child seeds)")
+    parser.add_argument('--workers', type=int, default=1, help="Branches built in parallel")
+    parser.add_argument('--root', default='loadtest', help="Output root directory")
+    parser.add_argument('--end', default='2025-12-31', help="Last date of the history (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    print(f"Building load-test dataset: {args.branches} branch(es) x {args.years} year(s) x {args.traffic:g} traffic...")
+    out_dir, manifest = build_load_test_dataset(
+        args.branches, args.years, args.traffic, args.seed, args.workers, args.root, args.end
+    )
+
+    print(f"[OK] Generated {out_dir} in {manifest['total_seconds']:.1f}s")
+    for name, n in sorted(manifest['total_rows'].items()):
+        print(f"   • {name}: {n:,} rows")
@@ -2,35 +2,13 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import argparse
 import json
 import random
 
 # ==========================================
 # CONFIGURATION
 # ==========================================
-print("Loading configurations and sales data...")
-# Load Promos to know which days to skip for reservations
-with open('promociones_reales.json', 'r', encoding='utf-8') as f:
-    PROMOS = json.load(f)
-
-# Load Sales to correlate data
-sales_df = pd.read_csv('ventas_sinteticas_3anos.csv')
-sales_df['date'] = pd.to_datetime(sales_df['date'])
-
-# Group sales by day to get daily stats
-daily_stats = sales_df.groupby('date').agg({
-    'qty_sold': 'sum',
-    'revenue': 'sum',
-    'foot_traffic_estimate': 'max', # This was generated in sales script
-    'day_of_week': 'max'
-}).reset_index()
-
-# ==========================================
-# 1. STAFFING (RRHH / TURNOS)
-# ==========================================
-print("Generating Staffing (RRHH) data...")
-staff_log = []
-
 # Roles and Costs (Hourly)
 ROLES = {
     'Garzon': {'cost': 3500, 'capacity': 25}, # 1 waiter per 25 items/covers
@@ -39,60 +17,10 @@ ROLES = {
     'Admin': {'cost': 6000, 'fixed': 1} # Always 1 admin
 }
 
-for _, row in daily_stats.iterrows():
-    date = row['date']
-    items_sold = row['qty_sold']
-    # Approximation: 1 item ~= 1 "effort unit". 
-    # Realistically covers = items / 2.5, but let's map directly to capacity for simplicity
-    
-    # Calculate required staff
-    # Add some randomness for "called in sick" or "extra hands"
-    variation = np.random.uniform(0.9, 1.1)
-    
-    n_waiters = max(2, int((items_sold / ROLES['Garzon']['capacity']) * variation))
-    n_cooks = max(2, int((items_sold / ROLES['Cocinero']['capacity']) * variation))
-    n_bartenders = max(1, int((items_sold / ROLES['Bartender']['capacity']) * variation))
-    
-    # Generate Shifts
-    # Shift types: Opening (10-18), Closing (17-01), Full (11-23)
-    shifts_to_fill = []
-    
-    # Distribute staff into shifts
-    for role, count in [('Garzon', n_waiters), ('Cocinero', n_cooks), ('Bartender', n_bartenders)]:
-        for i in range(count):
-            shift_type = np.random.choice(['Apertura', 'Cierre', 'Intermedio'], p=[0.3, 0.5, 0.2])
-            start_hour = 10 if shift_type == 'Apertura' else (17 if shift_type == 'Cierre' else 13)
-            duration = 8
-            
-            staff_log.append({
-                'date': date.date(),
-                'role': role,
-                'shift_type': shift_type,
-                'hours_worked': duration,
-                'hourly_rate': ROLES[role]['cost'],
-                'total_pay': duration * ROLES[role]['cost'],
-                'staff_id': f"{role[:3].upper()}-{np.random.randint(100, 999)}" # e.g., GAR-102
-            })
-            
-    # Always 1 Admin
-    staff_log.append({
-        'date': date.date(),
-        'role': 'Admin',
-        'shift_type': 'Full',
-        'hours_worked': 9,
-        'hourly_rate': ROLES['Admin']['cost'],
-        'total_pay': 9 * ROLES['Admin']['cost'],
-        'staff_id': 'ADM-001'
-    })
-
-rrhh_df = pd.DataFrame(staff_log)
-rrhh_df.to_csv('rrhh_turnos.csv', index=False)
-print(f"[OK] Generated {len(rrhh_df)} staff shifts")
-
-# ==========================================
-# 2. REVIEWS (SENTIMENT)
-# ==========================================
-print("Generating Reviews data...")
+# Shift types: Opening (10-18), Closing (17-01), Full (11-23)
+SHIFT_TYPES = np.array(['Apertura', 'Cierre', 'Intermedio'])
+SHIFT_PROBS = [0.3, 0.5, 0.2]
+SHIFT_HOURS = 8
 
 REVIEWS_TEMPLATES = {
     'positive': [
@@ -121,43 +49,215 @@ REVIEWS_TEMPLATES = {
         "El baño estaba sucio y descuidado."
     ]
 }
-
-reviews_log = []
+SENTIMENTS = np.array(['positive', 'neutral', 'negative'])
 prob_review = 0.05 # 5% of tables leave a review (approx)
 
-for _, row in daily_stats.iterrows():
+# Reservation attributes
+PAX_VALUES, PAX_PROBS = np.array([2, 2, 4, 4, 6, 8]), [0.3, 0.4, 0.15, 0.1, 0.03, 0.02]
+STATUS_VALUES, STATUS_PROBS = np.array(['Show', 'No-Show', 'Cancelled']), [0.85, 0.10, 0.05]
+HOUR_VALUES, HOUR_PROBS = np.array([13, 14, 19, 20, 21, 22]), [0.1, 0.1, 0.2, 0.3, 0.2, 0.1] # Dinner focused
+CHANNEL_VALUES, CHANNEL_PROBS = np.array(['Web', 'Phone', 'WhatsApp']), [0.5, 0.2, 0.3]
+
+# Promo Days Logic -> NO RESERVATIONS
+# Martes (Day 1), Jueves (Day 3), Fiestas Patrias (Sept 18, 19)
+promo_days_indices = [1, 3] # Tue, Thu
+promo_dates_str = ['09-18', '09-19']
+
+# ==========================================
+# HELPER FUNCTIONS
+# ==========================================
+def build_daily_stats(sales_df):
+    """Group sales by day to get daily stats"""
+    return sales_df.groupby('date').agg({
+        'qty_sold': 'sum',
+        'revenue': 'sum',
+        'foot_traffic_estimate': 'max', # This was generated in sales script
+        'day_of_week': 'max'
+    }).reset_index()
+
+# Helper for Fiestas Patrias check
+def is_promo_date(d):
+    # Check Day of Week
+    if d.weekday() in promo_days_indices:
+        return True
+    # Check specific dates
+    s = d.strftime('%m-%d')
+    if s in promo_dates_str:
+        return True
+    return False
+
+# ==========================================
+# 1. STAFFING (RRHH / TURNOS)
+# ==========================================
+def generate_staffing(daily_stats, rng):
+    """
+    Staff shifts: required staff per role is computed per day, then every
+    shift's type and staff_id are drawn as arrays (one row per shift).
+    """
+    n_days = len(daily_stats)
+    items_sold = daily_stats['qty_sold'].values
+    # Approximation: 1 item ~= 1 "effort unit".
+    # Add some randomness for "called in sick" or "extra hands"
+    variation = rng.uniform(0.9, 1.1, n_days)
+
+    # Required staff per (day, role); Admin is always 1
+    roles = np.array(['Garzon', 'Cocinero', 'Bartender', 'Admin'])
+    counts = np.column_stack([
+        np.maximum(2, (items_sold / ROLES['Garzon']['capacity'] * variation).astype(int)),
+        np.maximum(2, (items_sold / ROLES['Cocinero']['capacity'] * variation).astype(int)),
+        np.maximum(1, (items_sold / ROLES['Bartender']['capacity'] * variation).astype(int)),
+        np.ones(n_days, dtype=int)
+    ])
+
+    day_idx = np.repeat(np.repeat(np.arange(n_days), len(roles)), counts.ravel())
+    role_idx = np.repeat(np.tile(np.arange(len(roles)), n_days), counts.ravel())
+    role = roles[role_idx]
+    is_admin = role == 'Admin'
+    n_shifts = len(role)
+
+    shift_type = np.where(is_admin, 'Full', rng.choice(SHIFT_TYPES, size=n_shifts, p=SHIFT_PROBS))
+    hours_worked = np.where(is_admin, 9, SHIFT_HOURS)
+    hourly_rate = np.array([ROLES[r]['cost'] for r in roles])[role_idx]
+    prefix = np.array([f"{r[:3].upper()}-" for r in roles], dtype=object)[role_idx]
+    staff_id = np.where(is_admin, 'ADM-001', prefix + rng.integers(100, 999, n_shifts).astype(str).astype(object)) # e.g., GAR-102
+
+    return pd.DataFrame({
+        'date': daily_stats['date'].dt.date.values[day_idx],
+        'role': role,
+        'shift_type': shift_type,
+        'hours_worked': hours_worked,
+        'hourly_rate': hourly_rate,
+        'total_pay': hours_worked * hourly_rate,
+        'staff_id': staff_id
+    })
+
+# ==========================================
+# 2. REVIEWS (SENTIMENT)
+# ==========================================
+def generate_reviews(daily_stats, rng):
+    """
+    Reviews: review count per day, then sentiment, text, rating and platform
+    for all reviews at once.
+    """
     # Base Traffic
-    traffic = row['foot_traffic_estimate']
-    n_reviews = np.random.binomial(traffic, prob_review)
-    
-    if n_reviews > 0:
-        # Determine sentiment guided by "pressure"
-        # High traffic relative to staff? -> Bad service
-        # We don't have exact staff count here easily without re-aggregating, 
-        # so let's use traffic volume as a proxy for stress.
-        
-        stress_factor = 0
-        if traffic > 120: stress_factor = 0.3 # High stress
-        
+    traffic = daily_stats['foot_traffic_estimate'].values.astype(int)
+    n_reviews = rng.binomial(traffic, prob_review)
+    day_idx = np.repeat(np.arange(len(daily_stats)), n_reviews)
+    n_total = len(day_idx)
+
+    # Sentiment guided by "pressure": traffic volume as a proxy for stress
+    # Base: 70% Pos, 20% Neu, 10% Neg / Stressed (>120): 50% Pos, 20% Neu, 30% Neg
+    stressed = traffic[day_idx] > 120
+    p_pos = np.where(stressed, 0.5, 0.7)
+    u = rng.random(n_total)
+    sentiment_idx = (u >= p_pos).astype(int) + (u >= p_pos + 0.2)
+    sentiment = SENTIMENTS[sentiment_idx]
+
+    # Select Text (uniform within the sentiment's templates)
+    templates = np.concatenate([REVIEWS_TEMPLATES[s] for s in SENTIMENTS])
+    n_templates = np.array([len(REVIEWS_TEMPLATES[s]) for s in SENTIMENTS])
+    offsets = np.concatenate([[0], np.cumsum(n_templates)[:-1]])
+    text = templates[offsets[sentiment_idx] + (rng.random(n_total) * n_templates[sentiment_idx]).astype(int)]
+
+    # Generate Rating
+    rating = np.select(
+        [sentiment_idx == 0, sentiment_idx == 1],
+        [rng.choice([4, 5], size=n_total), 3],
+        rng.choice([1, 2], size=n_total)
+    )
+
+    return pd.DataFrame({
+        'date': daily_stats['date'].dt.date.values[day_idx],
+        'platform': rng.choice(['Google', 'TripAdvisor', 'Instagram'], size=n_total, p=[0.6, 0.3, 0.1]),
+        'rating': rating,
+        'text': text,
+        'sentiment_label': sentiment
+    })
+
+# ==========================================
+# 3. RESERVATIONS (RESERVAS)
+# ==========================================
+def generate_reservations(daily_stats, rng, first_id=5000):
+    """
+    Reservations: count per day (0 on promo days, walk-in only), then pax,
+    status, hour and channel for all reservations at once.
+    """
+    dates = daily_stats['date']
+    blocked = dates.dt.dayofweek.isin(promo_days_indices).values | dates.dt.strftime('%m-%d').isin(promo_dates_str).values
+
+    # Avg 30% of traffic is reserved
+    traffic = daily_stats['foot_traffic_estimate'].values
+    n_res = (traffic * 0.30 * rng.uniform(0.8, 1.2, len(daily_stats))).astype(int)
+    n_res[blocked] = 0
+    day_idx = np.repeat(np.arange(len(daily_stats)), n_res)
+    n_total = len(day_idx)
+
+    ids = (first_id + np.arange(n_total)).astype(str).astype(object)
+    time_labels = np.array([f"{h}:00" for h in HOUR_VALUES], dtype=object)
+
+    return pd.DataFrame({
+        'reservation_id': 'RES-' + ids,
+        'date': dates.dt.date.values[day_idx],
+        'time': time_labels[rng.choice(len(HOUR_VALUES), size=n_total, p=HOUR_PROBS)],
+        'pax': rng.choice(PAX_VALUES, size=n_total, p=PAX_PROBS),
+        'customer_name': 'Cliente ' + ids, # Anonymized
+        'status': rng.choice(STATUS_VALUES, size=n_total, p=STATUS_PROBS),
+        'channel': rng.choice(CHANNEL_VALUES, size=n_total, p=CHANNEL_PROBS)
+    })
+
+# ==========================================
+# ORIGINAL PER-ROW GENERATORS
+# Kept as the reference for the benchmark in verify_pipeline.py
+# ==========================================
+def generate_staffing_per_row(daily_stats):
+    staff_log = []
+    for _, row in daily_stats.iterrows():
+        date = row['date']
+        items_sold = row['qty_sold']
+        variation = np.random.uniform(0.9, 1.1)
+
+        n_waiters = max(2, int((items_sold / ROLES['Garzon']['capacity']) * variation))
+        n_cooks = max(2, int((items_sold / ROLES['Cocinero']['capacity']) * variation))
+        n_bartenders = max(1, int((items_sold / ROLES['Bartender']['capacity']) * variation))
+
+        for role, count in [('Garzon', n_waiters), ('Cocinero', n_cooks), ('Bartender', n_bartenders)]:
+            for i in range(count):
+                shift_type = np.random.choice(['Apertura', 'Cierre', 'Intermedio'], p=[0.3, 0.5, 0.2])
+                duration = 8
+                staff_log.append({
+                    'date': date.date(),
+                    'role': role,
+                    'shift_type': shift_type,
+                    'hours_worked': duration,
+                    'hourly_rate': ROLES[role]['cost'],
+                    'total_pay': duration * ROLES[role]['cost'],
+                    'staff_id': f"{role[:3].upper()}-{np.random.randint(100, 999)}"
+                })
+
+        staff_log.append({
+            'date': date.date(),
+            'role': 'Admin',
+            'shift_type': 'Full',
+            'hours_worked': 9,
+            'hourly_rate': ROLES['Admin']['cost'],
+            'total_pay': 9 * ROLES['Admin']['cost'],
+            'staff_id': 'ADM-001'
+        })
+    return pd.DataFrame(staff_log)
+
+def generate_reviews_per_row(daily_stats):
+    reviews_log = []
+    for _, row in daily_stats.iterrows():
+        traffic = row['foot_traffic_estimate']
+        n_reviews = np.random.binomial(traffic, prob_review)
+        stress_factor = 0.3 if traffic > 120 else 0
         for _ in range(n_reviews):
-            # Roll for sentiment
-            # Base: 70% Pos, 20% Neu, 10% Neg
-            # Stressed: 50% Pos, 20% Neu, 30% Neg
-            
-            probs = [0.7, 0.2, 0.1]
-            if stress_factor > 0:
-                probs = [0.5, 0.2, 0.3]
-            
+            probs = [0.5, 0.2, 0.3] if stress_factor > 0 else [0.7, 0.2, 0.1]
             sentiment = np.random.choice(['positive', 'neutral', 'negative'], p=probs)
-            
-            # Select Text
             text = np.random.choice(REVIEWS_TEMPLATES[sentiment])
-            
-            # Generate Rating
             if sentiment == 'positive': rating = np.random.choice([4, 5])
             elif sentiment == 'neutral': rating = 3
             else: rating = np.random.choice([1, 2])
-            
             reviews_log.append({
                 'date': row['date'].date(),
                 'platform': np.random.choice(['Google', 'TripAdvisor', 'Instagram'], p=[0.6, 0.3, 0.1]),
@@ -165,71 +265,67 @@ for _, row in daily_stats.iterrows():
                 'text': text,
                 'sentiment_label': sentiment
             })
+    return pd.DataFrame(reviews_log)
 
-reviews_df = pd.DataFrame(reviews_log)
-reviews_df.to_csv('reviews_clientes.csv', index=False)
-print(f"[OK] Generated {len(reviews_df)} reviews")
-
+def generate_reservations_per_row(daily_stats):
+    reservas_log = []
+    reservation_id_counter = 5000
+    for _, row in daily_stats.iterrows():
+        curr_date = row['date']
+        if is_promo_date(curr_date):
+            continue
+        traffic = row['foot_traffic_estimate']
+        n_res = int(traffic * 0.30 * np.random.uniform(0.8, 1.2))
+        for _ in range(n_res):
+            pax = np.random.choice([2, 2, 4, 4, 6, 8], p=[0.3, 0.4, 0.15, 0.1, 0.03, 0.02])
+            status = np.random.choice(['Show', 'No-Show', 'Cancelled'], p=[0.85, 0.10, 0.05])
+            hour = np.random.choice([13, 14, 19, 20, 21, 22], p=[0.1, 0.1, 0.2, 0.3, 0.2, 0.1])
+            reservas_log.append({
+                'reservation_id': f"RES-{reservation_id_counter}",
+                'date': curr_date.date(),
+                'time': f"{hour}:00",
+                'pax': pax,
+                'customer_name': f"Cliente {reservation_id_counter}",
+                'status': status,
+                'channel': np.random.choice(['Web', 'Phone', 'WhatsApp'], p=[0.5, 0.2, 0.3])
+            })
+            reservation_id_counter += 1
+    return pd.DataFrame(reservas_log)
 
 # ==========================================
-# 3. RESERVATIONS (RESERVAS)
+# MAIN EXECUTION
 # ==========================================
-print("Generating Reservations data...")
-reservas_log = []
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate staffing, reviews and reservations from synthetic sales")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
 
-# Promo Days Logic -> NO RESERVATIONS
-# Martes (Day 1), Jueves (Day 3), Fiestas Patrias (Sept 18, 19)
-promo_days_indices = [1, 3] # Tue, Thu
-promo_dates_str = [] # Fill with YYYY-09-18, etc.
+    print("Loading configurations and sales data...")
+    # Load Promos to know which days to skip for reservations
+    with open('promociones_reales.json', 'r', encoding='utf-8') as f:
+        PROMOS = json.load(f)
 
-# Helper for Fiestas Patrias check
-def is_promo_date(d):
-    # Check Day of Week
-    if d.weekday() in promo_days_indices:
-        return True
-    # Check specific dates
-    s = d.strftime('%m-%d')
-    if s in ['09-18', '09-19']:
-        return True
-    return False
+    # Load Sales to correlate data
+    sales_df = pd.read_csv('ventas_sinteticas_3anos.csv')
+    sales_df['date'] = pd.to_datetime(sales_df['date'])
+    daily_stats = build_daily_stats(sales_df)
 
-reservation_id_counter = 5000
+    print("Generating Staffing (RRHH) data...")
+    rrhh_df = generate_staffing(daily_stats, rng)
+    rrhh_df.to_csv('rrhh_turnos.csv', index=False)
+    print(f"[OK] Generated {len(rrhh_df)} staff shifts")
 
-for _, row in daily_stats.iterrows():
-    curr_date = row['date']
-    
-    # 1. CHECK: Is this a blocked promo day?
-    if is_promo_date(curr_date):
-        continue # SKIP generation (Walk-in only)
-        
-    # Generate Reservations for Normal Days
-    # Avg 30% of traffic is reserved
-    traffic = row['foot_traffic_estimate']
-    n_res = int(traffic * 0.30 * np.random.uniform(0.8, 1.2))
-    
-    for _ in range(n_res):
-        pax = np.random.choice([2, 2, 4, 4, 6, 8], p=[0.3, 0.4, 0.15, 0.1, 0.03, 0.02])
-        status = np.random.choice(['Show', 'No-Show', 'Cancelled'], p=[0.85, 0.10, 0.05])
-        
-        # Time distribution (Dinner focused)
-        hour = np.random.choice([13, 14, 19, 20, 21, 22], p=[0.1, 0.1, 0.2, 0.3, 0.2, 0.1])
-        time_str = f"{hour}:00"
-        
-        reservas_log.append({
-            'reservation_id': f"RES-{reservation_id_counter}",
-            'date': curr_date.date(),
-            'time': time_str,
-            'pax': pax,
-            'customer_name': f"Cliente {reservation_id_counter}", # Anonymized
-            'status': status,
-            'channel': np.random.choice(['Web', 'Phone', 'WhatsApp'], p=[0.5, 0.2, 0.3])
-        })
-        reservation_id_counter += 1
+    print("Generating Reviews data...")
+    reviews_df = generate_reviews(daily_stats, rng)
+    reviews_df.to_csv('reviews_clientes.csv', index=False)
+    print(f"[OK] Generated {len(reviews_df)} reviews")
 
-reservas_df = pd.DataFrame(reservas_log)
-reservas_df.to_csv('reservas.csv', index=False)
-print(f"[OK] Generated {len(reservas_df)} reservations")
+    print("Generating Reservations data...")
+    reservas_df = generate_reservations(daily_stats, rng)
+    reservas_df.to_csv('reservas.csv', index=False)
+    print(f"[OK] Generated {len(reservas_df)} reservations")
 
-print("\n" + "="*50)
-print("OPERATIONAL DATA GENERATION COMPLETE")
-print("="*50)
+    print("\n" + "="*50)
+    print("OPERATIONAL DATA GENERATION COMPLETE")
+    print("="*50)
@@ -2,8 +2,10 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import json
-import re
+
+from bom import RecipeBOM
+from ingredient_catalog import IngredientCatalog, parse_ingredients
+from inventory_sim import BASE_POLICY, simulate_policies
 
 # ==========================================
 # CONFIGURATION & LOCAL SUPPLIERS (LA SERENA)
@@ -18,15 +20,6 @@ SUPPLIERS = {
     'wine': {'name': 'Licores Premium', 'payment_days': 30, 'type': 'credito'}
 }
 
-INGREDIENT_CATEGORY_MAP = {
-    'carne': 'meat', 'vacuno': 'meat', 'pollo': 'meat', 'cerdo': 'meat', 'lomo': 'meat', 'jamón': 'meat', 'salame': 'meat', 'chorizo': 'meat', 'pepperoni': 'meat',
-    'lechuga': 'veg', 'tomate': 'veg', 'cebolla': 'veg', 'palta': 'veg', 'pimentón': 'veg', 'verdura': 'veg', 'rúcula': 'veg', 'champiñon': 'veg', 'ajo': 'veg', 'perejil': 'veg', 'cilantro': 'veg', 'limón': 'veg', 'fruta': 'veg', 'papaya': 'veg', 'pepino': 'veg', 'albahaca': 'veg',
-    'masa': 'grocery', 'pan': 'grocery', 'arroz': 'grocery', 'harina': 'grocery', 'azúcar': 'grocery', 'aceite': 'grocery', 'salsa': 'grocery', 'vinagreta': 'grocery', 'chocolate': 'grocery', 'helado': 'grocery', 'merengue': 'grocery', 'crema': 'dairy',
-    'queso': 'dairy', 'mozzarella': 'dairy', 'cheddar': 'dairy', 'parmesano': 'dairy', 'gorgonzola': 'dairy', 'cabra': 'dairy', 'mantequilla': 'dairy', 'huevo': 'dairy', 'leche': 'dairy',
-    'camaron': 'seafood', 'salmón': 'seafood', 'pescado': 'seafood', 'jaiba': 'seafood', 'loco': 'seafood', 'marisco': 'seafood', 'atún': 'seafood',
-    'vino': 'wine', 'bebida': 'beverage', 'agua': 'beverage', 'jugo': 'beverage'
-}
-
 # Estimated Unit Costs per kg/liter (derived to match ficha tecnica dish costs roughly)
 INGREDIENT_COSTS = {
     'meat': 9500,    # avg price per kg of meat
@@ -41,38 +34,6 @@ INGREDIENT_COSTS = {
 # ==========================================
 # HELPER FUNCTIONS
 # ==========================================
-def parse_ingredients(ing_json_str):
-    """
-    Parse ingredient string list from ficha tecnica.
-    Returns list of dicts: {'name': 'carne', 'qty_g': 150, 'category': 'meat'}
-    """
-    try:
-        items = json.loads(ing_json_str)
-    except:
-        return []
-    
-    parsed = []
-    for item in items:
-        item_lower = item.lower()
-        # Extract quantity if present, e.g., "carne (150g)"
-        qty_match = re.search(r'\((\d+)\s*(g|ml)\)', item_lower)
-        qty = float(qty_match.group(1)) if qty_match else 100.0 # Default 100g if not specified (rough estimate)
-        
-        # Determine category
-        category = 'grocery' # Default
-        for key, cat in INGREDIENT_CATEGORY_MAP.items():
-            if key in item_lower:
-                category = cat
-                break
-                
-        parsed.append({
-            'raw_name': item,
-            'clean_name': item.split('(')[0].strip(),
-            'qty_g': qty,
-            'category': category
-        })
-    return parsed
-
 def get_next_purchase_date(current_date):
     """
     Returns the next Monday or Thursday.
@@ -91,163 +52,201 @@ def get_next_purchase_date(current_date):
     # This function is used to look ahead.
     return current_date + timedelta(days=days_ahead)
 
-# ==========================================
-# MAIN EXECUTION
-# ==========================================
-print("Loading data...")
-ventas = pd.read_csv('ventas_sinteticas_3anos.csv')
-mermas = pd.read_csv('mermas.csv')
-ficha = pd.read_csv('ficha_tecnica.csv')
-
-ventas['date'] = pd.to_datetime(ventas['date'])
-mermas['date'] = pd.to_datetime(mermas['date'])
-
-# 1. Build Ingredient Usage Map per Item
-print("Mapping item ingredients...")
-item_ingredients_map = {}
-for _, row in ficha.iterrows():
-    item_ingredients_map[row['item_name']] = parse_ingredients(row['ingredients'])
-
-# 2. Reconstruct Daily Consumption (in grams per category)
-print("Calculating daily ingredient consumption...")
-# Initialize consumption dictionary: date -> category -> amount_g
-daily_consumption = {}
-date_range = pd.date_range(start=ventas['date'].min(), end=ventas['date'].max())
-
-# Pre-fill structure
-for d in date_range:
-    daily_consumption[d.date()] = {cat: 0.0 for cat in SUPPLIERS.keys()}
-
-# Add Sales Consumption
-for _, row in ventas.iterrows():
-    d = row['date'].date()
-    item = row['item_name']
-    qty = row['qty_sold']
-    
-    if item in item_ingredients_map:
-        ingredients = item_ingredients_map[item]
-        for ing in ingredients:
-            daily_consumption[d][ing['category']] += ing['qty_g'] * qty
-
-# Add Mermas Consumption (Waste)
-# Assuming waste is whole item (or part of it). Mermas.csv has 'item_name' and 'merma_qty'
-for _, row in mermas.iterrows():
-    d = row['date'].date()
-    item = row['item_name']
-    qty = row['merma_qty']
-    
-    if item in item_ingredients_map:
-        ingredients = item_ingredients_map[item]
-        for ing in ingredients:
-            daily_consumption[d][ing['category']] += ing['qty_g'] * qty
-
-# 3. Simulate Inventory & Purchases
-print("Simulating inventory purchasing...")
-purchase_log = []
-inventory = {cat: 20000.0 for cat in SUPPLIERS.keys()} # Start with 20kg base stock
-purchase_id_counter = 1000
-
-# We iterate day by day
-current_date = date_range[0]
-end_date = date_range[-1]
-
-while current_date <= end_date:
-    dow = current_date.weekday()
-    
-    # Check if Purchase Day (Mon=0, Thu=3)
-    if dow == 0 or dow == 3:
-        # Determine period coverage
-        # Mon purchase covers Mon, Tue, Wed (3 days)
-        # Thu purchase covers Thu, Fri, Sat, Sun (4 days)
-        days_to_cover = 3 if dow == 0 else 4
-        
-        # Calculate demand for this period
-        period_demand = {cat: 0.0 for cat in SUPPLIERS.keys()}
-        for i in range(days_to_cover):
-            look_ahead = current_date + timedelta(days=i)
-            if look_ahead.date() in daily_consumption:
-                day_demand = daily_consumption[look_ahead.date()]
-                for cat, amt in day_demand.items():
-                    period_demand[cat] += amt
-        
-        # Purchases for each category
-        # Logic: We want to end the period with 20% of the Consumption PERIOD remaining.
-        # Actually simplest: Replenish to reach (Demand * 1.25)
-        # Target Stock Level for the start of period = Demand + Safety Buffer (25% of demand)
-        
-        for cat, demand_g in period_demand.items():
-            safety_buffer = demand_g * 0.25 # 25% safety buffer means ~20% of total stock is buffer
-            target_level = demand_g + safety_buffer
-            
-            current_stock = inventory[cat]
-            buy_qty_g = max(0, target_level - current_stock)
-            
-            if buy_qty_g > 0:
-                # Create Purchase Record
-                supplier_info = SUPPLIERS[cat]
-                cost_est = (buy_qty_g / 1000.0) * INGREDIENT_COSTS[cat] # grams to kg * cost
-                
-                # Rounding logic (buy in resonable units, e.g. kg)
-                buy_qty_kg = round(buy_qty_g / 1000.0, 2)
-                
-                if buy_qty_kg >= 0.5: # Minimum order 0.5kg
-                    purchase_log.append({
-                        'purchase_id': f"PO-{purchase_id_counter}",
-                        'date': current_date.date(),
-                        'supplier': supplier_info['name'],
-                        'category': cat,
-                        'items_summary': f"{cat.capitalize()} Variety Pack", # Abstracted for simplicity
-                        'quantity_kg': buy_qty_kg,
-                        'total_cost_clp': int(cost_est),
-                        'payment_terms': f"{supplier_info['payment_days']} dias",
-                        'due_date': (current_date + timedelta(days=supplier_info['payment_days'])).date(),
-                        'status': 'Received'
-                    })
-                    purchase_id_counter += 1
-                    
-                    # Update inventory
-                    inventory[cat] += buy_qty_g
-
-    # Deplete Daily Consumption
-    if current_date.date() in daily_consumption:
-        daily_use = daily_consumption[current_date.date()]
-        for cat, amount in daily_use.items():
-            inventory[cat] -= amount
-            
-    current_date += timedelta(days=1)
-
-# Export Purchases
-compras_df = pd.DataFrame(purchase_log)
-compras_df.to_csv('compras.csv', index=False)
-print(f"[OK] Generated {len(compras_df)} purchase orders in 'compras.csv'")
+def daily_consumption_per_row(ventas, mermas, ficha, date_range):
+    """
+    Original consumption loop (iterrows over every sale and merma).
+    Kept as the reference for RecipeBOM.daily_consumption in verify_pipeline.py
+    """
+    item_ingredients_map = {}
+    for _, row in ficha.iterrows():
+        item_ingredients_map[row['item_name']] = parse_ingredients(row['ingredients'])
+
+    daily_consumption = {}
+    for d in date_range:
+        daily_consumption[d.date()] = {cat: 0.0 for cat in SUPPLIERS.keys()}
+
+    for df, qty_col in [(ventas, 'qty_sold'), (mermas, 'merma_qty')]:
+        for _, row in df.iterrows():
+            d = row['date'].date()
+            item = row['item_name']
+            qty = row[qty_col]
+            if item in item_ingredients_map:
+                for ing in item_ingredients_map[item]:
+                    daily_consumption[d][ing['category']] += ing['qty_g'] * qty
+    return daily_consumption
+
+def build_purchase_log(orders_g, date_range, categories, first_id=1000):
+    """
+    Purchase records from an orders array (days x categories, grams), in the
+    same order as the day-by-day loop (by date, then category).
+    """
+    day_idx, cat_idx = np.nonzero(orders_g > 0)
+    purchase_log = []
+    for n, (t, c) in enumerate(zip(day_idx, cat_idx)):
+        cat = categories[c]
+        buy_qty_g = float(orders_g[t, c])
+        supplier_info = SUPPLIERS[cat]
+        current_date = date_range[t]
+        purchase_log.append({
+            'purchase_id': f"PO-{first_id + n}",
+            'date': current_date.date(),
+            'supplier': supplier_info['name'],
+            'category': cat,
+            'items_summary': f"{cat.capitalize()} Variety Pack", # Abstracted for simplicity
+            'quantity_kg': round(buy_qty_g / 1000.0, 2),
+            'total_cost_clp': int((buy_qty_g / 1000.0) * INGREDIENT_COSTS[cat]), # grams to kg * cost
+            'payment_terms': f"{supplier_info['payment_days']} dias",
+            'due_date': (current_date + timedelta(days=supplier_info['payment_days'])).date(),
+            'status': 'Received'
+        })
+    return purchase_log
+
+def simulate_purchases_per_day(daily_consumption, date_range):
+    """
+    Original day-by-day purchasing loop (single Mon/Thu policy).
+    Kept as the reference for inventory_sim.simulate_policies in verify_pipeline.py
+    Returns (purchase_log, inventory)
+    """
+    purchase_log = []
+    inventory = {cat: 20000.0 for cat in SUPPLIERS.keys()} # Start with 20kg base stock
+    purchase_id_counter = 1000
+
+    # We iterate day by day
+    current_date = date_range[0]
+    end_date = date_range[-1]
+
+    while current_date <= end_date:
+        dow = current_date.weekday()
+
+        # Check if Purchase Day (Mon=0, Thu=3)
+        if dow == 0 or dow == 3:
+            # Determine period coverage
+            # Mon purchase covers Mon, Tue, Wed (3 days)
+            # Thu purchase covers Thu, Fri, Sat, Sun (4 days)
+            days_to_cover = 3 if dow == 0 else 4
+
+            # Calculate demand for this period
+            period_demand = {cat: 0.0 for cat in SUPPLIERS.keys()}
+            for i in range(days_to_cover):
+                look_ahead = current_date + timedelta(days=i)
+                if look_ahead.date() in daily_consumption:
+                    day_demand = daily_consumption[look_ahead.date()]
+                    for cat, amt in day_demand.items():
+                        period_demand[cat] += amt
+
+            # Purchases for each category
+            # Logic: We want to end the period with 20% of the Consumption PERIOD remaining.
+            # Actually simplest: Replenish to reach (Demand * 1.25)
+            # Target Stock Level for the start of period = Demand + Safety Buffer (25% of demand)
+
+            for cat, demand_g in period_demand.items():
+                safety_buffer = demand_g * 0.25 # 25% safety buffer means ~20% of total stock is buffer
+                target_level = demand_g + safety_buffer
+
+                current_stock = inventory[cat]
+                buy_qty_g = max(0, target_level - current_stock)
+
+                if buy_qty_g > 0:
+                    # Create Purchase Record
+                    supplier_info = SUPPLIERS[cat]
+                    cost_est = (buy_qty_g / 1000.0) * INGREDIENT_COSTS[cat] # grams to kg * cost
+
+                    # Rounding logic (buy in resonable units, e.g. kg)
+                    buy_qty_kg = round(buy_qty_g / 1000.0, 2)
+
+                    if buy_qty_kg >= 0.5: # Minimum order 0.5kg
+                        purchase_log.append({
+                            'purchase_id': f"PO-{purchase_id_counter}",
+                            'date': current_date.date(),
+                            'supplier': supplier_info['name'],
+                            'category': cat,
+                            'items_summary': f"{cat.capitalize()} Variety Pack", # Abstracted for simplicity
+                            'quantity_kg': buy_qty_kg,
+                            'total_cost_clp': int(cost_est),
+                            'payment_terms': f"{supplier_info['payment_days']} dias",
+                            'due_date': (current_date + timedelta(days=supplier_info['payment_days'])).date(),
+                            'status': 'Received'
+                        })
+                        purchase_id_counter += 1
+
+                        # Update inventory
+                        inventory[cat] += buy_qty_g
+
+        # Deplete Daily Consumption
+        if current_date.date() in daily_consumption:
+            daily_use = daily_consumption[current_date.date()]
+            for cat, amount in daily_use.items():
+                inventory[cat] -= amount
+
+        current_date += timedelta(days=1)
+
+    return purchase_log, inventory
 
 # ==========================================
-# VALIDATION REPORT
+# MAIN EXECUTION
 # ==========================================
-print("\n" + "="*50)
-print("VALIDATION REPORT")
-print("="*50)
-
-total_purchases_clp = compras_df['total_cost_clp'].sum()
-print(f"Total Purchases (3 Years): ${total_purchases_clp:,.0f} CLP")
-
-ventas_revenue = ventas['revenue'].sum()
-cogs_estimated = total_purchases_clp 
-# Note: Real COGS is consumption, Purchases includes ending inventory diff (negligible over 3 years)
-
-print(f"Sales Revenue: ${ventas_revenue:,.0f} CLP")
-print(f"Estimated Food Cost %: {(cogs_estimated/ventas_revenue)*100:.1f}%")
-
-print("\nInventory Buffer Checks (End of Periods):")
-# Quick check: Calculate theoretical ending inventory vs demand
-# Since we simulated perfectly, we know the logic held, but let's consistency check sales/purchases/waste link.
-print("Logic verified: Purchases replenishes stock to cover Demand + 25% safety margin.")
-print(f"Remaining Inventory (Simulated End): {inventory}")
-
-print("\nSupplier Breakdown:")
-supplier_stats = compras_df.groupby('supplier')['total_cost_clp'].sum().sort_values(ascending=False)
-for supp, amt in supplier_stats.items():
-    print(f" - {supp}: ${amt:,.0f}")
-
-print("\nPayment Terms Verification:")
-print(compras_df[['supplier', 'payment_terms']].drop_duplicates())
+if __name__ == '__main__':
+    print("Loading data...")
+    ventas = pd.read_csv('ventas_sinteticas_3anos.csv')
+    mermas = pd.read_csv('mermas.csv')
+    ficha = pd.read_csv('ficha_tecnica.csv')
+
+    ventas['date'] = pd.to_datetime(ventas['date'])
+    mermas['date'] = pd.to_datetime(mermas['date'])
+
+    # 1. Build Recipe BOM (items x ingredient categories, grams per portion)
+    print("Building recipe BOM...")
+    # Persisted ingredient catalog: only new/edited dishes are parsed
+    catalog = IngredientCatalog()
+    bom = RecipeBOM(ficha, categories=list(SUPPLIERS.keys()), catalog=catalog)
+
+    # 2. Reconstruct Daily Consumption (in grams per category)
+    print("Calculating daily ingredient consumption...")
+    date_range = pd.date_range(start=ventas['date'].min(), end=ventas['date'].max())
+    # Sales + Mermas (waste is assumed to be whole items): (days x items) @ BOM
+    consumption_df = bom.daily_consumption(date_range, ventas, mermas)
+
+    # 3. Simulate Inventory & Purchases
+    print("Simulating inventory purchasing...")
+    # Mon/Thu orders, demand + 25%, 0.5kg minimum; book stock may go negative
+    _, orders, ending_stock = simulate_policies(
+        consumption_df, [BASE_POLICY], INGREDIENT_COSTS, lost_sales=False, record_orders=True
+    )
+    purchase_log = build_purchase_log(orders[0], date_range, list(SUPPLIERS.keys()))
+    inventory = dict(zip(SUPPLIERS.keys(), ending_stock[0]))
+
+    # Export Purchases
+    compras_df = pd.DataFrame(purchase_log)
+    compras_df.to_csv('compras.csv', index=False)
+    print(f"[OK] Generated {len(compras_df)} purchase orders in 'compras.csv'")
+
+    # ==========================================
+    # VALIDATION REPORT
+    # ==========================================
+    print("\n" + "="*50)
+    print("VALIDATION REPORT")
+    print("="*50)
+
+    total_purchases_clp = compras_df['total_cost_clp'].sum()
+    print(f"Total Purchases (3 Years): ${total_purchases_clp:,.0f} CLP")
+
+    ventas_revenue = ventas['revenue'].sum()
+    cogs_estimated = total_purchases_clp 
+    # Note: Real COGS is consumption, Purchases includes ending inventory diff (negligible over 3 years)
+
+    print(f"Sales Revenue: ${ventas_revenue:,.0f} CLP")
+    print(f"Estimated Food Cost %: {(cogs_estimated/ventas_revenue)*100:.1f}%")
+
+    print("\nInventory Buffer Checks (End of Periods):")
+    # Quick check: Calculate theoretical ending inventory vs demand
+    # Since we simulated perfectly, we know the logic held, but let's consistency check sales/purchases/waste link.
+    print("Logic verified: Purchases replenishes stock to cover Demand + 25% safety margin.")
+    print(f"Remaining Inventory (Simulated End): {inventory}")
+
+    print("\nSupplier Breakdown:")
+    supplier_stats = compras_df.groupby('supplier')['total_cost_clp'].sum().sort_values(ascending=False)
+    for supp, amt in supplier_stats.items():
+        print(f" - {supp}: ${amt:,.0f}")
+
+    print("\nPayment Terms Verification:")
+    print(compras_df[['supplier', 'payment_terms']].drop_duplicates())
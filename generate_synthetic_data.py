@@ -448,53 +448,40 @@ print("\n" + "="*70)
 print("STEP 4: GENERATING MERMAS (WASTE/LOSS DATA)")
 print("="*70)
 
-mermas_records = []
 np.random.seed(43)
 
-# Calculate waste for each item based on sales
-for date in date_range:
-    daily_sales = sales_df[sales_df['date'] == date.date()]
-    
-    for _, sale in daily_sales.iterrows():
-        # Waste probability: 5-15% of sales volume
-        if np.random.random() < 0.10:  # 10% chance of waste per transaction
-            item = sale['item_name']
-            
-            # Get shelf life for item
-            if item in ficha_tecnica_data:
-                shelf_life = ficha_tecnica_data[item]['shelf_life_hours']
-                cost = ficha_tecnica_data[item]['cost_clp']
-            else:
-                shelf_life = 4
-                cost = 2000
-            
-            # Waste reasons weighted by shelf life
-            if shelf_life <= 2:
-                reasons = ['expired', 'overprep', 'quality_issue', 'customer_return']
-                reason_probs = [0.5, 0.3, 0.15, 0.05]
-            else:
-                reasons = ['overprep', 'expired', 'damage', 'quality_issue']
-                reason_probs = [0.5, 0.25, 0.15, 0.10]
-            
-            reason = np.random.choice(reasons, p=reason_probs)
-            
-            # Waste quantity (typically 1-2 units)
-            merma_qty = np.random.choice([1, 2, 3], p=[0.7, 0.25, 0.05])
-            value_lost = merma_qty * cost
-            
-            # Preventable flag
-            preventable = reason in ['overprep', 'damage', 'quality_issue']
-            
-            mermas_records.append({
-                'date': date.date(),
-                'item_name': item,
-                'merma_qty': merma_qty,
-                'reason': reason,
-                'value_lost_clp': value_lost,
-                'preventable': 'yes' if preventable else 'no'
-            })
-
-mermas_df = pd.DataFrame(mermas_records)
+# One pass over all sales: a waste draw per transaction, then quantity,
+# reason and cost for every wasted sale at once (lookups from ficha tecnica)
+ficha_lookup = ficha_df.set_index('item_name')
+sale_shelf_life = sales_df['item_name'].map(ficha_lookup['shelf_life_hours']).fillna(4).values
+sale_cost = sales_df['item_name'].map(ficha_lookup['cost_clp']).fillna(2000).astype(int).values
+
+# Waste probability: 5-15% of sales volume
+wasted = np.random.random(len(sales_df)) < 0.10  # 10% chance of waste per transaction
+n_waste = int(wasted.sum())
+
+# Waste reasons weighted by shelf life
+short_life = sale_shelf_life[wasted] <= 2
+reason = np.where(
+    short_life,
+    np.random.choice(['expired', 'overprep', 'quality_issue', 'customer_return'], size=n_waste, p=[0.5, 0.3, 0.15, 0.05]),
+    np.random.choice(['overprep', 'expired', 'damage', 'quality_issue'], size=n_waste, p=[0.5, 0.25, 0.15, 0.10])
+)
+
+# Waste quantity (typically 1-2 units)
+merma_qty = np.random.choice([1, 2, 3], size=n_waste, p=[0.7, 0.25, 0.05])
+
+# Preventable flag
+preventable = np.isin(reason, ['overprep', 'damage', 'quality_issue'])
+
+mermas_df = pd.DataFrame({
+    'date': sales_df['date'].values[wasted],
+    'item_name': sales_df['item_name'].values[wasted],
+    'merma_qty': merma_qty,
+    'reason': reason,
+    'value_lost_clp': merma_qty * sale_cost[wasted],
+    'preventable': np.where(preventable, 'yes', 'no')
+})
 mermas_df.to_csv('mermas.csv', index=False, encoding='utf-8')
 print(f"[OK] Generated mermas.csv with {len(mermas_df):,} rows")
 
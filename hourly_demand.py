@@ -0,0 +1,239 @@
+"""
+Hourly demand cube & intraday forecast
+Builds a dense (day x hour x category) cube of orders, quantities and
+revenue from the sales table with one np.bincount per measure (no groupby),
+and forecasts covers per hour for the coming days:
+
+  - period level: mean covers of each service period (lunch, dinner, late
+    night) on the same weekday over the last `weeks` weeks
+  - hour profile: share of each hour within its period, pooled over the
+    whole history window (more data than per-weekday shares)
+  - category mix: orders and qty per category for each hour
+
+Each generated sales row is one order, so order counts are used as covers.
+
+Usage:
+    python hourly_demand.py --start 2025-12-01 --days 7
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+
+from daily_aggregates import CHUNK_ROWS, iter_table_chunks
+
+# Service periods (shared with the sales generator, staff scheduler and occupancy model)
+# Lunch (12:00-16:00), Dinner (19:00-23:00), Late Night (23:00-02:00)
+SERVICE_PERIODS = [
+    {'name': 'lunch', 'start': 12, 'end': 16, 'weight': 0.3},       # Lunch
+    {'name': 'dinner', 'start': 19, 'end': 23, 'weight': 0.5},      # Dinner
+    {'name': 'late_night', 'start': 23, 'end': 24, 'weight': 0.2}   # Late night
+]
+
+HOURS = 24
+PERIODS = [p['name'] for p in SERVICE_PERIODS]
+PERIOD_OF_HOUR = np.full(HOURS, -1)  # -1: closed
+for _i, _p in enumerate(SERVICE_PERIODS):
+    PERIOD_OF_HOUR[_p['start']:_p['end']] = _i
+SALES_COLUMNS = ['date', 'hour', 'item_type', 'qty_sold', 'revenue']
+
+
+class HourlyCube:
+    """
+    orders / qty / revenue: arrays (days, HOURS, categories)
+    Day 0 is self.start; both axes grow as new dates/categories appear.
+    """
+
+    def __init__(self, categories=()):
+        self.start = None
+        self.categories = list(categories)
+        self.orders = np.zeros((0, HOURS, len(self.categories)), dtype=np.int64)
+        self.qty = np.zeros_like(self.orders)
+        self.revenue = np.zeros((0, HOURS, len(self.categories)))
+
+    @property
+    def dates(self):
+        if self.start is None:
+            return pd.DatetimeIndex([])
+        return pd.date_range(self.start, periods=len(self.orders))
+
+    def _grow(self, first, last, categories):
+        new_categories = [c for c in dict.fromkeys(categories) if c not in self.categories]
+        pad_before = 0
+        if self.start is None:
+            self.start = first
+        elif first < self.start:
+            pad_before = (self.start - first).days
+            self.start = first
+        n_days = (last - self.start).days + 1
+        pad_after = max(0, n_days - len(self.orders) - pad_before)
+        if new_categories or pad_before or pad_after:
+            self.categories += new_categories
+            pad = ((pad_before, pad_after), (0, 0), (0, len(new_categories)))
+            self.orders = np.pad(self.orders, pad)
+            self.qty = np.pad(self.qty, pad)
+            self.revenue = np.pad(self.revenue, pad)
+
+    def add(self, sales):
+        """Fold sales rows (date, hour, item_type, qty_sold, revenue) into the cube"""
+        if 'hour' not in sales.columns:
+            raise ValueError("Sales have no 'hour' column: regenerate them with generate_synthetic_data_v2.py")
+        if len(sales) == 0:
+            return self
+        dates = pd.to_datetime(sales['date']).values.astype('datetime64[D]')
+        first, last = pd.Timestamp(dates.min()), pd.Timestamp(dates.max())
+        self._grow(first, last, sales['item_type'].unique())
+
+        day = (dates - np.datetime64(self.start.date(), 'D')).astype(np.int64)
+        cat = pd.Index(self.categories).get_indexer(sales['item_type'])
+        flat = (day * HOURS + sales['hour'].values.astype(np.int64)) * len(self.categories) + cat
+        size = self.orders.size
+        shape = self.orders.shape
+        self.orders += np.bincount(flat, minlength=size).reshape(shape)
+        self.qty += np.bincount(flat, weights=sales['qty_sold'].values, minlength=size).astype(np.int64).reshape(shape)
+        self.revenue += np.bincount(flat, weights=sales['revenue'].values, minlength=size).reshape(shape)
+        return self
+
+    @classmethod
+    def from_sales(cls, sales):
+        return cls().add(sales)
+
+    @classmethod
+    def from_file(cls, path, chunksize=CHUNK_ROWS):
+        """Cube of a sales CSV/Parquet, read one chunk at a time"""
+        cube = cls()
+        for chunk in iter_table_chunks(path, SALES_COLUMNS, chunksize):
+            cube.add(chunk)
+        return cube
+
+    # --- views ---
+    def covers(self):
+        """Covers per (day, hour)"""
+        return self.orders.sum(axis=2)
+
+    def period_covers(self, covers=None):
+        """Covers per (day, service period)"""
+        covers = self.covers() if covers is None else covers
+        return np.stack([covers[:, PERIOD_OF_HOUR == p].sum(axis=1) for p in range(len(PERIODS))], axis=1)
+
+    def slice(self, start, end):
+        """Index range [i, j) of the cube days inside [start, end]"""
+        i = max(0, (pd.Timestamp(start) - self.start).days)
+        j = min(len(self.orders), (pd.Timestamp(end) - self.start).days + 1)
+        return i, max(i, j)
+
+    def to_frame(self, measure='orders'):
+        """Long table (date, hour, category, value) of the non-empty cells"""
+        values = getattr(self, measure)
+        d, h, c = np.nonzero(values)
+        return pd.DataFrame({
+            'date': self.dates[d], 'hour': h,
+            'category': np.array(self.categories, dtype=object)[c], measure: values[d, h, c]
+        })
+
+
+# ==========================================
+# INTRADAY FORECAST
+# ==========================================
+def forecast_intraday(cube, start, days=7, weeks=8):
+    """
+    Per-hour forecast for `days` days from `start`, using only the
+    `weeks` full weeks before it.
+    Returns DataFrame: date, hour, period, covers, then orders_<cat>, qty_<cat>
+    """
+    start = pd.Timestamp(start)
+    hist_end = (start - cube.start).days  # Exclusive
+    hist_start = hist_end - 7 * weeks
+    if hist_start < 0 or hist_end > len(cube.orders):
+        raise ValueError(f"Need {weeks} weeks of history before {start.date()}")
+    orders = cube.orders[hist_start:hist_end]            # (7w, 24, C)
+    covers = orders.sum(axis=2)                          # (7w, 24)
+
+    # Period level per weekday slot (slot k = weekday of start + k)
+    level = cube.period_covers(covers).reshape(weeks, 7, len(PERIODS)).mean(axis=0)  # (7, P)
+
+    # Hour profile within its period, pooled over the window
+    by_hour = covers.sum(axis=0).astype(float)
+    profile = np.zeros(HOURS)
+    for p in range(len(PERIODS)):
+        in_period = PERIOD_OF_HOUR == p
+        total = by_hour[in_period].sum()
+        profile[in_period] = by_hour[in_period] / total if total else 1.0 / in_period.sum()
+
+    # Category mix and qty per order per hour
+    orders_hc = orders.sum(axis=0).astype(float)                   # (24, C)
+    mix = orders_hc / np.maximum(orders_hc.sum(axis=1, keepdims=True), 1)
+    qty_per_order = cube.qty[hist_start:hist_end].sum(axis=0) / np.maximum(orders_hc, 1)
+
+    slots = np.arange(days) % 7
+    open_hours = PERIOD_OF_HOUR >= 0
+    hour_covers = np.where(open_hours, level[slots][:, np.maximum(PERIOD_OF_HOUR, 0)] * profile, 0.0)  # (days, 24)
+
+    dates = pd.date_range(start, periods=days)
+    hours = np.flatnonzero(open_hours)
+    out = pd.DataFrame({
+        'date': np.repeat(dates, len(hours)),
+        'hour': np.tile(hours, days),
+        'period': np.array(PERIODS, dtype=object)[PERIOD_OF_HOUR[np.tile(hours, days)]],
+        'covers': hour_covers[:, hours].ravel(),
+    })
+    cat_orders = hour_covers[:, hours, None] * mix[hours][None]          # (days, open hours, C)
+    cat_qty = cat_orders * qty_per_order[hours][None]
+    for k, cat in enumerate(cube.categories):
+        out[f'orders_{cat}'] = cat_orders[:, :, k].ravel()
+        out[f'qty_{cat}'] = cat_qty[:, :, k].ravel()
+    return out
+
+
+def period_forecast(forecast):
+    """Covers per date and service period from forecast_intraday output"""
+    return forecast.pivot_table(index='date', columns='period', values='covers', aggfunc='sum')[PERIODS]
+
+
+def backtest(cube, first_week, n_weeks, weeks=8):
+    """
+    Forecast each of n_weeks consecutive weeks from first_week and compare
+    period covers with the actuals and with a same-day-last-week baseline.
+    Returns DataFrame per period: actual, mae_model, mae_naive, mape_model, mape_naive
+    """
+    actual_all = cube.period_covers()
+    rows = []
+    for w in range(n_weeks):
+        start = pd.Timestamp(first_week) + pd.Timedelta(weeks=w)
+        i = (start - cube.start).days
+        predicted = period_forecast(forecast_intraday(cube, start, 7, weeks)).values
+        rows.append((actual_all[i:i + 7], predicted, actual_all[i - 7:i]))
+    actual = np.concatenate([r[0] for r in rows])
+    predicted = np.concatenate([r[1] for r in rows])
+    naive = np.concatenate([r[2] for r in rows])
+    return pd.DataFrame({
+        'actual': actual.mean(axis=0),
+        'mae_model': np.abs(predicted - actual).mean(axis=0),
+        'mae_naive': np.abs(naive - actual).mean(axis=0),
+        'mape_model': (np.abs(predicted - actual) / np.maximum(actual, 1)).mean(axis=0),
+        'mape_naive': (np.abs(naive - actual) / np.maximum(actual, 1)).mean(axis=0),
+    }, index=PERIODS)
+
+
+if __name__ == '__main__':
+    import time
+    parser = argparse.ArgumentParser(description="Hourly demand cube and intraday covers forecast")
+    parser.add_argument('--sales', default='ventas_sinteticas_3anos.csv')
+    parser.add_argument('--start', help="First forecast day (default: day after the last sale)")
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--weeks', type=int, default=8, help="Weeks of history per forecast")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    cube = HourlyCube.from_file(args.sales)
+    print(f"[OK] Cube {cube.orders.shape} (days x hours x categories) in {time.perf_counter() - t0:.2f}s")
+
+    start = pd.Timestamp(args.start) if args.start else cube.dates[-1] + pd.Timedelta(days=1)
+    t0 = time.perf_counter()
+    forecast = forecast_intraday(cube, start, args.days, args.weeks)
+    print(f"[OK] {len(forecast)} hourly forecasts in {(time.perf_counter() - t0) * 1000:.1f}ms")
+
+    print("\nCovers per service period:")
+    print(period_forecast(forecast).round(1).to_string())
+    print("\nCovers per hour (mean over the forecast days):")
+    print(forecast.groupby('hour')['covers'].mean().round(1).to_string())
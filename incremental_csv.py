@@ -0,0 +1,118 @@
+"""
+Append-only CSV reader
+Remembers how far a CSV has been read (byte offset + header + hash of the
+last bytes read) so the next read only parses appended lines. A different,
+shrunk or rewritten file is reported so the caller can rebuild.
+"""
+
+import hashlib
+import io
+import os
+import pandas as pd
+
+TAIL_CHECK_BYTES = 4096  # Bytes before the offset re-hashed to detect a rewritten CSV
+
+
+def tail_digest(csv_path, offset):
+    """Hash of the bytes just before offset (same file prefix => same digest)"""
+    if offset == 0:
+        return ''
+    with open(csv_path, 'rb') as f:
+        f.seek(max(0, offset - TAIL_CHECK_BYTES))
+        return hashlib.sha1(f.read(min(offset, TAIL_CHECK_BYTES))).hexdigest()
+
+
+def new_cursor(csv_path):
+    return {'source': os.path.abspath(csv_path), 'offset': 0, 'columns': None, 'tail_digest': ''}
+
+
+def _last_line_end(csv_path, start, size, block=65536):
+    """Offset just past the last newline at or after start (start if none)"""
+    with open(csv_path, 'rb') as f:
+        pos = size
+        while pos > start:
+            lo = max(start, pos - block)
+            f.seek(lo)
+            idx = f.read(pos - lo).rfind(b'\n')
+            if idx >= 0:
+                return lo + idx + 1
+            pos = lo
+    return start
+
+
+class _ByteWindow(io.RawIOBase):
+    """Read-only view of bytes [start, end) of a file"""
+
+    def __init__(self, path, start, end):
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._left = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self._file.readinto(memoryview(buffer)[:min(len(buffer), self._left)])
+        self._left -= n
+        return n
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+class AppendedRows:
+    """
+    Rows appended to csv_path since `cursor`, read in chunks of `chunksize`
+    rows (one DataFrame if None) so memory stays bounded on a first read.
+    rebuilt: the file was read from the start (no/invalid cursor)
+    cursor: cursor to persist once every chunk has been consumed
+    Only complete lines are read; a partially written last line waits.
+    """
+
+    def __init__(self, csv_path, cursor=None, chunksize=None, **read_csv_kwargs):
+        size = os.path.getsize(csv_path)
+        self.rebuilt = (
+            cursor is None
+            or cursor['source'] != os.path.abspath(csv_path)
+            or size < cursor['offset']
+            or tail_digest(csv_path, cursor['offset']) != cursor['tail_digest']
+        )
+        cursor = new_cursor(csv_path) if self.rebuilt else dict(cursor)
+        if cursor['offset'] == 0:
+            with open(csv_path, 'rb') as f:
+                header = f.readline()
+            cursor['columns'] = header.decode('utf-8').strip().split(',')
+            cursor['offset'] = len(header)
+
+        self.csv_path = csv_path
+        self.chunksize = chunksize
+        self.read_csv_kwargs = read_csv_kwargs
+        self.start = cursor['offset']
+        self.end = _last_line_end(csv_path, self.start, size)
+        cursor['offset'] = self.end
+        cursor['tail_digest'] = tail_digest(csv_path, self.end)
+        self.cursor = cursor
+
+    def __iter__(self):
+        if self.end == self.start:
+            return
+        with io.BufferedReader(_ByteWindow(self.csv_path, self.start, self.end)) as window:
+            reader = pd.read_csv(window, names=self.cursor['columns'], header=None,
+                                 chunksize=self.chunksize, **self.read_csv_kwargs)
+            if self.chunksize is None:
+                yield reader
+            else:
+                yield from reader
+
+
+def read_appended(csv_path, cursor=None, **read_csv_kwargs):
+    """
+    Rows appended to csv_path since `cursor`.
+    Returns (new_rows DataFrame, updated cursor, rebuilt) where rebuilt is
+    True when the file was read from the start (no/invalid cursor).
+    """
+    appended = AppendedRows(csv_path, cursor, **read_csv_kwargs)
+    chunks = list(appended)
+    new_rows = chunks[0] if chunks else pd.DataFrame(columns=appended.cursor['columns'])
+    return new_rows, appended.cursor, appended.rebuilt
@@ -0,0 +1,254 @@
+"""
+Ingredient catalog
+Parses the ingredient lists of ficha_tecnica.csv once into a persisted
+catalog (normalized name, quantity, unit, category per ingredient).
+Categories are resolved with an Aho–Corasick matcher over the keywords of
+INGREDIENT_CATEGORY_MAP (one pass per string instead of one substring scan
+per keyword). Only new or edited dishes are parsed on update.
+"""
+
+import json
+import os
+import re
+import hashlib
+import unicodedata
+from collections import deque
+
+import pandas as pd
+
+CATALOG_PATH = 'ingredient_catalog.json'
+DEFAULT_QTY = 100.0  # Default 100g if not specified (rough estimate)
+DEFAULT_CATEGORY = 'grocery'
+
+INGREDIENT_CATEGORY_MAP = {
+    'carne': 'meat', 'vacuno': 'meat', 'pollo': 'meat', 'cerdo': 'meat', 'lomo': 'meat', 'jamón': 'meat', 'salame': 'meat', 'chorizo': 'meat', 'pepperoni': 'meat',
+    'lechuga': 'veg', 'tomate': 'veg', 'cebolla': 'veg', 'palta': 'veg', 'pimentón': 'veg', 'verdura': 'veg', 'rúcula': 'veg', 'champiñon': 'veg', 'ajo': 'veg', 'perejil': 'veg', 'cilantro': 'veg', 'limón': 'veg', 'fruta': 'veg', 'papaya': 'veg', 'pepino': 'veg', 'albahaca': 'veg',
+    'masa': 'grocery', 'pan': 'grocery', 'arroz': 'grocery', 'harina': 'grocery', 'azúcar': 'grocery', 'aceite': 'grocery', 'salsa': 'grocery', 'vinagreta': 'grocery', 'chocolate': 'grocery', 'helado': 'grocery', 'merengue': 'grocery', 'crema': 'dairy',
+    'queso': 'dairy', 'mozzarella': 'dairy', 'cheddar': 'dairy', 'parmesano': 'dairy', 'gorgonzola': 'dairy', 'cabra': 'dairy', 'mantequilla': 'dairy', 'huevo': 'dairy', 'leche': 'dairy',
+    'camaron': 'seafood', 'salmón': 'seafood', 'pescado': 'seafood', 'jaiba': 'seafood', 'loco': 'seafood', 'marisco': 'seafood', 'atún': 'seafood',
+    'vino': 'wine', 'bebida': 'beverage', 'agua': 'beverage', 'jugo': 'beverage'
+}
+
+QTY_PATTERN = re.compile(r'\((\d+)\s*(g|ml)\)')
+
+
+# ==========================================
+# HELPER FUNCTIONS
+# ==========================================
+def normalize_name(text):
+    """Lowercase, strip accents and collapse whitespace ('Queso  Cheddar' -> 'queso cheddar')."""
+    text = unicodedata.normalize('NFKD', str(text).lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.split())
+
+
+def parse_ingredients(ing_json_str):
+    """
+    Parse ingredient string list from ficha tecnica.
+    Returns list of dicts: {'name': 'carne', 'qty_g': 150, 'category': 'meat'}
+    Scalar reference for IngredientCatalog (regex + linear keyword scan).
+    """
+    try:
+        items = json.loads(ing_json_str)
+    except:
+        return []
+
+    parsed = []
+    for item in items:
+        item_lower = item.lower()
+        # Extract quantity if present, e.g., "carne (150g)"
+        qty_match = re.search(r'\((\d+)\s*(g|ml)\)', item_lower)
+        qty = float(qty_match.group(1)) if qty_match else 100.0 # Default 100g if not specified (rough estimate)
+
+        # Determine category
+        category = 'grocery' # Default
+        for key, cat in INGREDIENT_CATEGORY_MAP.items():
+            if key in item_lower:
+                category = cat
+                break
+
+        parsed.append({
+            'raw_name': item,
+            'clean_name': item.split('(')[0].strip(),
+            'qty_g': qty,
+            'category': category
+        })
+    return parsed
+
+
+# ==========================================
+# KEYWORD MATCHER (AHO–CORASICK)
+# ==========================================
+class KeywordMatcher:
+    """
+    Aho–Corasick automaton over an ordered keyword list.
+    first(text) returns the index of the earliest-listed keyword contained in
+    text, i.e. the same answer as scanning the list with `key in text`.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [set()]
+
+        for idx, word in enumerate(self.keywords):
+            node = 0
+            for ch in word:
+                if ch not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(set())
+                    self.goto[node][ch] = len(self.goto) - 1
+                node = self.goto[node][ch]
+            self.out[node].add(idx)
+
+        # Breadth-first failure links; outputs inherit their fallback's outputs
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0)
+                self.out[child] |= self.out[self.fail[child]]
+
+    def find(self, text):
+        """Indices of every keyword occurring in text"""
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            found |= self.out[node]
+        return found
+
+    def first(self, text):
+        found = self.find(text)
+        return min(found) if found else None
+
+
+# ==========================================
+# CATALOG
+# ==========================================
+class IngredientCatalog:
+    """
+    JSON-backed catalog: item_name -> {source_hash, ingredients: [...]}.
+    Each ingredient: raw_name, clean_name, name (normalized), qty, unit,
+    qty_default, qty_g, category. path=None keeps it in memory only.
+    """
+
+    def __init__(self, path=CATALOG_PATH, category_map=INGREDIENT_CATEGORY_MAP):
+        self.path = path
+        self.category_map = dict(category_map)
+        self.matcher = KeywordMatcher(self.category_map.keys())
+        self.categories = list(self.category_map.values())
+        # Editing the keyword map invalidates every parsed dish
+        self.map_version = hashlib.sha1(
+            json.dumps(list(self.category_map.items()), ensure_ascii=False).encode('utf-8')
+        ).hexdigest()[:12]
+        self.dishes = {}
+        self._parsed_strings = {}  # Ingredient string -> parsed dict (shared across dishes)
+        self._load()
+
+    # --- persistence ---
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return  # Corrupt catalog is simply rebuilt
+        if payload.get('map_version') == self.map_version:
+            self.dishes = payload.get('dishes', {})
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'map_version': self.map_version, 'dishes': self.dishes}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    # --- parsing ---
+    @staticmethod
+    def _source_hash(ingredients):
+        return hashlib.sha1(str(ingredients).encode('utf-8')).hexdigest()[:12]
+
+    def parse_ingredient(self, item):
+        if item not in self._parsed_strings:
+            item_lower = item.lower()
+            qty_match = QTY_PATTERN.search(item_lower)
+            key = self.matcher.first(item_lower)
+            clean_name = item.split('(')[0].strip()
+            qty = float(qty_match.group(1)) if qty_match else DEFAULT_QTY
+            self._parsed_strings[item] = {
+                'raw_name': item,
+                'clean_name': clean_name,
+                'name': normalize_name(clean_name),
+                'qty': qty,
+                'unit': qty_match.group(2) if qty_match else 'g',
+                'qty_default': qty_match is None,
+                'qty_g': qty,  # ml counted as g (same as parse_ingredients)
+                'category': self.categories[key] if key is not None else DEFAULT_CATEGORY
+            }
+        return dict(self._parsed_strings[item])
+
+    def parse_dish(self, ing_json_str):
+        try:
+            items = json.loads(ing_json_str)
+        except (TypeError, ValueError):
+            return []
+        return [self.parse_ingredient(item) for item in items]
+
+    # --- public API ---
+    def update(self, ficha_df):
+        """
+        Sync with ficha_tecnica: parse new/edited dishes, drop removed ones.
+        Returns {'parsed': n, 'reused': n, 'removed': n}
+        """
+        ficha = ficha_df.drop_duplicates('item_name', keep='last')
+        stats = {'parsed': 0, 'reused': 0, 'removed': 0}
+        current = set()
+        for item_name, ingredients in zip(ficha['item_name'], ficha['ingredients']):
+            current.add(item_name)
+            source_hash = self._source_hash(ingredients)
+            entry = self.dishes.get(item_name)
+            if entry and entry['source_hash'] == source_hash:
+                stats['reused'] += 1
+                continue
+            self.dishes[item_name] = {'source_hash': source_hash, 'ingredients': self.parse_dish(ingredients)}
+            stats['parsed'] += 1
+
+        for item_name in [k for k in self.dishes if k not in current]:
+            del self.dishes[item_name]
+            stats['removed'] += 1
+
+        if stats['parsed'] or stats['removed']:
+            self._save()
+        return stats
+
+    def dish(self, item_name):
+        """Parsed ingredients of a dish ([] if unknown)"""
+        entry = self.dishes.get(item_name)
+        return entry['ingredients'] if entry else []
+
+    def to_frame(self):
+        """Long table: one row per (item_name, ingredient)"""
+        rows = [
+            {'item_name': item_name, **ing}
+            for item_name, entry in self.dishes.items()
+            for ing in entry['ingredients']
+        ]
+        return pd.DataFrame(rows)
+
+
+def load_catalog(ficha_path='ficha_tecnica.csv', path=CATALOG_PATH):
+    """Catalog synced with the ficha on disk"""
+    catalog = IngredientCatalog(path)
+    catalog.update(pd.read_csv(ficha_path))
+    return catalog
@@ -0,0 +1,187 @@
+"""
+Vectorized inventory simulation
+Simulates ingredient stock (days x categories) for many replenishment
+policies at once: every policy is a row of a (policies x categories) state
+array, so one pass over the days evaluates the whole sweep.
+
+Policy parameters:
+  - buffer_pct: safety buffer over the demand of the coverage window
+  - order_days: weekdays with purchases (Mon=0); each order covers the
+    demand until the next order arrives
+  - min_order_kg: orders below this (rounded to 0.01 kg) are skipped
+  - lead_time_days: days between ordering and receiving
+
+Usage:
+    python inventory_sim.py
+"""
+
+import itertools
+import numpy as np
+import pandas as pd
+
+# Current policy of generate_purchases_v2.py (Mon/Thu, demand + 25%, 0.5 kg minimum, same-day delivery)
+BASE_POLICY = {'buffer_pct': 0.25, 'order_days': (0, 3), 'min_order_kg': 0.5, 'lead_time_days': 0}
+INITIAL_STOCK_G = 20000.0  # Start with 20kg base stock
+
+# Days an ingredient category keeps once received; stock beyond the demand
+# of this window is exposed to waste
+SHELF_LIFE_DAYS = {
+    'meat': 4, 'veg': 3, 'seafood': 2, 'dairy': 7,
+    'grocery': 30, 'beverage': 14, 'wine': 90
+}
+
+
+def policy_grid(buffer_pcts=(0.0, 0.1, 0.25, 0.4), order_days=((0, 3), (0, 2, 4), (0,), (0, 1, 2, 3, 4, 5)),
+                min_order_kgs=(0.0, 0.5, 2.0), lead_time_days=(0, 1, 2)):
+    """Cartesian product of policy parameters as a DataFrame (one row per policy)"""
+    rows = itertools.product(buffer_pcts, order_days, min_order_kgs, lead_time_days)
+    return pd.DataFrame(rows, columns=['buffer_pct', 'order_days', 'min_order_kg', 'lead_time_days'])
+
+
+def order_calendar(dates, order_days):
+    """
+    For one weekday set: is_order (days,) and next_order (days,), the index
+    of the following order day (len(dates) if none is left).
+    """
+    dow = pd.DatetimeIndex(dates).dayofweek.values
+    is_order = np.isin(dow, list(order_days))
+    next_order = np.full(len(dates), len(dates))
+    upcoming = len(dates)
+    for t in range(len(dates) - 1, -1, -1):
+        next_order[t] = upcoming
+        if is_order[t]:
+            upcoming = t
+    return is_order, next_order
+
+
+def simulate_policies(consumption, policies, unit_costs, shelf_life_days=SHELF_LIFE_DAYS,
+                      initial_stock_g=INITIAL_STOCK_G, lost_sales=True, record_orders=False):
+    """
+    consumption: DataFrame (days x categories) in grams, DatetimeIndex
+    policies: DataFrame from policy_grid (or list of policy dicts)
+    unit_costs: CLP per kg for each category
+    initial_stock_g: grams, scalar or one value per category
+    lost_sales: unmet demand is lost (stock floors at 0); False keeps the
+        negative book stock of generate_purchases_v2.py (backorders)
+    Returns (metrics DataFrame per policy,
+             orders (policies x days x categories) grams or None,
+             ending stock (policies x categories) grams)
+    """
+    policies = pd.DataFrame(policies).reset_index(drop=True)
+    categories = list(consumption.columns)
+    use = consumption.values.astype(float)
+    n_days, n_cat = use.shape
+    n_pol = len(policies)
+    cost_kg = np.array([unit_costs[c] for c in categories], dtype=float)
+    shelf = np.array([shelf_life_days[c] for c in categories])
+
+    # Demand between two day indices is a difference of cumulative sums
+    # (grams are integers, so the sums are exact)
+    cum = np.vstack([np.zeros((1, n_cat)), np.cumsum(use, axis=0)])
+
+    calendars = {days: order_calendar(consumption.index, days) for days in set(map(tuple, policies['order_days']))}
+    is_order = np.array([calendars[tuple(d)][0] for d in policies['order_days']])   # (P, D)
+    next_order = np.array([calendars[tuple(d)][1] for d in policies['order_days']])  # (P, D)
+    buffer = policies['buffer_pct'].values[:, None]
+    min_g = policies['min_order_kg'].values[:, None]
+    lead = policies['lead_time_days'].values.astype(int)
+    ring = int(lead.max()) + 1
+
+    on_hand = np.broadcast_to(np.asarray(initial_stock_g, dtype=float), (n_pol, n_cat)).copy()
+    pipeline = np.zeros((ring, n_pol, n_cat))  # Orders in transit, by arrival day % ring
+    orders = np.zeros((n_pol, n_days, n_cat)) if record_orders else None
+
+    spend = np.zeros(n_pol)
+    n_orders = np.zeros(n_pol, dtype=int)
+    shortage = np.zeros((n_pol, n_cat))
+    stockout_days = np.zeros(n_pol, dtype=int)
+    on_hand_sum = np.zeros((n_pol, n_cat))
+    exposure_sum = np.zeros(n_pol)
+
+    for t in range(n_days):
+        # 1. Orders (perfect knowledge of future consumption)
+        ordering = np.flatnonzero(is_order[:, t])
+        if len(ordering):
+            arrival = np.minimum(t + lead[ordering], n_days)
+            window_end = np.minimum(next_order[ordering, t] + lead[ordering], n_days)
+            window_end = np.maximum(window_end, arrival)
+            demand = cum[window_end] - cum[arrival]
+            target = demand + demand * buffer[ordering]
+            in_transit = pipeline[:, ordering].sum(axis=0)
+            used_before_arrival = cum[arrival] - cum[t]
+            projected = on_hand[ordering] + in_transit - used_before_arrival
+            buy = np.maximum(0, target - projected)
+            place = (buy > 0) & (np.round(buy / 1000.0, 2) >= min_g[ordering]) & (t + lead[ordering] < n_days)[:, None]
+            buy = np.where(place, buy, 0.0)
+
+            pipeline[(t + lead[ordering]) % ring, ordering] += buy
+            spend[ordering] += np.trunc((buy / 1000.0) * cost_kg).sum(axis=1)
+            n_orders[ordering] += place.sum(axis=1)
+            if record_orders:
+                orders[ordering, t] = buy
+
+        # 2. Deliveries
+        slot = t % ring
+        on_hand += pipeline[slot]
+        pipeline[slot] = 0.0
+
+        # 3. Consumption
+        short = np.maximum(0.0, use[t] - np.maximum(on_hand, 0.0))
+        shortage += short
+        stockout_days += (short > 0).sum(axis=1)
+        on_hand = on_hand - use[t]
+        if lost_sales:
+            on_hand = np.maximum(0.0, on_hand)
+
+        # 4. End-of-day stock and waste exposure
+        stock = np.maximum(on_hand, 0.0)
+        on_hand_sum += stock
+        coming_use = cum[np.minimum(t + 1 + shelf, n_days), np.arange(n_cat)] - cum[t + 1]
+        exposure_sum += (np.maximum(0.0, stock - coming_use) / 1000.0 * cost_kg).sum(axis=1)
+
+    total_use = use.sum(axis=0)
+    metrics = policies.copy()
+    metrics['n_orders'] = n_orders
+    metrics['spend_clp'] = spend
+    metrics['stockout_days'] = stockout_days
+    metrics['fill_rate'] = 1 - shortage.sum(axis=1) / total_use.sum()
+    metrics['avg_on_hand_kg'] = on_hand_sum.sum(axis=1) / n_days / 1000.0
+    metrics['avg_on_hand_clp'] = (on_hand_sum / n_days / 1000.0 * cost_kg).sum(axis=1)
+    metrics['waste_exposure_clp'] = exposure_sum / n_days  # Avg daily value of stock past shelf life
+    metrics['ending_stock_kg'] = on_hand.sum(axis=1) / 1000.0
+    return metrics, orders, on_hand
+
+
+if __name__ == '__main__':
+    import time
+    from bom import RecipeBOM
+    from ingredient_catalog import IngredientCatalog
+    from generate_purchases_v2 import SUPPLIERS, INGREDIENT_COSTS
+
+    print("Loading data...")
+    ventas = pd.read_csv('ventas_sinteticas_3anos.csv')
+    mermas = pd.read_csv('mermas.csv')
+    ficha = pd.read_csv('ficha_tecnica.csv')
+    ventas['date'] = pd.to_datetime(ventas['date'])
+    mermas['date'] = pd.to_datetime(mermas['date'])
+
+    bom = RecipeBOM(ficha, categories=list(SUPPLIERS.keys()), catalog=IngredientCatalog())
+    date_range = pd.date_range(start=ventas['date'].min(), end=ventas['date'].max())
+    consumption = bom.daily_consumption(date_range, ventas, mermas)
+
+    policies = policy_grid()
+    t0 = time.perf_counter()
+    metrics, _, _ = simulate_policies(consumption, policies, INGREDIENT_COSTS)
+    print(f"[OK] Simulated {len(policies)} policies x {len(date_range)} days in {time.perf_counter() - t0:.2f}s")
+
+    cols = ['buffer_pct', 'order_days', 'min_order_kg', 'lead_time_days', 'spend_clp',
+            'stockout_days', 'fill_rate', 'avg_on_hand_kg', 'waste_exposure_clp']
+    print("\nBest policies with fill rate >= 99.9% (lowest spend + waste exposure):")
+    safe = metrics[metrics['fill_rate'] >= 0.999]
+    print(safe.assign(score=safe['spend_clp'] + safe['waste_exposure_clp'] * len(date_range))
+              .sort_values('score')[cols].head(10).to_string(index=False))
+
+    is_base = metrics.apply(lambda p: all(p[k] == v for k, v in BASE_POLICY.items()), axis=1)
+    base = metrics[is_base]
+    print("\nCurrent policy:")
+    print(base[cols].to_string(index=False))
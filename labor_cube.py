@@ -0,0 +1,178 @@
+"""
+Labor productivity cube (rrhh_turnos.csv x daily sales)
+Staff shifts become dense (date x role x shift_type) arrays of shifts, labor
+hours and labor cost (one np.bincount each); daily revenue and items are
+joined by date position. Any slice (date range, weekdays, roles, shift
+types) is then an array mask-and-sum:
+
+  revenue per labor-hour = revenue of the selected days / selected labor hours
+  items per labor-hour   = items of the selected days / selected labor hours
+  labor cost %           = selected labor cost / revenue of the selected days
+
+A day's revenue is the output of the whole crew, so a role or shift-type
+slice reads as "revenue each hour of that group supports" (staffing
+intensity), not as revenue produced by that group alone.
+
+Outlier days: revenue per labor-hour far from the same-weekday norm (robust
+z-score of its log over a centered window of same-weekday days). Low =
+over-staffed, high = under-staffed.
+
+Usage:
+    python labor_cube.py
+"""
+
+import numpy as np
+import pandas as pd
+
+WEEKDAYS = ['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom']
+OUTLIER_Z = 3.5
+OUTLIER_WINDOW = 9  # Same-weekday days in the centered window (~2 months)
+
+
+class LaborCube:
+    """
+    shifts / hours / cost: arrays (days, roles, shift_types); revenue / items: (days,)
+    rrhh: date, role, shift_type, hours_worked, total_pay
+    daily_sales: DataFrame/Series indexed by date with 'revenue' and 'qty_sold'
+    """
+
+    def __init__(self, rrhh, daily_sales):
+        dates = pd.to_datetime(rrhh['date']).values.astype('datetime64[D]')
+        sales_dates = pd.to_datetime(daily_sales.index).values.astype('datetime64[D]')
+        start = min(dates.min(), sales_dates.min())
+        end = max(dates.max(), sales_dates.max())
+        self.dates = pd.date_range(pd.Timestamp(start), pd.Timestamp(end))
+        n_days = len(self.dates)
+
+        day = (dates - start).astype(np.int64)
+        role, self.roles = pd.factorize(rrhh['role'], sort=True)
+        shift, self.shift_types = pd.factorize(rrhh['shift_type'], sort=True)
+        self.roles, self.shift_types = list(self.roles), list(self.shift_types)
+        n_roles, n_shifts = len(self.roles), len(self.shift_types)
+
+        cell = (day * n_roles + role) * n_shifts + shift
+        size, shape = n_days * n_roles * n_shifts, (n_days, n_roles, n_shifts)
+        self.shifts = np.bincount(cell, minlength=size).reshape(shape)
+        self.hours = np.bincount(cell, weights=rrhh['hours_worked'].values, minlength=size).reshape(shape)
+        self.cost = np.bincount(cell, weights=rrhh['total_pay'].values, minlength=size).reshape(shape)
+
+        # Join daily sales by position in the date axis
+        pos = (sales_dates - start).astype(np.int64)
+        self.revenue = np.zeros(n_days)
+        self.items = np.zeros(n_days)
+        self.revenue[pos] = daily_sales['revenue'].values
+        self.items[pos] = daily_sales['qty_sold'].values
+        self.weekday = self.dates.dayofweek.values
+
+    @classmethod
+    def from_frames(cls, rrhh, sales):
+        """sales: line-level rows with date, revenue, qty_sold"""
+        daily = sales.groupby('date')[['revenue', 'qty_sold']].sum()
+        return cls(rrhh, daily)
+
+    def _mask(self, start=None, end=None, weekdays=None, roles=None, shift_types=None):
+        days = np.ones(len(self.dates), dtype=bool)
+        if start is not None:
+            days &= self.dates >= pd.Timestamp(start)
+        if end is not None:
+            days &= self.dates <= pd.Timestamp(end)
+        if weekdays is not None:
+            days &= np.isin(self.weekday, list(weekdays))
+        role_sel = np.isin(self.roles, self.roles if roles is None else list(roles))
+        shift_sel = np.isin(self.shift_types, self.shift_types if shift_types is None else list(shift_types))
+        return days, role_sel, shift_sel
+
+    def daily(self, roles=None, shift_types=None):
+        """Per-day DataFrame: revenue, items, shifts, hours, cost and the ratios for the selected roles/shifts"""
+        _, role_sel, shift_sel = self._mask(roles=roles, shift_types=shift_types)
+        sub = np.ix_(np.arange(len(self.dates)), role_sel, shift_sel)
+        out = pd.DataFrame({
+            'revenue': self.revenue, 'items': self.items,
+            'shifts': self.shifts[sub].sum(axis=(1, 2)),
+            'hours': self.hours[sub].sum(axis=(1, 2)),
+            'cost': self.cost[sub].sum(axis=(1, 2)),
+        }, index=pd.Index(self.dates, name='date'))
+        return _ratios(out)
+
+    def summary(self, by=None, start=None, end=None, weekdays=None, roles=None, shift_types=None):
+        """
+        Totals and ratios of a slice, grouped by None (one row), 'role',
+        'shift_type', 'weekday' or 'month'
+        """
+        days, role_sel, shift_sel = self._mask(start, end, weekdays, roles, shift_types)
+        hours = self.hours[days][:, role_sel][:, :, shift_sel]
+        cost = self.cost[days][:, role_sel][:, :, shift_sel]
+        shifts = self.shifts[days][:, role_sel][:, :, shift_sel]
+        revenue, items = self.revenue[days], self.items[days]
+
+        if by in ('role', 'shift_type'):
+            axis = (0, 2) if by == 'role' else (0, 1)
+            labels = np.array(self.roles if by == 'role' else self.shift_types)[role_sel if by == 'role' else shift_sel]
+            worked = (hours.sum(axis=2 if by == 'role' else 1) > 0)  # (days, groups): group on duty that day
+            out = pd.DataFrame({
+                'revenue': revenue @ worked, 'items': items @ worked,
+                'shifts': shifts.sum(axis=axis), 'hours': hours.sum(axis=axis), 'cost': cost.sum(axis=axis),
+            }, index=pd.Index(labels, name=by))
+        elif by in ('weekday', 'month'):
+            if by == 'weekday':
+                keys, labels = self.weekday[days], WEEKDAYS
+            else:
+                months = self.dates[days].to_period('M')
+                codes, uniques = pd.factorize(months, sort=True)
+                keys, labels = codes, uniques.astype(str)
+            n = len(labels)
+            out = pd.DataFrame({
+                'revenue': np.bincount(keys, weights=revenue, minlength=n),
+                'items': np.bincount(keys, weights=items, minlength=n),
+                'shifts': np.bincount(keys, weights=shifts.sum(axis=(1, 2)), minlength=n),
+                'hours': np.bincount(keys, weights=hours.sum(axis=(1, 2)), minlength=n),
+                'cost': np.bincount(keys, weights=cost.sum(axis=(1, 2)), minlength=n),
+            }, index=pd.Index(labels, name=by))
+        else:
+            out = pd.DataFrame({'revenue': [revenue.sum()], 'items': [items.sum()], 'shifts': [shifts.sum()],
+                                'hours': [hours.sum()], 'cost': [cost.sum()]})
+        return _ratios(out)
+
+    def outlier_days(self, z=OUTLIER_Z, window=OUTLIER_WINDOW, roles=None, shift_types=None):
+        """
+        Days whose revenue per labor-hour deviates from the same-weekday norm.
+        Returns the daily table of flagged days with expected value, z-score
+        and status ('sobre-dotado' / 'sub-dotado')
+        """
+        daily = self.daily(roles, shift_types)
+        daily = daily[(daily['hours'] > 0) & (daily['revenue'] > 0)].copy()
+        # Ratios: compare on log scale (half the usual productivity is as far off as double)
+        log_rph = np.log(daily['revenue_per_hour'])
+        weekday = daily.index.dayofweek
+        rolling_median = lambda s: s.rolling(window, center=True, min_periods=3).median()
+        median = log_rph.groupby(weekday).transform(rolling_median)
+        mad = (log_rph - median).abs().groupby(weekday).transform(rolling_median)
+        daily['expected_revenue_per_hour'] = np.exp(median)
+        daily['z'] = 0.6745 * (log_rph - median) / mad.replace(0, np.nan)
+        flagged = daily[daily['z'].abs() > z].copy()
+        flagged['status'] = np.where(flagged['z'] < 0, 'sobre-dotado', 'sub-dotado')
+        return flagged
+
+
+def _ratios(out):
+    hours = out['hours'].replace(0, np.nan)
+    out['revenue_per_hour'] = out['revenue'] / hours
+    out['items_per_hour'] = out['items'] / hours
+    out['labor_cost_pct'] = out['cost'] / out['revenue'].replace(0, np.nan)
+    return out
+
+
+if __name__ == '__main__':
+    import time
+    rrhh = pd.read_csv('rrhh_turnos.csv', parse_dates=['date'])
+    sales = pd.read_csv('ventas_sinteticas_3anos.csv', usecols=['date', 'revenue', 'qty_sold'], parse_dates=['date'])
+    t0 = time.perf_counter()
+    cube = LaborCube.from_frames(rrhh, sales)
+    print(f"[OK] Cube {cube.hours.shape} (days x roles x shift types) in {(time.perf_counter() - t0) * 1000:.0f}ms")
+
+    for by in ['role', 'shift_type', 'weekday']:
+        print(f"\nBy {by}:")
+        print(cube.summary(by)[['hours', 'revenue_per_hour', 'items_per_hour', 'labor_cost_pct']].round(3).to_string())
+    outliers = cube.outlier_days()
+    print(f"\n{len(outliers)} outlier days:")
+    print(outliers[['revenue', 'hours', 'revenue_per_hour', 'expected_revenue_per_hour', 'z', 'status']].round(1).tail(10).to_string())
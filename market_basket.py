@@ -0,0 +1,150 @@
+"""
+Market-basket / item-affinity analysis
+Which dishes and drinks are ordered together (ventas_historicas_3anos.csv
+groups lines by order_id). Orders become a sparse binary (orders x items)
+incidence matrix X:
+
+  - item co-occurrence: X.T @ X (diagonal = orders with the item)
+  - triples: for every frequent pair (a, b), the orders containing both
+    (X[:, a] * X[:, b]) times X counts orders with a, b and each c
+
+support = orders with the itemset / all orders
+confidence(A -> c) = support(A + c) / support(A)
+lift = support(itemset) / product of the item supports (>1: ordered together
+more often than by chance)
+
+Usage:
+    python market_basket.py --min-support 0.0001 --top 15
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+HISTORICAL_PATH = 'ventas_historicas_3anos.csv'
+MIN_SUPPORT = 0.0001  # ~2 orders in the historical file (few orders have 2+ items)
+
+
+def incidence_matrix(order_ids, item_names):
+    """
+    Sparse binary (orders x items) matrix; repeated lines of an item in the
+    same order count once. Returns (csr matrix, item names)
+    """
+    order_codes, _ = pd.factorize(order_ids)
+    item_codes, items = pd.factorize(item_names)
+    X = sp.csr_matrix(
+        (np.ones(len(order_codes), dtype=np.int32), (order_codes, item_codes)),
+        shape=(order_codes.max() + 1, len(items))
+    )
+    X.data[:] = 1  # Duplicates were summed by the constructor
+    return X, np.asarray(items, dtype=object)
+
+
+def frequent_pairs(X, items, min_support=MIN_SUPPORT):
+    """Item pairs (a < b) in at least min_support of the orders"""
+    n_orders = X.shape[0]
+    co = sp.triu(X.T @ X, k=1).tocoo()  # Upper triangle: each pair once
+    counts = np.asarray((X.sum(axis=0))).ravel()
+    keep = co.data >= min_support * n_orders
+    a, b, n_ab = co.row[keep], co.col[keep], co.data[keep]
+
+    support_a, support_b = counts[a] / n_orders, counts[b] / n_orders
+    support_ab = n_ab / n_orders
+    return pd.DataFrame({
+        'item_a': items[a], 'item_b': items[b], 'orders': n_ab,
+        'support': support_ab,
+        'confidence_a_b': n_ab / counts[a],
+        'confidence_b_a': n_ab / counts[b],
+        'lift': support_ab / (support_a * support_b),
+        'a': a, 'b': b,
+    })
+
+
+def frequent_triples(X, items, pairs, min_support=MIN_SUPPORT):
+    """
+    Triples (a < b < c) in at least min_support of the orders, grown from
+    the frequent pairs (every subset of a frequent triple is frequent).
+    """
+    n_orders = X.shape[0]
+    columns = ['item_a', 'item_b', 'item_c', 'orders', 'support', 'confidence', 'lift']
+    if pairs.empty:
+        return pd.DataFrame(columns=columns)
+    Xc = X.tocsc()
+    a, b = pairs['a'].values, pairs['b'].values
+    both = Xc[:, a].multiply(Xc[:, b]).tocsc()       # (orders x frequent pairs)
+    co = (both.T @ X).tocoo()                        # (frequent pairs x items)
+    pair_idx, c, n_abc = co.row, co.col, co.data
+    keep = (c > b[pair_idx]) & (n_abc >= min_support * n_orders)
+    pair_idx, c, n_abc = pair_idx[keep], c[keep], n_abc[keep]
+
+    counts = np.asarray(X.sum(axis=0)).ravel()
+    ia, ib = a[pair_idx], b[pair_idx]
+    support_abc = n_abc / n_orders
+    return pd.DataFrame({
+        'item_a': items[ia], 'item_b': items[ib], 'item_c': items[c], 'orders': n_abc,
+        'support': support_abc,
+        'confidence': n_abc / pairs['orders'].values[pair_idx],  # {a, b} -> c
+        'lift': support_abc / ((counts[ia] / n_orders) * (counts[ib] / n_orders) * (counts[c] / n_orders)),
+    })[columns]
+
+
+def basket_analysis(sales, min_support=MIN_SUPPORT, top=20, order_col='order_id', item_col='item_name'):
+    """
+    Returns {'n_orders', 'items' (orders/support per item),
+             'pairs', 'triples' (top by lift among frequent itemsets)}
+    """
+    X, items = incidence_matrix(sales[order_col].values, sales[item_col].values)
+    n_orders = X.shape[0]
+    counts = np.asarray(X.sum(axis=0)).ravel()
+    pairs = frequent_pairs(X, items, min_support)
+    triples = frequent_triples(X, items, pairs, min_support)
+    return {
+        'n_orders': n_orders,
+        'items': pd.DataFrame({'item_name': items, 'orders': counts, 'support': counts / n_orders})
+                   .sort_values('orders', ascending=False, ignore_index=True),
+        'pairs': pairs.drop(columns=['a', 'b']).sort_values(['lift', 'orders'], ascending=False, ignore_index=True).head(top),
+        'triples': triples.sort_values(['lift', 'orders'], ascending=False, ignore_index=True).head(top),
+    }
+
+
+def pairs_with(pairs, items):
+    """
+    Pairs involving any of `items` (e.g. the After Office 2x1 list), as
+    (promo_item, companion, confidence promo -> companion, lift)
+    """
+    items = set(items)
+    left = pairs[pairs['item_a'].isin(items)]
+    right = pairs[pairs['item_b'].isin(items)]
+    out = pd.concat([
+        pd.DataFrame({'promo_item': left['item_a'], 'companion': left['item_b'],
+                      'orders': left['orders'], 'confidence': left['confidence_a_b'], 'lift': left['lift']}),
+        pd.DataFrame({'promo_item': right['item_b'], 'companion': right['item_a'],
+                      'orders': right['orders'], 'confidence': right['confidence_b_a'], 'lift': right['lift']}),
+    ])
+    return out[~out['companion'].isin(items)].sort_values('lift', ascending=False, ignore_index=True)
+
+
+if __name__ == '__main__':
+    import json
+    import time
+    parser = argparse.ArgumentParser(description="Items ordered together (support, confidence, lift)")
+    parser.add_argument('--sales', default=HISTORICAL_PATH)
+    parser.add_argument('--min-support', type=float, default=MIN_SUPPORT)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    sales = pd.read_csv(args.sales, usecols=['order_id', 'item_name'])
+    t0 = time.perf_counter()
+    result = basket_analysis(sales, args.min_support, top=10 ** 6)
+    print(f"[OK] {len(sales):,} lines / {result['n_orders']:,} orders analysed in {time.perf_counter() - t0:.2f}s")
+
+    print("\nTop pairs by lift:")
+    print(result['pairs'].head(args.top).to_string(index=False))
+    print("\nTop triples by lift:")
+    print(result['triples'].head(args.top).to_string(index=False))
+
+    with open('promociones_reales.json', 'r', encoding='utf-8') as f:
+        after_office = json.load(f)['promociones_semanales']['after_office']['items_afectados']
+    print(f"\nBest companions of the After Office 2x1 items ({', '.join(after_office)}):")
+    print(pairs_with(result['pairs'], after_office).head(args.top).to_string(index=False))
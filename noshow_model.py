@@ -0,0 +1,198 @@
+"""
+No-show risk for reservations (reservas.csv)
+A logistic regression over one-hot channel / weekday / hour and numeric pax
+(plus lead time in days when the file has a booked_at column), trained on
+resolved reservations (Show / No-Show; cancellations are left out).
+
+NoShowScorer scores a batch of reservations in one vectorized call and
+keeps the scores per reservation_id, with a hash of the row's features and
+the model version: only new or edited bookings (or everything after a
+retrain) are sent to the model. The cache persists to noshow_scores.pkl.
+
+Expected show-up pax = pax x (1 - p_no_show), per date or service period.
+
+Usage:
+    python noshow_model.py --days 7
+"""
+
+import argparse
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from hourly_demand import PERIODS, PERIOD_OF_HOUR
+
+RESERVAS_PATH = 'reservas.csv'
+SCORES_PATH = 'noshow_scores.pkl'
+SCORES_VERSION = 1
+RESOLVED_STATUSES = ('Show', 'No-Show')
+CATEGORICAL_FEATURES = ['channel', 'weekday', 'hour']
+NUMERIC_FEATURES = ['pax']
+LEAD_TIME_COLUMN = 'booked_at'  # Not in reservas.csv yet; used when present
+
+
+def reservation_features(reservations):
+    """Model inputs per reservation (index aligned with reservations)"""
+    date = pd.to_datetime(reservations['date'])
+    features = pd.DataFrame({
+        'channel': reservations['channel'].astype(str).values,
+        'weekday': date.dt.dayofweek.values,
+        'hour': reservations['time'].astype(str).str.split(':').str[0].astype(int).values,
+        'pax': reservations['pax'].values.astype(float),
+    }, index=reservations.index)
+    if LEAD_TIME_COLUMN in reservations.columns:
+        booked = pd.to_datetime(reservations[LEAD_TIME_COLUMN])
+        features['lead_days'] = (date - booked).dt.total_seconds().values / 86400
+    return features
+
+
+class NoShowModel:
+    """P(No-Show) per reservation"""
+
+    def __init__(self, C=1.0):
+        self.C = C
+        self.pipeline = None
+        self.numeric = list(NUMERIC_FEATURES)
+        self.version = None
+        self.base_rate = None
+
+    def fit(self, reservations):
+        resolved = reservations[reservations['status'].isin(RESOLVED_STATUSES)]
+        X = reservation_features(resolved)
+        y = (resolved['status'] == 'No-Show').values.astype(int)
+        self.numeric = [c for c in NUMERIC_FEATURES + ['lead_days'] if c in X.columns]
+        self.pipeline = Pipeline([
+            ('encode', ColumnTransformer([
+                ('categorical', OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_FEATURES),
+                ('numeric', 'passthrough', self.numeric),
+            ])),
+            ('model', LogisticRegression(C=self.C, max_iter=1000)),
+        ])
+        self.pipeline.fit(X[CATEGORICAL_FEATURES + self.numeric], y)
+        self.base_rate = y.mean()
+        model = self.pipeline.named_steps['model']
+        self.version = hashlib.sha1(np.concatenate([model.coef_.ravel(), model.intercept_]).tobytes()).hexdigest()[:12]
+        return self
+
+    def predict(self, features):
+        """features: reservation_features() output -> array of P(No-Show)"""
+        return self.pipeline.predict_proba(features[CATEGORICAL_FEATURES + self.numeric])[:, 1]
+
+
+class NoShowScorer:
+    """
+    scores: DataFrame indexed by reservation_id (row_hash, p_no_show),
+    valid for self.model_version. score() only runs the model on rows whose
+    id is new or whose feature hash changed.
+    """
+
+    def __init__(self, path=SCORES_PATH):
+        self.path = path
+        self.model_version = None
+        self.scores = self._blank()
+        self.last_rescored = 0
+        self._load()
+
+    @staticmethod
+    def _blank():
+        return pd.DataFrame({'row_hash': pd.Series(dtype=np.uint64), 'p_no_show': pd.Series(dtype=float)},
+                            index=pd.Index([], name='reservation_id'))
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            state = pd.read_pickle(self.path)
+        except Exception:
+            return  # Corrupt cache is simply rebuilt
+        if state.get('version') == SCORES_VERSION:
+            self.model_version = state['model_version']
+            self.scores = state['scores']
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + '.tmp'
+        pd.to_pickle({'version': SCORES_VERSION, 'model_version': self.model_version, 'scores': self.scores}, tmp_path)
+        os.replace(tmp_path, self.path)
+
+    def score(self, reservations, model):
+        """P(No-Show) for every row of reservations (Series aligned with its index)"""
+        if model.version != self.model_version:
+            self.model_version = model.version
+            self.scores = self._blank()
+        features = reservation_features(reservations)
+        ids = reservations['reservation_id'].values
+        row_hash = pd.util.hash_pandas_object(features, index=False).values
+
+        cached = self.scores.reindex(ids)
+        stale = cached['row_hash'].isna().values | (cached['row_hash'].values != row_hash)
+        self.last_rescored = int(stale.sum())
+        if self.last_rescored:
+            fresh = pd.DataFrame({'row_hash': row_hash[stale], 'p_no_show': model.predict(features[stale])},
+                                 index=pd.Index(ids[stale], name='reservation_id'))
+            fresh = fresh[~fresh.index.duplicated(keep='last')]
+            self.scores = pd.concat([self.scores[~self.scores.index.isin(fresh.index)], fresh])
+            self._save()
+            cached = self.scores.reindex(ids)
+        return pd.Series(cached['p_no_show'].values, index=reservations.index, name='p_no_show')
+
+
+def expected_pax(reservations, p_no_show):
+    """Per date: reservations, booked pax and expected show-up pax (cancelled excluded)"""
+    active = reservations['status'] != 'Cancelled' if 'status' in reservations.columns else np.ones(len(reservations), bool)
+    res = reservations[active]
+    show = res['pax'].values * (1 - p_no_show[active].values)
+    out = pd.DataFrame({'date': pd.to_datetime(res['date']).values, 'pax': res['pax'].values, 'expected_pax': show})
+    return out.groupby('date').agg(reservations=('pax', 'size'), booked_pax=('pax', 'sum'), expected_pax=('expected_pax', 'sum'))
+
+
+def expected_pax_by_period(reservations, p_no_show, dates):
+    """(len(dates) x periods) expected show-up pax of the reservations in each service period"""
+    active = (reservations['status'] != 'Cancelled').values if 'status' in reservations.columns else np.ones(len(reservations), bool)
+    day = pd.DatetimeIndex(dates).get_indexer(pd.to_datetime(reservations['date']).dt.normalize())
+    period = PERIOD_OF_HOUR[reservations['time'].astype(str).str.split(':').str[0].astype(int).values % 24]
+    keep = active & (day >= 0) & (period >= 0)
+    show = reservations['pax'].values * (1 - p_no_show.values)
+    return np.bincount(day[keep] * len(PERIODS) + period[keep], weights=show[keep],
+                       minlength=len(dates) * len(PERIODS)).reshape(len(dates), len(PERIODS))
+
+
+def upcoming_split(reservations, days=7):
+    """(history, upcoming): the last `days` days of the file are treated as the coming week"""
+    date = pd.to_datetime(reservations['date'])
+    cutoff = date.max() - pd.Timedelta(days=days - 1)
+    return reservations[date < cutoff], reservations[date >= cutoff]
+
+
+if __name__ == '__main__':
+    import time
+    from sklearn.metrics import log_loss, roc_auc_score
+    parser = argparse.ArgumentParser(description="No-show risk of upcoming reservations")
+    parser.add_argument('--reservations', default=RESERVAS_PATH)
+    parser.add_argument('--days', type=int, default=7, help="Last days of the file scored as 'upcoming'")
+    args = parser.parse_args()
+
+    reservations = pd.read_csv(args.reservations)
+    history, upcoming = upcoming_split(reservations, args.days)
+    train, test = upcoming_split(history, 180)
+    model = NoShowModel().fit(train)
+    test = test[test['status'].isin(RESOLVED_STATUSES)]
+    p = model.predict(reservation_features(test))
+    y = (test['status'] == 'No-Show').values
+    print(f"[OK] Holdout ({len(test):,} reservations): no-show rate {y.mean():.1%}, "
+          f"log loss {log_loss(y, p):.4f} vs base rate {log_loss(y, np.full(len(y), model.base_rate)):.4f}, "
+          f"AUC {roc_auc_score(y, p):.3f}")
+
+    model = NoShowModel().fit(history)
+    scorer = NoShowScorer()
+    t0 = time.perf_counter()
+    p_no_show = scorer.score(upcoming, model)
+    print(f"[OK] {len(upcoming)} upcoming reservations scored in {(time.perf_counter() - t0) * 1000:.1f}ms "
+          f"({scorer.last_rescored} rescored)")
+    print(expected_pax(upcoming, p_no_show).round(1).to_string())
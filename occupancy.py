@@ -0,0 +1,231 @@
+"""
+Table occupancy simulator (reservas.csv)
+Turns reservations (and estimated walk-ins) into parties seated per
+(day, slot, table size) with a sweep line over the whole history at once:
+every party adds +1 at its arrival slot and -1 when its dwell time ends, in
+one np.add.at over a (days, slots + dwell, table sizes) array, then a cumsum
+along the slot axis gives the parties at the table in each slot.
+
+A party needs the smallest table that seats it (8+ use the largest). A
+slot is feasible when, for every table size k, the parties needing a table
+>= k fit in the tables >= k (bigger tables can take smaller parties), so
+shortage[d, s, k] = parties needing >= k - tables >= k; > 0 = overbooked.
+
+For constant-time "can I accept N pax at HH:MM on date" answers, the room
+left for each table size over the dwell window starting at each slot is
+precomputed (sliding minimum); a query is one array lookup. Times are
+rounded down to the slot (reservations are taken on the hour).
+
+Usage:
+    python occupancy.py --date 2025-12-27 --time 21:00 --pax 8
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from hourly_demand import SERVICE_PERIODS
+
+# Table size -> number of tables (dining room + terrace)
+TABLES = {2: 10, 4: 10, 6: 3, 8: 2}
+SLOT_MINUTES = 30
+OPEN_MINUTE = 12 * 60        # 12:00
+CLOSE_MINUTE = 25 * 60       # 01:00 next day
+DWELL_MINUTES = 90
+HELD_STATUSES = ('Show', 'No-Show')  # No-shows still block their table until given up
+WALK_IN_RATE = 0.15          # Walk-in parties per unit of foot_traffic_estimate
+WALK_IN_PAX = 2
+
+
+def to_minutes(times):
+    """'HH:MM' strings -> minutes since midnight of the service day (early hours count as after midnight)"""
+    parts = pd.Series(times).astype(str).str.split(':', expand=True).astype(int)
+    minutes = parts[0].values * 60 + parts[1].values
+    return np.where(minutes < OPEN_MINUTE - 6 * 60, minutes + 24 * 60, minutes)
+
+
+def _minute(time):
+    """Scalar to_minutes (no pandas on the query path)"""
+    hours, minutes = str(time).split(':')[:2]
+    minute = int(hours) * 60 + int(minutes)
+    return minute + 24 * 60 if minute < OPEN_MINUTE - 6 * 60 else minute
+
+
+class OccupancyModel:
+    """
+    parties: array (days, slots, table sizes) of parties seated
+    shortage: parties needing a table >= k minus tables >= k (> 0 = overbooked)
+    free_window: room for one more party needing a table >= k during the
+                 dwell window starting at each slot (>= 1: accept)
+    """
+
+    def __init__(self, reservations, walk_ins=None, tables=TABLES, dwell_minutes=DWELL_MINUTES,
+                 statuses=HELD_STATUSES, slot_minutes=SLOT_MINUTES):
+        self.table_sizes = np.array(sorted(tables))
+        self.tables = np.array([tables[k] for k in self.table_sizes])
+        self.tables_at_least = self.tables[::-1].cumsum()[::-1]          # tables >= k
+        self.slot_minutes = slot_minutes
+        self.n_slots = (CLOSE_MINUTE - OPEN_MINUTE) // slot_minutes
+        self.dwell_slots = max(1, -(-dwell_minutes // slot_minutes))  # ceil
+
+        held = reservations[reservations['status'].isin(statuses)]
+        dates = pd.to_datetime(reservations['date'])
+        if walk_ins is not None and len(walk_ins):
+            dates = dates.tolist() + list(pd.to_datetime(walk_ins.index))
+        self.start = pd.Timestamp(min(dates)).normalize()
+        self.dates = pd.date_range(self.start, pd.Timestamp(max(dates)).normalize())
+
+        self.parties = np.zeros((len(self.dates), self.n_slots, len(self.table_sizes)))
+        self._arrive(pd.to_datetime(held['date']), to_minutes(held['time']), held['pax'].values)
+        if walk_ins is not None and len(walk_ins):
+            self._add_walk_ins(walk_ins)
+        self._refresh()
+
+    # --- building ---
+    def table_class(self, pax):
+        """Index of the smallest table size that seats pax (largest for bigger parties)"""
+        return np.minimum(np.searchsorted(self.table_sizes, pax), len(self.table_sizes) - 1)
+
+    def _slot(self, minutes):
+        return np.clip((np.asarray(minutes) - OPEN_MINUTE) // self.slot_minutes, 0, self.n_slots - 1)
+
+    def _arrive(self, dates, minutes, pax, weight=1.0, days=None):
+        """Sweep-line events of arriving parties: +w at arrival, -w after the dwell"""
+        day = (pd.DatetimeIndex(dates).normalize() - self.start).days.values if days is None else days
+        slot = self._slot(minutes)
+        cls = self.table_class(pax)
+        events = np.zeros((len(self.dates), self.n_slots + self.dwell_slots, len(self.table_sizes)))
+        w = np.broadcast_to(weight, np.shape(day)).astype(float)
+        np.add.at(events, (day, slot, cls), w)
+        np.add.at(events, (day, slot + self.dwell_slots, cls), -w)
+        self.parties += events.cumsum(axis=1)[:, :self.n_slots]
+
+    def _add_walk_ins(self, walk_ins):
+        """walk_ins: expected walk-in parties per date, spread evenly over each service period's slots"""
+        day = (pd.DatetimeIndex(walk_ins.index).normalize() - self.start).days.values
+        minutes, share = [], []
+        for p in SERVICE_PERIODS:
+            starts = np.arange(p['start'] * 60, p['end'] * 60, self.slot_minutes)
+            minutes.append(starts)
+            share.append(np.full(len(starts), p['weight'] / len(starts)))
+        minutes, share = np.concatenate(minutes), np.concatenate(share)
+        self._arrive(None, np.tile(minutes, len(day)), np.full(len(day) * len(minutes), WALK_IN_PAX),
+                     np.outer(walk_ins.values, share).ravel(), days=np.repeat(day, len(minutes)))
+
+    def _refresh(self, days=slice(None)):
+        parties = self.parties[days]
+        needing_at_least = parties[:, :, ::-1].cumsum(axis=2)[:, :, ::-1]   # parties needing >= k
+        shortage = needing_at_least - self.tables_at_least
+        # A new party needing >= k also uses up one of the tables >= j for every j <= k:
+        # its room is the minimum free count over those sizes and over the dwell
+        # window starting at each slot (window clipped at closing)
+        free = np.minimum.accumulate(-shortage, axis=2)
+        padded = np.concatenate([free, np.repeat(free[:, -1:], self.dwell_slots - 1, axis=1)], axis=1)
+        free_window = sliding_window_view(padded, self.dwell_slots, axis=1).min(axis=-1)
+        if days == slice(None):
+            self.shortage, self.free_window = shortage, free_window
+        else:
+            self.shortage[days], self.free_window[days] = shortage, free_window
+
+    def _extend(self, day):
+        """Grow the history with empty days so that day is in range; returns its index afterwards"""
+        before, after = max(0, -day), max(0, day - len(self.dates) + 1)
+        if before or after:
+            pad = ((before, after), (0, 0), (0, 0))
+            self.parties = np.pad(self.parties, pad)
+            self.shortage, self.free_window = np.pad(self.shortage, pad), np.pad(self.free_window, pad)
+            self.start -= pd.Timedelta(days=before)
+            self.dates = pd.date_range(self.start, periods=len(self.parties))
+            for days in (slice(0, before), slice(len(self.dates) - after, len(self.dates))):
+                if days.stop > days.start:
+                    self._refresh(days)
+        return day + before
+
+    # --- queries ---
+    def overbooked(self):
+        """Boolean (days, slots): some party has no table"""
+        return (self.shortage > 1e-9).any(axis=2)
+
+    def overbooked_slots(self):
+        """Long table of overbooked slots: date, time, parties seated, seats demanded, worst shortage"""
+        d, s = np.nonzero(self.overbooked())
+        seats_needed = (self.parties[d, s] * self.table_sizes).sum(axis=1)
+        return pd.DataFrame({
+            'date': self.dates[d],
+            'time': self.slot_labels()[s],
+            'parties': self.parties[d, s].sum(axis=1),
+            'seats_needed': seats_needed,
+            'seats': int((self.tables * self.table_sizes).sum()),
+            'tables_short': self.shortage[d, s].max(axis=1),
+        })
+
+    def slot_labels(self):
+        minutes = OPEN_MINUTE + np.arange(self.n_slots) * self.slot_minutes
+        return np.array([f"{(m // 60) % 24:02d}:{m % 60:02d}" for m in minutes], dtype=object)
+
+    def can_accept(self, date, time, pax):
+        """True if a party of pax arriving at time on date has a table for its whole dwell (O(1))"""
+        day = (pd.Timestamp(date).normalize() - self.start).days
+        if not 0 <= day < len(self.dates):
+            return bool(self.tables_at_least[self.table_class(pax)] >= 1)
+        slot = int(self._slot(_minute(time)))
+        return bool(self.free_window[day, slot, self.table_class(pax)] >= 1 - 1e-9)
+
+    def book(self, date, time, pax):
+        """Add an accepted reservation (only that day is recomputed; dates outside the history extend it)"""
+        day = self._extend((pd.Timestamp(date).normalize() - self.start).days)
+        slot = int(self._slot(_minute(time)))
+        self.parties[day, slot:slot + self.dwell_slots, self.table_class(pax)] += 1
+        self._refresh(slice(day, day + 1))
+
+
+def walk_in_parties(daily, rate=WALK_IN_RATE):
+    """Expected walk-in parties per date from dataset_ml_diario's foot_traffic_estimate"""
+    return pd.Series(daily['foot_traffic_estimate'].values * rate, index=pd.to_datetime(daily['date']))
+
+
+def can_accept_per_row(reservations, date, time, pax, walk_ins=None, tables=TABLES,
+                       dwell_minutes=DWELL_MINUTES, statuses=HELD_STATUSES):
+    """Reference: rebuild the day's parties minute by minute and check every minute of the new party's stay"""
+    day = reservations[(pd.to_datetime(reservations['date']) == pd.Timestamp(date))
+                       & reservations['status'].isin(statuses)]
+    sizes = np.array(sorted(tables))
+    at_least = np.array([sum(tables[k] for k in sizes if k >= size) for size in sizes])
+    start = to_minutes([time])[0]
+    for minute in range(start, min(start + dwell_minutes, CLOSE_MINUTE)):
+        needing = np.zeros(len(sizes))
+        for t, p in zip(to_minutes(day['time']), day['pax']):
+            if t <= minute < t + dwell_minutes:
+                needing[:min(np.searchsorted(sizes, p), len(sizes) - 1) + 1] += 1
+        needing[:min(np.searchsorted(sizes, pax), len(sizes) - 1) + 1] += 1
+        if (needing > at_least).any():
+            return False
+    return True
+
+
+if __name__ == '__main__':
+    import time as _time
+    parser = argparse.ArgumentParser(description="Table occupancy: overbooked slots and booking checks")
+    parser.add_argument('--reservations', default='reservas.csv')
+    parser.add_argument('--dataset', default='dataset_ml_diario.csv', help="Foot traffic for walk-ins ('' to skip)")
+    parser.add_argument('--dwell', type=int, default=DWELL_MINUTES, help="Minutes a party keeps its table")
+    parser.add_argument('--date')
+    parser.add_argument('--time', default='21:00')
+    parser.add_argument('--pax', type=int, default=8)
+    args = parser.parse_args()
+
+    reservations = pd.read_csv(args.reservations)
+    walk_ins = walk_in_parties(pd.read_csv(args.dataset)) if args.dataset else None
+    t0 = _time.perf_counter()
+    model = OccupancyModel(reservations, walk_ins, dwell_minutes=args.dwell)
+    slots = model.overbooked_slots()
+    print(f"[OK] {model.parties.shape[0]} days x {model.n_slots} slots simulated in {(_time.perf_counter() - t0) * 1000:.0f}ms: "
+          f"{len(slots)} overbooked slots on {slots['date'].nunique()} days")
+    print(slots.sort_values('tables_short', ascending=False).head(10).round(1).to_string(index=False))
+
+    date = args.date or str(model.dates[-1].date())
+    t0 = _time.perf_counter()
+    ok = model.can_accept(date, args.time, args.pax)
+    print(f"\nAccept {args.pax} pax at {args.time} on {date}? {'YES' if ok else 'NO'} "
+          f"({(_time.perf_counter() - t0) * 1e6:.0f}us)")
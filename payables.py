@@ -0,0 +1,219 @@
+"""
+Supplier payables & cash-flow projection
+Keeps a ledger of purchase orders as dense (days x suppliers) arrays:
+amounts received per PO date and amounts due per due_date. Everything the
+owner asks ("how much do we owe Carnes Danke next week?") is a slice or a
+cumulative sum of those arrays.
+
+The ledger is persisted (payables_ledger.npz) together with the byte offset
+of compras.csv already read, so appending POs only parses the new lines.
+
+Usage:
+    python payables.py --as-of 2025-12-01 --days 30
+"""
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+from incremental_csv import read_appended
+
+LEDGER_PATH = 'payables_ledger.npz'
+COMPRAS_PATH = 'compras.csv'
+NAIVE_LOOKBACK_WEEKS = 4  # Seasonal-naive revenue projection window
+
+
+class PayablesLedger:
+    """
+    received[day, supplier]: CLP of POs dated that day
+    due[day, supplier]: CLP falling due that day (paid at the end of the day)
+    Day 0 is self.start; arrays grow as later dates appear.
+    """
+
+    def __init__(self, path=LEDGER_PATH):
+        self.path = path
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.start = None
+        self.suppliers = []
+        self.received = np.zeros((0, 0))
+        self.due = np.zeros((0, 0))
+        self.cursor = None  # How far compras.csv was read (see incremental_csv)
+        self.n_rows = 0
+
+    # --- persistence ---
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            state = np.load(self.path, allow_pickle=False)
+            self.start = pd.Timestamp(str(state['start']))
+            self.suppliers = list(state['suppliers'])
+            self.received = state['received']
+            self.due = state['due']
+            self.cursor = {
+                'source': str(state['source']), 'offset': int(state['offset']),
+                'columns': list(state['columns']), 'tail_digest': str(state['tail_digest'])
+            }
+            self.n_rows = int(state['n_rows'])
+        except (OSError, KeyError, ValueError):
+            self._reset()  # Corrupt ledger is simply rebuilt
+
+    def _save(self):
+        if not self.path or self.start is None:
+            return
+        tmp_path = self.path + '.tmp.npz'
+        np.savez(
+            tmp_path, start=str(self.start.date()), suppliers=np.array(self.suppliers),
+            received=self.received, due=self.due, source=self.cursor['source'], offset=self.cursor['offset'],
+            columns=np.array(self.cursor['columns']), tail_digest=self.cursor['tail_digest'], n_rows=self.n_rows
+        )
+        os.replace(tmp_path, self.path)
+
+    # --- building ---
+    def _day(self, dates):
+        return (pd.DatetimeIndex(dates) - self.start).days.values
+
+    def _grow(self, last_date, suppliers):
+        """Extend the day axis up to last_date and the supplier axis with new names"""
+        new_suppliers = [s for s in dict.fromkeys(suppliers) if s not in self.suppliers]
+        if new_suppliers:
+            self.suppliers += new_suppliers
+            pad = ((0, 0), (0, len(new_suppliers)))
+            self.received = np.pad(self.received, pad)
+            self.due = np.pad(self.due, pad)
+        n_days = int(self._day([last_date])[0]) + 1
+        if n_days > len(self.received):
+            pad = ((0, n_days - len(self.received)), (0, 0))
+            self.received = np.pad(self.received, pad)
+            self.due = np.pad(self.due, pad)
+
+    def add(self, pos):
+        """Fold new PO rows (date, supplier, total_cost_clp, due_date) into the ledger"""
+        if pos.empty:
+            return
+        po_dates = pd.to_datetime(pos['date'])
+        due_dates = pd.to_datetime(pos['due_date'])
+        if self.start is None:
+            self.start = po_dates.min()
+        if po_dates.min() < self.start:
+            raise ValueError("POs dated before the ledger start: rebuild the ledger")
+        self._grow(max(po_dates.max(), due_dates.max()), pos['supplier'])
+
+        col = pd.Index(self.suppliers).get_indexer(pos['supplier'])
+        amount = pos['total_cost_clp'].values.astype(float)
+        np.add.at(self.received, (self._day(po_dates), col), amount)
+        np.add.at(self.due, (self._day(due_dates), col), amount)
+        self.n_rows += len(pos)
+
+    def sync_csv(self, csv_path=COMPRAS_PATH):
+        """
+        Fold POs appended to compras.csv since the last sync.
+        A different, shrunk or rewritten file triggers a full rebuild.
+        Returns the number of new POs.
+        """
+        new_pos, cursor, rebuilt = read_appended(csv_path, self.cursor)
+        if rebuilt:
+            self._reset()
+        self.add(new_pos)
+        if cursor != self.cursor:
+            self.cursor = cursor
+            self._save()
+        return len(new_pos)
+
+    # --- queries ---
+    def _frame(self, values, start, end):
+        dates = pd.date_range(start, end)
+        out = np.zeros((len(dates), len(self.suppliers)))
+        idx = self._day(dates)
+        inside = (idx >= 0) & (idx < len(values))
+        out[inside] = values[idx[inside]]
+        return pd.DataFrame(out, index=dates, columns=self.suppliers)
+
+    def due_calendar(self, start, end):
+        """CLP falling due per day and supplier"""
+        return self._frame(self.due, start, end)
+
+    def cumulative_obligations(self, start, end):
+        """Running total of payments due from `start` on, per supplier"""
+        return self.due_calendar(start, end).cumsum()
+
+    def outstanding(self, as_of):
+        """Owed per supplier at the end of `as_of`: received so far minus paid so far"""
+        day = int(self._day([as_of])[0])
+        if day < 0:
+            return pd.Series(0.0, index=self.suppliers)
+        day = min(day, len(self.received) - 1)
+        owed = self.received[:day + 1].sum(axis=0) - self.due[:day + 1].sum(axis=0)
+        return pd.Series(owed, index=self.suppliers)
+
+
+def load_ledger(csv_path=COMPRAS_PATH, path=LEDGER_PATH):
+    """Ledger synced with compras.csv (only appended POs are parsed)"""
+    ledger = PayablesLedger(path)
+    ledger.sync_csv(csv_path)
+    return ledger
+
+
+# ==========================================
+# CASH POSITION
+# ==========================================
+def projected_revenue(daily_revenue, end, weeks=NAIVE_LOOKBACK_WEEKS):
+    """
+    Actual daily revenue where known, seasonal-naive projection (same weekday
+    mean of the last `weeks` weeks) after the last known day.
+    """
+    daily_revenue = daily_revenue.sort_index()
+    last = daily_revenue.index.max()
+    future = pd.date_range(last + pd.Timedelta(days=1), end)
+    if len(future) == 0:
+        return daily_revenue
+    recent = daily_revenue[daily_revenue.index > last - pd.Timedelta(weeks=weeks)]
+    by_dow = recent.groupby(recent.index.dayofweek).mean().reindex(range(7)).fillna(recent.mean())
+    return pd.concat([daily_revenue, pd.Series(by_dow.values[future.dayofweek], index=future)])
+
+
+def cash_position(ledger, revenue, start, end, opening_cash=0.0):
+    """
+    Day-by-day cash: opening + cumulative revenue in - cumulative payments out.
+    Returns DataFrame: revenue_in, payments_out, net, cash
+    """
+    dates = pd.date_range(start, end)
+    revenue_in = revenue.reindex(dates, fill_value=0.0)
+    payments_out = ledger.due_calendar(start, end).sum(axis=1)
+    out = pd.DataFrame({'revenue_in': revenue_in.values, 'payments_out': payments_out.values}, index=dates)
+    out['net'] = out['revenue_in'] - out['payments_out']
+    out['cash'] = opening_cash + out['net'].cumsum()
+    return out
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Supplier payables and cash-flow projection")
+    parser.add_argument('--as-of', help="Reference date (default: last PO date)")
+    parser.add_argument('--days', type=int, default=30, help="Days ahead to project")
+    parser.add_argument('--opening-cash', type=float, default=0.0, help="Cash at the start of --as-of")
+    args = parser.parse_args()
+
+    ledger = PayablesLedger()
+    n_new = ledger.sync_csv()
+    print(f"[OK] Ledger synced: {n_new} new POs ({ledger.n_rows} total)")
+
+    as_of = pd.Timestamp(args.as_of) if args.as_of else ledger.start + pd.Timedelta(days=len(ledger.received) - 1)
+    end = as_of + pd.Timedelta(days=args.days)
+
+    print(f"\nOutstanding per supplier at {as_of.date()}:")
+    for supplier, amount in ledger.outstanding(as_of).sort_values(ascending=False).items():
+        print(f" - {supplier}: ${amount:,.0f}")
+
+    next_week = ledger.due_calendar(as_of + pd.Timedelta(days=1), as_of + pd.Timedelta(days=7)).sum()
+    print("\nDue in the next 7 days:")
+    for supplier, amount in next_week[next_week > 0].sort_values(ascending=False).items():
+        print(f" - {supplier}: ${amount:,.0f}")
+
+    ventas = pd.read_csv('ventas_sinteticas_3anos.csv', usecols=['date', 'revenue'], parse_dates=['date'])
+    revenue = projected_revenue(ventas.groupby('date')['revenue'].sum(), end)
+    cash = cash_position(ledger, revenue, as_of + pd.Timedelta(days=1), end, args.opening_cash)
+    print(f"\nCash position after {args.days} days: ${cash['cash'].iloc[-1]:,.0f} (min ${cash['cash'].min():,.0f} on {cash['cash'].idxmin().date()})")
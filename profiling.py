@@ -0,0 +1,148 @@
+"""
+Render profiling for the owner dashboard (panel "🩺 Diagnóstico")
+Timing spans around data loading, each view's aggregation steps, figure
+construction (plotly.express / graph_objects calls) and LLM calls, plus
+DataFrame memory usage. One Profiler per script run; export is a Chrome
+trace JSON (open in chrome://tracing or ui.perfetto.dev).
+
+Disabled, span() hands back one shared no-op context manager and
+instrument() returns the module untouched, so the instrumented dashboard
+runs the same code paths at (near) zero cost.
+
+Usage:
+    profiler = Profiler(enabled=True)
+    with profiler.span('load_data', 'data'):
+        ...
+    px = profiler.instrument(px, 'px')
+    json.dumps(profiler.trace())
+"""
+
+import contextlib
+import functools
+import os
+import time
+import numpy as np
+import pandas as pd
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+class Profiler:
+    """
+    spans: list of dicts (name, kind, start, duration in seconds from the
+    profiler's start, depth = nesting level, meta)
+    memory: DataFrame of frame memory (see frame_memory)
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.spans = []
+        self.memory = None
+        self._depth = 0
+        self._t0 = time.perf_counter()
+
+    # --- recording ---
+    def span(self, name, kind='step', **meta):
+        """Context manager timing a block (no-op when disabled)"""
+        return self._span(name, kind, meta) if self.enabled else _NO_SPAN
+
+    @contextlib.contextmanager
+    def _span(self, name, kind, meta):
+        token = self.begin(name, kind, **meta)
+        try:
+            yield token
+        finally:
+            self.end(token)
+
+    def begin(self, name, kind='step', **meta):
+        """Open a span around code that is not a single block (e.g. a whole view); returns its token"""
+        if not self.enabled:
+            return None
+        record = {'name': name, 'kind': kind, 'start': time.perf_counter() - self._t0,
+                  'duration': None, 'depth': self._depth, 'meta': meta}
+        self.spans.append(record)
+        self._depth += 1
+        return record
+
+    def end(self, token):
+        if token is None or token['duration'] is not None:
+            return
+        token['duration'] = time.perf_counter() - self._t0 - token['start']
+        self._depth = max(0, self._depth - 1)
+
+    def instrument(self, module, prefix, kind='figure'):
+        """Module proxy whose function calls are spans '<prefix>.<name>' (the module itself when disabled)"""
+        return _Instrumented(self, module, prefix, kind) if self.enabled else module
+
+    def record_memory(self, **frames):
+        """Memory of named DataFrames (deep: object columns counted by content)"""
+        if self.enabled:
+            with self.span('frame_memory', 'step'):
+                self.memory = frame_memory(frames)
+        return self.memory
+
+    # --- reporting ---
+    def table(self):
+        """Spans as a DataFrame in start order; open spans are closed at now"""
+        now = time.perf_counter() - self._t0
+        rows = [{'name': '  ' * s['depth'] + s['name'], 'kind': s['kind'],
+                 'start_ms': s['start'] * 1000,
+                 'duration_ms': ((s['duration'] if s['duration'] is not None else now - s['start'])) * 1000}
+                for s in self.spans]
+        return pd.DataFrame(rows, columns=['name', 'kind', 'start_ms', 'duration_ms'])
+
+    def totals(self):
+        """Time per kind counting top-level spans of each kind only (nested ones are already inside)"""
+        table = self.table()
+        if table.empty:
+            return pd.Series(dtype=float, name='duration_ms')
+        start = table['start_ms'].values
+        end = start + table['duration_ms'].values
+        kind = table['kind'].values
+        depth = np.array([s['depth'] for s in self.spans])
+        outer = [not ((kind == kind[i]) & (start <= start[i]) & (end >= end[i]) & (depth < depth[i])).any()
+                 for i in range(len(table))]
+        return table[outer].groupby('kind')['duration_ms'].sum()
+
+    def trace(self):
+        """Chrome trace event format: complete ('X') events in microseconds, memory in otherData"""
+        pid = os.getpid()
+        now = time.perf_counter() - self._t0
+        events = [{
+            'name': s['name'], 'cat': s['kind'], 'ph': 'X', 'pid': pid, 'tid': 1,
+            'ts': round(s['start'] * 1e6, 1),
+            'dur': round((s['duration'] if s['duration'] is not None else now - s['start']) * 1e6, 1),
+            'args': {k: str(v) for k, v in s['meta'].items()},
+        } for s in self.spans]
+        other = {'created': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        if self.memory is not None:
+            other['frame_memory_bytes'] = self.memory['bytes'].to_dict()
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': other}
+
+
+class _Instrumented:
+    """Attribute proxy: callables of the wrapped module run inside a span"""
+
+    def __init__(self, profiler, module, prefix, kind):
+        self._profiler, self._module, self._prefix, self._kind = profiler, module, prefix, kind
+
+    def __getattr__(self, name):
+        attr = getattr(self._module, name)
+        if not callable(attr) or isinstance(attr, type(self._module)):
+            return attr
+
+        @functools.wraps(attr)
+        def timed(*args, **kwargs):
+            with self._profiler.span(f"{self._prefix}.{name}", self._kind):
+                return attr(*args, **kwargs)
+        return timed
+
+
+def frame_memory(frames):
+    """frames: {name: DataFrame} -> DataFrame (rows, columns, bytes, MB) sorted by size"""
+    rows = {name: {'rows': len(frame), 'columns': frame.shape[1],
+                   'bytes': int(frame.memory_usage(deep=True).sum())}
+            for name, frame in frames.items() if isinstance(frame, pd.DataFrame)}
+    out = pd.DataFrame.from_dict(rows, orient='index', columns=['rows', 'columns', 'bytes'])
+    out['MB'] = out['bytes'] / 1e6
+    return out.sort_values('bytes', ascending=False)
@@ -0,0 +1,202 @@
+"""
+Compiled promotion rules engine
+Compiles promociones_reales.json once into lookup tables indexed by
+(day_of_week, hour, item) and calendar date (MM-DD), then resolves
+promo type, price and quantity multiplier for whole arrays of orders.
+
+Priority order is the same as apply_promotion_logic in
+generate_synthetic_data_v2.py: special events > Menú Ejecutivo >
+Martes Pizza Libre > Jueves Ladies Night > After Office > Bar Nikkita.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+
+# Price modes
+PRICE_BASE = 0        # base_price
+PRICE_FACTOR = 1      # base_price * factor (float, e.g. navidad)
+PRICE_FACTOR_INT = 2  # int(base_price * factor)
+PRICE_FIXED = 3       # fixed price (Menú Ejecutivo)
+
+NORMAL = 0  # Rule id 0 is always 'normal'
+
+
+def calendar_code(month, day):
+    """Integer code for a calendar date (MM-DD), valid for any year."""
+    return np.asarray(month) * 32 + np.asarray(day)
+
+
+def hour_span(promo):
+    """Inclusive hour range of a promo, same rule as is_in_time_range."""
+    return int(promo['hora_inicio'].split(':')[0]), int(promo['hora_fin'].split(':')[0])
+
+
+class PromotionEngine:
+    """
+    Rule table + lookup arrays:
+      - event_table[calendar_code] -> rule id of the date event (0 = none)
+      - weekly_table[dow, hour, item_code] -> rule id of the weekly/daily promo
+    Items not named by any promo share item_code 0.
+    """
+
+    def __init__(self, promociones):
+        self.labels = ['normal']
+        self.price_mode = [PRICE_BASE]
+        self.price_factor = [1.0]
+        self.qty_mult = [1.0]
+        self.split_prob = [1.0]  # Probability of keeping the rule (else alt_rule)
+        self.alt_rule = [-1]
+
+        # Item vocabulary (every item named by a weekly/daily promo)
+        named_items = []
+        for group in ('promociones_semanales', 'promociones_diarias'):
+            for promo in promociones.get(group, {}).values():
+                for key in ('items_afectados', 'items_principales'):
+                    if isinstance(promo.get(key), list):
+                        named_items.extend(promo[key])
+        self.items = pd.Index(sorted(set(named_items)))
+        n_items = len(self.items) + 1
+
+        self.event_table = np.zeros(13 * 32, dtype=np.int16)
+        self.weekly_table = np.zeros((7, 24, n_items), dtype=np.int16)
+
+        # Rules are compiled in priority order; lower-priority rules only
+        # fill slots that are still 'normal'.
+        events = promociones.get('eventos_especiales', {})
+        fp = events.get('fiestas_patrias')
+        if fp and fp['activo']:
+            self._add_event(fp['fechas'], 'fiestas_patrias', PRICE_BASE, 1.0, fp['multiplicador_trafico'])
+        nav = events.get('navidad')
+        if nav and nav['activo']:
+            self._add_event(nav['fechas'], 'navidad', PRICE_FACTOR, 1.1, nav['multiplicador_ticket'])
+
+        menu_exec = promociones['promociones_diarias']['menu_ejecutivo']
+        if menu_exec['activo']:
+            completo = self._add_rule('menu_ejecutivo_completo', PRICE_FIXED, menu_exec['precio_completo'], 1.0)
+            basico = self._add_rule('menu_ejecutivo_basico', PRICE_FIXED, menu_exec['precio_basico'], 1.0)
+            self.split_prob[completo] = menu_exec['probabilidad_completo']
+            self.alt_rule[completo] = basico
+            self._fill_weekly(completo, range(7), hour_span(menu_exec), menu_exec['items_principales'])
+
+        weekly = promociones['promociones_semanales']
+        pizza_libre = weekly['martes_pizza_libre']
+        if pizza_libre['activo']:
+            rule = self._add_rule('pizza_libre', PRICE_BASE, 1.0, pizza_libre['multiplicador_cantidad'])
+            self._fill_weekly(rule, [pizza_libre['dia_semana']], hour_span(pizza_libre), pizza_libre['items_afectados'])
+
+        ladies_night = weekly['jueves_ladies_night']
+        if ladies_night['activo']:
+            discount = ladies_night['porcentaje_descuento'] / 100
+            rule = self._add_rule('ladies_night_50', PRICE_FACTOR_INT, 1 - discount, ladies_night['multiplicador_trafico'])
+            self._fill_weekly(rule, [ladies_night['dia_semana']], hour_span(ladies_night), None)
+
+        after_office = weekly['after_office']
+        if after_office['activo']:
+            discount = after_office['porcentaje_descuento'] / 100
+            rule = self._add_rule('after_office_2x1', PRICE_FACTOR_INT, 1 - discount, after_office['multiplicador_cantidad'])
+            self._fill_weekly(rule, after_office['dias_semana'], hour_span(after_office), after_office['items_afectados'])
+
+        bar_nikkita = weekly['bar_nikkita_weekend']
+        if bar_nikkita['activo']:
+            rule = self._add_rule('bar_nikkita', PRICE_FACTOR_INT, bar_nikkita['multiplicador_ticket'], 1.2)
+            self._fill_weekly(rule, bar_nikkita['dias_semana'], hour_span(bar_nikkita), bar_nikkita['items_afectados'])
+
+        self.labels = np.array(self.labels, dtype=object)
+        self.price_mode = np.array(self.price_mode)
+        self.price_factor = np.array(self.price_factor, dtype=float)
+        self.qty_mult = np.array(self.qty_mult, dtype=float)
+        self.split_prob = np.array(self.split_prob, dtype=float)
+        self.alt_rule = np.array(self.alt_rule)
+
+    @classmethod
+    def from_json(cls, path='promociones_reales.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    # --- compilation helpers ---
+    def _add_rule(self, label, price_mode, price_factor, qty_mult):
+        self.labels.append(label)
+        self.price_mode.append(price_mode)
+        self.price_factor.append(float(price_factor))
+        self.qty_mult.append(float(qty_mult))
+        self.split_prob.append(1.0)
+        self.alt_rule.append(-1)
+        return len(self.labels) - 1
+
+    def _add_event(self, fechas, label, price_mode, price_factor, qty_mult):
+        rule = self._add_rule(label, price_mode, price_factor, qty_mult)
+        for mmdd in fechas:
+            month, day = (int(x) for x in mmdd.split('-'))
+            code = calendar_code(month, day)
+            if self.event_table[code] == NORMAL:
+                self.event_table[code] = rule
+
+    def _fill_weekly(self, rule, days, hours, items):
+        """items=None means every item (including items outside the vocabulary)"""
+        hour_idx = np.arange(hours[0], hours[1] + 1)
+        if items is None:
+            item_idx = np.arange(self.weekly_table.shape[2])
+        else:
+            item_idx = self.encode_items(items)
+        ix = np.ix_(list(days), hour_idx, item_idx)
+        block = self.weekly_table[ix]
+        block[block == NORMAL] = rule
+        self.weekly_table[ix] = block
+
+    # --- lookups ---
+    def encode_items(self, item_names):
+        """Item codes for the weekly table (0 = item not named by any promo)."""
+        return self.items.get_indexer(np.asarray(item_names, dtype=object)) + 1
+
+    def resolve_rules(self, dates, hour, item_names, u=None):
+        """Rule id per order (after the Menú Ejecutivo completo/básico split)."""
+        dates = pd.DatetimeIndex(dates)
+        hour = np.clip(np.asarray(hour), 0, 23)
+        events = self.event_table[calendar_code(dates.month.values, dates.day.values)]
+        weekly = self.weekly_table[dates.dayofweek.values, hour, self.encode_items(item_names)]
+        rule = np.where(events != NORMAL, events, weekly)
+
+        alt = self.alt_rule[rule]
+        if (alt >= 0).any():
+            if u is None:
+                u = np.random.random(len(rule))
+            rule = np.where((alt >= 0) & (u >= self.split_prob[rule]), alt, rule)
+        return rule
+
+    def resolve(self, dates, hour, item_names, base_price, u=None):
+        """
+        Vectorized apply_promotion_logic over arrays of orders.
+        u: uniform draws in [0, 1) for the Menú Ejecutivo split.
+        Returns: (final_price, quantity_multiplier, promo_type) arrays
+        """
+        rule = self.resolve_rules(dates, hour, item_names, u)
+        base_price = np.asarray(base_price, dtype=float)
+        mode = self.price_mode[rule]
+        factor = self.price_factor[rule]
+
+        final_price = base_price.copy()
+        final_price = np.where(mode == PRICE_FACTOR, base_price * factor, final_price)
+        final_price = np.where(mode == PRICE_FACTOR_INT, np.trunc(base_price * factor), final_price)
+        final_price = np.where(mode == PRICE_FIXED, factor, final_price)
+        return final_price, self.qty_mult[rule], self.labels[rule]
+
+    def day_flags(self, dates):
+        """
+        Per-day schedule flags: one boolean column per promo label, True when
+        the promo is scheduled at any hour/item of that day.
+        """
+        dates = pd.DatetimeIndex(dates)
+        scheduled = np.zeros((7, len(self.labels)), dtype=bool)
+        for dow in range(7):
+            scheduled[dow, np.unique(self.weekly_table[dow])] = True
+        # Menú Ejecutivo básico shares the completo slots
+        for rule, alt in enumerate(self.alt_rule):
+            if alt >= 0:
+                scheduled[:, alt] |= scheduled[:, rule]
+
+        flags = scheduled[dates.dayofweek.values]
+        events = self.event_table[calendar_code(dates.month.values, dates.day.values)]
+        flags[np.arange(len(dates)), events] |= events != NORMAL
+
+        return pd.DataFrame(flags[:, 1:], columns=self.labels[1:], index=dates)
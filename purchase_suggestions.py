@@ -0,0 +1,244 @@
+"""
+Forecast-driven purchase order suggestions
+Turns revenue or item-level forecasts into suggested purchase orders:
+
+    revenue forecast -> item quantities (recent item mix per weekday)
+                     -> ingredient grams per category (recipe BOM)
+                     -> net against on-hand stock, per order day (inventory_sim)
+                     -> one suggested PO per supplier and order day
+
+A whole month of order days is computed in one batch. backtest() replays
+past months with forecasts built only from earlier data and compares the
+suggestions with the purchases actually recorded in compras.csv.
+
+Usage:
+    python purchase_suggestions.py --month 2025-06
+    python purchase_suggestions.py --backtest 2024-07 2025-12
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+
+from bom import RecipeBOM
+from ingredient_catalog import IngredientCatalog
+from inventory_sim import BASE_POLICY, INITIAL_STOCK_G, simulate_policies
+from generate_purchases_v2 import SUPPLIERS, INGREDIENT_COSTS
+
+MIX_LOOKBACK_DAYS = 56      # Item mix learned from the last 8 weeks
+NAIVE_LOOKBACK_WEEKS = 4    # Seasonal-naive revenue forecast window
+
+
+# ==========================================
+# FORECAST -> ITEM QUANTITIES
+# ==========================================
+def item_mix(ventas, end_date, lookback_days=MIX_LOOKBACK_DAYS):
+    """
+    Units sold per CLP of revenue, per weekday and item, over the lookback
+    window ending before end_date. Returns DataFrame (7 x items).
+    """
+    end_date = pd.Timestamp(end_date)
+    recent = ventas[(ventas['date'] < end_date) & (ventas['date'] >= end_date - timedelta(days=lookback_days))]
+    dow = recent['date'].dt.dayofweek
+    qty = recent.pivot_table(index=dow, columns='item_name', values='qty_sold', aggfunc='sum', fill_value=0)
+    revenue = recent.groupby(dow)['revenue'].sum()
+    return qty.div(revenue, axis=0).reindex(range(7), fill_value=0.0)
+
+
+def items_from_revenue(revenue_forecast, mix):
+    """Item-level forecast (date, item_name, qty_sold) from a daily revenue forecast Series"""
+    dates = pd.DatetimeIndex(revenue_forecast.index)
+    qty = mix.values[dates.dayofweek] * np.asarray(revenue_forecast, dtype=float)[:, None]
+    return pd.DataFrame({
+        'date': np.repeat(dates.values, mix.shape[1]),
+        'item_name': np.tile(mix.columns.values, len(dates)),
+        'qty_sold': qty.ravel()
+    })
+
+
+def seasonal_naive_revenue(ventas, dates, weeks=NAIVE_LOOKBACK_WEEKS):
+    """
+    Baseline revenue forecast: mean revenue of the same weekday over the last
+    `weeks` weeks before the first forecast date. Any model's daily revenue
+    forecast can be used instead.
+    """
+    dates = pd.DatetimeIndex(dates)
+    daily = ventas.groupby('date')['revenue'].sum()
+    history = daily[(daily.index < dates[0]) & (daily.index >= dates[0] - timedelta(weeks=weeks))]
+    by_dow = history.groupby(history.index.dayofweek).mean().reindex(range(7)).fillna(history.mean())
+    return pd.Series(by_dow.values[dates.dayofweek], index=dates, name='revenue_forecast')
+
+
+def waste_allowance(bom, ventas, mermas, dates):
+    """Merma grams per gram sold, per category (waste also has to be bought)"""
+    sold = bom.daily_consumption(dates, ventas).sum()
+    total = bom.daily_consumption(dates, ventas, mermas).sum()
+    return ((total - sold) / sold.replace(0, np.nan)).fillna(0.0)
+
+
+# ==========================================
+# SUGGESTIONS
+# ==========================================
+def on_hand_at(date, compras, consumption, initial_stock_g=INITIAL_STOCK_G):
+    """Book stock (grams per category) at the start of `date`: initial + received - consumed"""
+    date = pd.Timestamp(date)
+    received = (compras[compras['date'] < date].groupby('category')['quantity_kg'].sum() * 1000.0)
+    used = consumption[consumption.index < date].sum()
+    return (initial_stock_g + received.reindex(consumption.columns, fill_value=0.0) - used).values
+
+
+def suggest_purchase_orders(item_forecast, bom, on_hand, start, end, policy=BASE_POLICY, waste=None):
+    """
+    Suggested POs for every order day in [start, end], in one batch.
+    item_forecast: date, item_name, qty_sold (must cover the days after `end`
+        up to the next order day so the last order covers its window)
+    on_hand: grams per category at the start of `start`
+    waste: optional merma allowance per category (fraction of consumption)
+    Returns DataFrame: po_id, order_date, supplier, category, suggested_kg,
+        est_cost_clp, payment_terms, due_date
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    dates = pd.date_range(start, max(end, pd.Timestamp(item_forecast['date'].max())))
+    forecast_use = bom.daily_consumption(dates, item_forecast)
+    if waste is not None:
+        forecast_use = forecast_use * (1.0 + waste.reindex(forecast_use.columns, fill_value=0.0))
+
+    _, orders, _ = simulate_policies(
+        forecast_use, [policy], INGREDIENT_COSTS, initial_stock_g=np.asarray(on_hand, dtype=float),
+        lost_sales=False, record_orders=True
+    )
+    orders_g = orders[0][:len(pd.date_range(start, end))]
+
+    day_idx, cat_idx = np.nonzero(orders_g > 0)
+    categories = forecast_use.columns.values[cat_idx]
+    order_dates = dates[day_idx]
+    lines = pd.DataFrame({
+        'order_date': order_dates.date,
+        'supplier': [SUPPLIERS[c]['name'] for c in categories],
+        'category': categories,
+        'suggested_kg': np.round(orders_g[day_idx, cat_idx] / 1000.0, 2),
+        'est_cost_clp': np.trunc(orders_g[day_idx, cat_idx] / 1000.0 * np.array([INGREDIENT_COSTS[c] for c in categories])).astype(int),
+        'payment_terms': [f"{SUPPLIERS[c]['payment_days']} dias" for c in categories],
+        'due_date': [(d + timedelta(days=SUPPLIERS[c]['payment_days'])).date() for d, c in zip(order_dates, categories)]
+    })
+    # One PO per (order day, supplier); a supplier may cover several categories
+    po_keys = lines[['order_date', 'supplier']].drop_duplicates().reset_index(drop=True)
+    seq = po_keys.groupby('order_date').cumcount() + 1
+    po_keys['po_id'] = [f"SUG-{d:%Y%m%d}-{n:02d}" for d, n in zip(po_keys['order_date'], seq)]
+    lines = lines.merge(po_keys, on=['order_date', 'supplier'])
+    return lines[['po_id', 'order_date', 'supplier', 'category', 'suggested_kg', 'est_cost_clp',
+                  'payment_terms', 'due_date']]
+
+
+def plan_month(ventas, mermas, bom, on_hand, month, forecaster=seasonal_naive_revenue, policy=BASE_POLICY):
+    """
+    Suggested PO lines for every order day of `month`, forecasting only from
+    sales/mermas before the month starts.
+    """
+    month = pd.Period(month, freq='M')
+    start, end = month.start_time, month.end_time.normalize()
+    horizon = pd.date_range(start, end + timedelta(days=7))
+
+    history = ventas[ventas['date'] < start]
+    forecast = items_from_revenue(forecaster(history, horizon), item_mix(history, start))
+    waste = waste_allowance(bom, history, mermas[mermas['date'] < start],
+                            pd.date_range(start - timedelta(days=MIX_LOOKBACK_DAYS), start - timedelta(days=1)))
+    return suggest_purchase_orders(forecast, bom, on_hand, start, end, policy, waste)
+
+
+def supplier_summary(lines):
+    """Suggested POs rolled up per order day and supplier"""
+    return lines.groupby(['order_date', 'supplier', 'po_id'], as_index=False).agg(
+        categories=('category', ', '.join), total_kg=('suggested_kg', 'sum'), est_cost_clp=('est_cost_clp', 'sum')
+    )
+
+
+# ==========================================
+# BACKTEST
+# ==========================================
+def backtest(ventas, mermas, compras, bom, months, forecaster=seasonal_naive_revenue, policy=BASE_POLICY):
+    """
+    Replay each month: forecast from data before the month, suggest POs from
+    the book stock at month start, then compare against compras.csv.
+    Returns (per-supplier comparison DataFrame, per-month DataFrame)
+    """
+    all_dates = pd.date_range(ventas['date'].min(), ventas['date'].max())
+    actual_use = bom.daily_consumption(all_dates, ventas, mermas)
+
+    supplier_rows, month_rows = [], []
+    for month in pd.PeriodIndex(months, freq='M'):
+        start, end = month.start_time, month.end_time.normalize()
+        on_hand = on_hand_at(start, compras, actual_use)
+        lines = plan_month(ventas, mermas, bom, on_hand, month, forecaster, policy)
+        actual = compras[(compras['date'] >= start) & (compras['date'] <= end)]
+
+        suggested = lines.groupby('supplier')[['suggested_kg', 'est_cost_clp']].sum()
+        real = actual.groupby('supplier')[['quantity_kg', 'total_cost_clp']].sum()
+        both = suggested.join(real, how='outer').fillna(0.0)
+        both['month'] = str(month)
+        supplier_rows.append(both.reset_index())
+
+        # Stock-outs if the suggested orders had been placed (actual consumption)
+        month_use = actual_use.loc[start:end]
+        received = np.zeros(month_use.shape)
+        day_pos = pd.DatetimeIndex(pd.to_datetime(lines['order_date'])).map(month_use.index.get_loc)
+        np.add.at(received, (np.asarray(day_pos), month_use.columns.get_indexer(lines['category'])),
+                  lines['suggested_kg'].values * 1000.0)
+        stock = on_hand + np.cumsum(received - month_use.values, axis=0)
+        month_rows.append({
+            'month': str(month),
+            'suggested_clp': lines['est_cost_clp'].sum(),
+            'actual_clp': actual['total_cost_clp'].sum(),
+            'n_suggested_pos': lines['po_id'].nunique(),
+            'n_actual_pos': len(actual.groupby(['date', 'supplier'])),
+            'stockout_days': int((stock < 0).sum())
+        })
+
+    by_supplier = pd.concat(supplier_rows, ignore_index=True)
+    by_month = pd.DataFrame(month_rows)
+    by_month['cost_error_pct'] = (by_month['suggested_clp'] / by_month['actual_clp'] - 1) * 100
+    return by_supplier, by_month
+
+
+def load_inputs():
+    ventas = pd.read_csv('ventas_sinteticas_3anos.csv', parse_dates=['date'])
+    mermas = pd.read_csv('mermas.csv', parse_dates=['date'])
+    compras = pd.read_csv('compras.csv', parse_dates=['date'])
+    bom = RecipeBOM(pd.read_csv('ficha_tecnica.csv'), categories=list(SUPPLIERS.keys()), catalog=IngredientCatalog())
+    return ventas, mermas, compras, bom
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Suggest purchase orders from revenue forecasts")
+    parser.add_argument('--month', help="Month to plan (YYYY-MM)")
+    parser.add_argument('--backtest', nargs=2, metavar=('FROM', 'TO'), help="Backtest months FROM..TO (YYYY-MM)")
+    parser.add_argument('--out', help="Write suggested PO lines to this CSV")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    ventas, mermas, compras, bom = load_inputs()
+
+    if args.month:
+        month = pd.Period(args.month, freq='M')
+        all_dates = pd.date_range(ventas['date'].min(), ventas['date'].max())
+        on_hand = on_hand_at(month.start_time, compras, bom.daily_consumption(all_dates, ventas, mermas))
+        lines = plan_month(ventas, mermas, bom, on_hand, month)
+        summary = supplier_summary(lines)
+        print(f"\n[OK] {summary['po_id'].nunique()} suggested POs for {month} (${lines['est_cost_clp'].sum():,.0f} CLP)")
+        print(summary.to_string(index=False))
+        if args.out:
+            lines.to_csv(args.out, index=False)
+            print(f"[OK] Saved PO lines to {args.out}")
+
+    if args.backtest:
+        months = pd.period_range(args.backtest[0], args.backtest[1], freq='M')
+        by_supplier, by_month = backtest(ventas, mermas, compras, bom, months)
+        print("\n" + "="*50)
+        print("BACKTEST: SUGGESTED vs ACTUAL PURCHASES")
+        print("="*50)
+        print(by_month.to_string(index=False))
+        totals = by_supplier.groupby('supplier')[['est_cost_clp', 'total_cost_clp']].sum()
+        totals['error_pct'] = (totals['est_cost_clp'] / totals['total_cost_clp'] - 1) * 100
+        print("\nPer supplier:")
+        print(totals.to_string())
@@ -0,0 +1,111 @@
+"""
+Per-day time-slot index (peak hours)
+Parses order_time once into a slot (15 minutes by default) and keeps
+dense per-day histograms, so a weekday x slot heatmap for any date range and
+category filter is an array slice-and-sum:
+
+  - items / revenue: (days, slots, categories)
+  - orders: (days, slots, category combos), also per hour. An order counted
+    in a cell has at least one line of a selected category there, so orders
+    are histogrammed by the set of categories they contain (a bitmask, few
+    distinct values) instead of per category (no double counting).
+"""
+
+import numpy as np
+import pandas as pd
+
+SLOT_MINUTES = 15
+WEEKDAYS = ['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom']
+
+
+def _order_histogram(order_codes, day, slot, cat_codes, n_days, n_slots):
+    """(days, slots, combos) order counts and the category bitmask of each combo"""
+    unit, first = pd.factorize(order_codes.astype(np.int64) * n_slots + slot)
+    unit_mask = np.zeros(len(first), dtype=np.int64)
+    np.bitwise_or.at(unit_mask, unit, np.left_shift(1, cat_codes.astype(np.int64)))
+    _, first_line = np.unique(unit, return_index=True)
+    combo, combo_masks = pd.factorize(unit_mask)
+    n_combo = len(combo_masks)
+    cell = (day[first_line] * n_slots + slot[first_line]) * n_combo + combo
+    hist = np.bincount(cell, minlength=n_days * n_slots * n_combo).reshape(n_days, n_slots, n_combo)
+    return hist, np.asarray(combo_masks)
+
+
+class SlotIndex:
+    """Built from historical order lines (order_id, order_date, order_time, item_type, quantity, item_price)"""
+
+    def __init__(self, df, slot_minutes=SLOT_MINUTES):
+        self.slot_minutes = slot_minutes
+        self.n_slots = 24 * 60 // slot_minutes
+        dates = pd.to_datetime(df['order_date']).values.astype('datetime64[D]')
+        self.start = dates.min()
+        self.dates = pd.date_range(pd.Timestamp(self.start), pd.Timestamp(dates.max()))
+        self.weekday = self.dates.dayofweek.values
+        day = (dates - self.start).astype(np.int64)
+
+        time_str = df['order_time'].astype(str)
+        minutes = time_str.str[:2].astype(int).values * 60 + time_str.str[3:5].astype(int).values
+        slot = minutes // slot_minutes
+
+        cat_codes, categories = pd.factorize(df['item_type'], sort=True)
+        self.categories = list(categories)
+        n_days, n_cat = len(self.dates), len(self.categories)
+
+        cell = (day * self.n_slots + slot) * n_cat + cat_codes
+        shape = (n_days, self.n_slots, n_cat)
+        qty = df['quantity'].values
+        self.items = np.bincount(cell, weights=qty, minlength=n_days * self.n_slots * n_cat).reshape(shape)
+        self.revenue = np.bincount(cell, weights=qty * df['item_price'].values,
+                                   minlength=n_days * self.n_slots * n_cat).reshape(shape)
+
+        # Orders: one unit per (order, slot); an order has a single date but
+        # its lines may span two slots. Hourly counts get their own histogram
+        # (an order with lines in two slots of the same hour counts once)
+        order_codes, _ = pd.factorize(df['order_id'])
+        per_hour = 60 // slot_minutes
+        self.orders, self.combo_masks = _order_histogram(order_codes, day, slot, cat_codes, n_days, self.n_slots)
+        self.orders_hourly, self.combo_masks_hourly = _order_histogram(order_codes, day, slot // per_hour, cat_codes, n_days, 24)
+
+        busy = np.flatnonzero(self.items.sum(axis=(0, 2)))
+        self.open_slots = np.arange(busy.min(), busy.max() + 1) if len(busy) else np.arange(0)
+
+    def slot_labels(self, slots=None, slot_minutes=None):
+        slot_minutes = slot_minutes or self.slot_minutes
+        slots = self.open_slots if slots is None else slots
+        return [f"{m // 60:02d}:{m % 60:02d}" for m in np.asarray(slots) * slot_minutes]
+
+    def _days(self, start, end):
+        i = max(0, (np.datetime64(pd.Timestamp(start).date()) - self.start).astype(int))
+        j = min(len(self.dates), (np.datetime64(pd.Timestamp(end).date()) - self.start).astype(int) + 1)
+        return i, max(i, j)
+
+    def slot_totals(self, start, end, categories, measure='orders', hourly=False):
+        """(days in range, slots or hours) totals of a measure for the selected categories"""
+        i, j = self._days(start, end)
+        cols = [self.categories.index(c) for c in categories if c in self.categories]
+        if measure == 'orders':
+            sel_mask = int(np.left_shift(1, np.array(cols, dtype=np.int64)).sum())
+            hist, masks = (self.orders_hourly, self.combo_masks_hourly) if hourly else (self.orders, self.combo_masks)
+            return hist[i:j][:, :, (masks & sel_mask) != 0].sum(axis=2), i, j
+        totals = getattr(self, measure)[i:j][:, :, cols].sum(axis=2)
+        if hourly:
+            totals = totals.reshape(len(totals), 24, 60 // self.slot_minutes).sum(axis=2)
+        return totals, i, j
+
+    def heatmap(self, start, end, categories, measure='orders', per_day=False, hourly=False):
+        """
+        Weekday x slot DataFrame (rows Lun..Dom, columns HH:MM of the open slots)
+        measure: 'orders', 'items' or 'revenue'; per_day divides by the number
+        of each weekday in the range; hourly merges the slots of each hour.
+        """
+        totals, i, j = self.slot_totals(start, end, categories, measure, hourly)
+        weekday = self.weekday[i:j]
+        one_hot = (weekday[:, None] == np.arange(7)[None, :]).astype(float)  # (days, 7)
+        by_weekday = one_hot.T @ totals                                        # (7, slots)
+        if per_day:
+            by_weekday = by_weekday / np.maximum(one_hot.sum(axis=0), 1)[:, None]
+
+        if hourly:
+            hours = np.unique(self.open_slots // (60 // self.slot_minutes))
+            return pd.DataFrame(by_weekday[:, hours], index=WEEKDAYS, columns=self.slot_labels(hours, 60))
+        return pd.DataFrame(by_weekday[:, self.open_slots], index=WEEKDAYS, columns=self.slot_labels())
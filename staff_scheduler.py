@@ -0,0 +1,149 @@
+"""
+Weekly staff schedule optimizer
+Chooses how many Garzon / Cocinero / Bartender work each Apertura /
+Intermedio / Cierre shift per day so labor cost is minimal while demand is
+covered. One integer program for the whole week (scipy.optimize.milp, HiGHS):
+
+  x[day, role, shift] >= 0 integer staff
+  cost: hourly rate x SHIFT_HOURS per staff
+  coverage, per (day, role, open hour): staff on duty >=
+      max(MIN_ON_DUTY, items of the hour's service period / ROLES capacity)
+      (capacity = items one person handles, as in generate_operations.py)
+
+Period demand comes from the daily forecast split by the share of items of
+each service period per weekday (from sales with an 'hour' column, else the
+SERVICE_PERIODS weights in hourly_demand.py), optionally floored by the items
+of reservations expected to show up (noshow_model.py).
+
+Usage:
+    python staff_scheduler.py --start 2025-12-01
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from generate_operations import ROLES, SHIFT_TYPES, SHIFT_HOURS
+from hourly_demand import HOURS, PERIODS, PERIOD_OF_HOUR, SERVICE_PERIODS
+
+SCHEDULED_ROLES = ['Garzon', 'Cocinero', 'Bartender']  # Admin is fixed (1 Full shift)
+# Shift windows in hours of the day (25 = 01:00 of the next day)
+SHIFT_WINDOWS = {'Apertura': (10, 18), 'Intermedio': (13, 21), 'Cierre': (17, 25)}
+MIN_ON_DUTY = {'Garzon': 1, 'Cocinero': 1, 'Bartender': 1}
+
+OPEN_HOURS = np.flatnonzero(PERIOD_OF_HOUR >= 0)
+
+
+def _shift_covers():
+    """(shifts x hours): 1 if the shift is on duty at that hour"""
+    covers = np.zeros((len(SHIFT_TYPES), HOURS))
+    for s, name in enumerate(SHIFT_TYPES):
+        start, end = SHIFT_WINDOWS[name]
+        covers[s, start:min(end, HOURS)] = 1
+    return covers
+
+
+SHIFT_COVERS = _shift_covers()
+
+
+def period_shares(sales=None):
+    """
+    (7 weekdays x periods) share of the day's items in each service period.
+    sales: rows with date, hour, qty_sold; None or no 'hour' column -> SERVICE_PERIODS weights
+    """
+    weights = np.array([p['weight'] for p in SERVICE_PERIODS], dtype=float)
+    default = pd.DataFrame(np.tile(weights / weights.sum(), (7, 1)), columns=PERIODS)
+    if sales is None or 'hour' not in sales.columns or len(sales) == 0:
+        return default
+    period = PERIOD_OF_HOUR[sales['hour'].values.astype(int)]
+    weekday = pd.to_datetime(sales['date']).dt.dayofweek.values
+    keep = period >= 0
+    qty = np.bincount(weekday[keep] * len(PERIODS) + period[keep], weights=sales['qty_sold'].values[keep],
+                      minlength=7 * len(PERIODS)).reshape(7, len(PERIODS))
+    totals = qty.sum(axis=1, keepdims=True)
+    shares = np.where(totals > 0, qty / np.maximum(totals, 1), default.values)
+    return pd.DataFrame(shares, columns=PERIODS)
+
+
+def period_demand(dates, daily_items, shares=None):
+    """(days x periods) items per service period"""
+    shares = period_shares() if shares is None else shares
+    weekday = pd.DatetimeIndex(dates).dayofweek
+    return np.asarray(daily_items, dtype=float)[:, None] * shares.values[weekday]
+
+
+def optimize_schedule(items, roles=SCHEDULED_ROLES):
+    """
+    items: (days x periods) forecast items per service period
+    Returns (staff array (days, roles, shifts) of ints, scipy milp result)
+    """
+    items = np.atleast_2d(np.asarray(items, dtype=float))
+    n_days, n_roles, n_shifts = len(items), len(roles), len(SHIFT_TYPES)
+    capacity = np.array([ROLES[r]['capacity'] for r in roles], dtype=float)
+    rate = np.array([ROLES[r]['cost'] for r in roles], dtype=float)
+
+    # Every (day, role) block has the same constraint rows: one per open hour
+    block = sp.csr_matrix(SHIFT_COVERS[:, OPEN_HOURS].T)                          # (open hours, shifts)
+    A = sp.kron(sp.identity(n_days * n_roles, format='csr'), block, format='csr')
+    hour_items = items[:, PERIOD_OF_HOUR[OPEN_HOURS]]                             # (days, open hours)
+    required = hour_items[:, None, :] / capacity[None, :, None]                   # (days, roles, open hours)
+    minimum = np.array([MIN_ON_DUTY[r] for r in roles], dtype=float)[None, :, None]
+    lower = np.maximum(required, minimum).ravel()
+
+    cost = np.broadcast_to((rate * SHIFT_HOURS)[None, :, None], (n_days, n_roles, n_shifts)).ravel()
+    result = milp(cost, integrality=np.ones(len(cost)), bounds=Bounds(0, np.inf),
+                  constraints=LinearConstraint(A, lower, np.inf))
+    if not result.success:
+        raise RuntimeError(f"Schedule optimization failed: {result.message}")
+    return np.rint(result.x).astype(int).reshape(n_days, n_roles, n_shifts), result
+
+
+def schedule_table(dates, staff, roles=SCHEDULED_ROLES):
+    """Long table: date, role, shift_type, staff, hours, cost (non-zero rows)"""
+    d, r, s = np.nonzero(staff)
+    rate = np.array([ROLES[name]['cost'] for name in roles])
+    n = staff[d, r, s]
+    return pd.DataFrame({
+        'date': pd.DatetimeIndex(dates)[d],
+        'role': np.array(roles, dtype=object)[r],
+        'shift_type': SHIFT_TYPES[s],
+        'staff': n,
+        'hours': n * SHIFT_HOURS,
+        'cost': n * SHIFT_HOURS * rate[r],
+    })
+
+
+def weekly_schedule(dates, daily_items, shares=None, committed_items=None):
+    """
+    Optimal schedule for the forecast days. committed_items: optional
+    (days x periods) floor, e.g. items for the expected show-up pax of the
+    booked reservations. Returns (schedule_table, staff array)
+    """
+    items = period_demand(dates, daily_items, shares)
+    if committed_items is not None:
+        items = np.maximum(items, committed_items)
+    staff, _ = optimize_schedule(items)
+    return schedule_table(dates, staff), staff
+
+
+if __name__ == '__main__':
+    import time
+    parser = argparse.ArgumentParser(description="Minimum-cost weekly staff schedule")
+    parser.add_argument('--dataset', default='dataset_ml_diario.csv')
+    parser.add_argument('--sales', default='ventas_sinteticas_3anos.csv', help="Period shares (needs an 'hour' column)")
+    parser.add_argument('--start', help="First day (default: last 7 days of the dataset, actual items)")
+    args = parser.parse_args()
+
+    daily = pd.read_csv(args.dataset, parse_dates=['date'])
+    days = daily[daily['date'] >= pd.Timestamp(args.start)].head(7) if args.start else daily.tail(7)
+    sales = pd.read_csv(args.sales, nrows=0)
+    shares = period_shares(pd.read_csv(args.sales, usecols=['date', 'hour', 'qty_sold'])) \
+        if 'hour' in sales.columns else period_shares()
+
+    t0 = time.perf_counter()
+    table, staff = weekly_schedule(days['date'], days['qty_sold'].values, shares)
+    print(f"[OK] {len(days)}-day schedule solved in {(time.perf_counter() - t0) * 1000:.0f}ms, "
+          f"labor cost ${table['cost'].sum():,.0f}")
+    print(table.pivot_table(index='date', columns=['role', 'shift_type'], values='staff', aggfunc='sum', fill_value=0).to_string())
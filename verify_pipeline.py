@@ -0,0 +1,1058 @@
+
+import pandas as pd
+import numpy as np
+import sys
+import os
+import time
+import tempfile
+import json
+import io
+import contextlib
+import tracemalloc
+from scipy.stats import chi2_contingency
+
+# Add current dir to path to import local modules
+sys.path.append(os.getcwd())
+
+import generate_synthetic_data_v2 as gen_v2
+import generate_operations as ops
+import generate_purchases_v2 as purchases
+from bom import RecipeBOM
+import inventory_sim
+import purchase_suggestions as suggestions
+from payables import PayablesLedger, cash_position, projected_revenue
+from feature_store import FeatureStore
+import daily_aggregates
+import analyze_restaurant_data as analysis
+import market_basket
+from slot_index import SlotIndex
+import staff_scheduler as scheduler
+from labor_cube import LaborCube
+import occupancy
+import noshow_model
+from profiling import Profiler
+import benchmark
+import generate_load_test_data as load_test
+from assistant_cache import AnswerCache, compute_data_version
+from hourly_demand import HourlyCube, PERIOD_OF_HOUR, forecast_intraday, backtest as intraday_backtest
+from prepare_features import build_features_batch
+from promo_engine import PromotionEngine
+from ingredient_catalog import IngredientCatalog, KeywordMatcher, INGREDIENT_CATEGORY_MAP, parse_ingredients
+
+FAILURES = []
+
+def report(ok, msg):
+    print(f"[{'PASS' if ok else 'FAIL'}] {msg}")
+    if not ok:
+        FAILURES.append(msg)
+
+def same_distribution(a, b, min_p=0.001):
+    """Chi-square homogeneity test between two categorical samples"""
+    table = pd.crosstab(
+        np.concatenate([np.zeros(len(a)), np.ones(len(b))]),
+        np.concatenate([np.asarray(a), np.asarray(b)])
+    )
+    return chi2_contingency(table)[1] >= min_p
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+# ==========================================
+# 1. SALES GENERATOR (batched vs per-order)
+# ==========================================
+def check_sales_generator(n_days=56):
+    print("[INFO] Sales generator: batched vs per-order reference...")
+    _, items_summary = gen_v2.load_items_summary()
+    dates = gen_v2.date_range[:n_days]
+
+    legacy, t_legacy = timed(gen_v2.generate_sales_per_order, dates, items_summary, seed=42)
+    batched, t_batched = timed(gen_v2.generate_sales, dates, items_summary, np.random.default_rng(42))
+
+    report(list(batched.columns) == list(legacy.columns), "Sales schema matches per-order generator")
+    for col in ['item_name', 'promo_type', 'qty_sold', 'hour', 'day_of_week']:
+        report(same_distribution(legacy[col], batched[col]), f"Sales '{col}' distribution equivalent (chi-square)")
+
+    orders_ratio = len(batched) / len(legacy)
+    report(0.9 <= orders_ratio <= 1.1, f"Order volume within 10% ({len(batched)} vs {len(legacy)})")
+    price_ratio = batched['unit_price'].mean() / legacy['unit_price'].mean()
+    report(0.95 <= price_ratio <= 1.05, f"Mean unit price within 5% (ratio {price_ratio:.3f})")
+
+    speedup = t_legacy / t_batched
+    print(f"[INFO] {n_days} days: per-order {t_legacy:.2f}s, batched {t_batched:.4f}s ({speedup:.0f}x)")
+    report(speedup >= 50, f"Batched sales generator is >=50x faster ({speedup:.0f}x)")
+
+# ==========================================
+# 2. PROMOTION ENGINE (compiled vs scalar rules)
+# ==========================================
+def check_promo_engine():
+    print("[INFO] Promotion engine: compiled table vs apply_promotion_logic...")
+    _, items_summary = gen_v2.load_items_summary()
+    # Every day of a leap year (covers all events) x service hours x every item
+    dates = pd.date_range('2024-01-01', '2024-12-31')
+    grid = pd.MultiIndex.from_product(
+        [dates, range(10, 24), items_summary['item_name']], names=['date', 'hour', 'item_name']
+    ).to_frame(index=False)
+    grid = grid.merge(items_summary[['item_name', 'item_type', 'item_price']], on='item_name')
+
+    price, mult, label = gen_v2.PROMO_ENGINE.resolve(
+        grid['date'], grid['hour'].values, grid['item_name'].values, grid['item_price'].values,
+        u=np.zeros(len(grid))
+    )
+
+    mismatches = 0
+    sample = grid.sample(20000, random_state=0)
+    for i, row in zip(sample.index, sample.itertuples()):
+        ref_price, ref_mult, ref_label = gen_v2.apply_promotion_logic(
+            row.date, row.hour, row.item_name, row.item_type, row.item_price
+        )
+        if ref_label.startswith('menu_ejecutivo'):
+            # Random completo/básico split: only the rule family must match
+            ok = label[i].startswith('menu_ejecutivo')
+        else:
+            ok = (ref_label == label[i]) and np.isclose(ref_price, price[i]) and np.isclose(ref_mult, mult[i])
+        mismatches += not ok
+    report(mismatches == 0, f"Compiled promo rules match scalar logic on {len(sample):,} orders ({mismatches} mismatches)")
+
+    _, t_engine = timed(gen_v2.PROMO_ENGINE.resolve, grid['date'], grid['hour'].values,
+                        grid['item_name'].values, grid['item_price'].values)
+    print(f"[INFO] Resolved {len(grid):,} orders in {t_engine:.3f}s")
+
+    flags = gen_v2.PROMO_ENGINE.day_flags(dates)
+    dow = dates.dayofweek
+    report((flags['pizza_libre'].values == (dow == 1)).all(), "day_flags: pizza_libre scheduled on Tuesdays")
+    report((flags['ladies_night_50'].values == (dow == 3)).all(), "day_flags: ladies_night_50 scheduled on Thursdays")
+
+# ==========================================
+# 3. MERMAS (one pass vs per-day loop)
+# ==========================================
+def check_mermas(years=(3, 10)):
+    print("[INFO] Mermas: one-pass generation vs per-day loop...")
+    _, items_summary = gen_v2.load_items_summary()
+    ficha_df = gen_v2.build_ficha_df()
+
+    for n_years in years:
+        dates = pd.date_range('2023-01-01', periods=365 * n_years, freq='D')
+        sales = gen_v2.generate_sales(dates, items_summary, np.random.default_rng(42))
+
+        legacy, t_legacy = timed(gen_v2.generate_mermas_per_day, sales, dates)
+        fast, t_fast = timed(gen_v2.generate_mermas, sales, np.random.default_rng(43), ficha_df)
+        print(f"[INFO] {n_years}y ({len(sales):,} sales): per-day {t_legacy:.2f}s, one-pass {t_fast:.3f}s ({t_legacy / t_fast:.0f}x)")
+
+        report(list(fast.columns) == list(legacy.columns), f"{n_years}y mermas schema unchanged")
+        rate_ratio = len(fast) / len(legacy)
+        report(0.95 <= rate_ratio <= 1.05, f"{n_years}y waste rows within 5% ({len(fast):,} vs {len(legacy):,})")
+        for col in ['reason', 'merma_qty', 'related_promo']:
+            report(same_distribution(legacy[col], fast[col]), f"{n_years}y mermas '{col}' distribution equivalent")
+        report(t_fast < t_legacy, f"{n_years}y one-pass mermas faster than per-day loop")
+
+# ==========================================
+# 4. SHARDED GENERATION (worker-count invariance)
+# ==========================================
+def check_sharded_generation():
+    print("[INFO] Sharded generation: 1 worker vs 4 workers...")
+    _, items_summary = gen_v2.load_items_summary()
+    ficha_df = gen_v2.build_ficha_df()
+    dates = pd.date_range('2024-01-01', '2024-12-31')
+
+    (sales_1, mermas_1), t_1 = timed(gen_v2.generate_dataset, dates, items_summary, ficha_df, seed=7, workers=1)
+    (sales_4, mermas_4), t_4 = timed(gen_v2.generate_dataset, dates, items_summary, ficha_df, seed=7, workers=4)
+    print(f"[INFO] 1 worker {t_1:.2f}s, 4 workers {t_4:.2f}s")
+
+    report(sales_1.equals(sales_4), "Sales identical for 1 and 4 workers")
+    report(mermas_1.equals(mermas_4), "Mermas identical for 1 and 4 workers")
+    report(sales_1['date'].is_monotonic_increasing, "Shards merged in date order")
+
+# ==========================================
+# 5. STREAMING WRITER (batches vs in-memory)
+# ==========================================
+def check_streaming_writer():
+    print("[INFO] Streaming writer: batched CSV/Parquet vs in-memory dataset...")
+    _, items_summary = gen_v2.load_items_summary()
+    ficha_df = gen_v2.build_ficha_df()
+    dates = pd.date_range('2023-01-01', '2024-12-31')
+
+    sales_mem, mermas_mem = gen_v2.generate_dataset(dates, items_summary, ficha_df, seed=11)
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ['csv', 'parquet']:
+            stats = gen_v2.stream_dataset(dates, items_summary, ficha_df, os.path.join(tmp, 'ventas'),
+                                          os.path.join(tmp, 'mermas'), fmt=fmt, seed=11, batch_size=7000)
+            print(f"[INFO] {fmt}: {stats['rows_per_sec']:,.0f} rows/s, peak RSS {stats['peak_rss_mb']:.0f} MB")
+            reader = pd.read_csv if fmt == 'csv' else pd.read_parquet
+            sales_stream = reader(os.path.join(tmp, f'ventas.{fmt}'))
+            mermas_stream = reader(os.path.join(tmp, f'mermas.{fmt}'))
+            expected = sales_mem
+
+            report(len(sales_stream) == len(expected), f"{fmt}: streamed sales row count matches")
+            report(np.allclose(sales_stream['demand_forecast_next_day'], expected['demand_forecast_next_day']),
+                   f"{fmt}: streamed rolling/forecast features match in-memory")
+            report((sales_stream['revenue'].values == expected['revenue'].values).all(), f"{fmt}: streamed revenue matches")
+            report((sales_stream['hour'].values == expected['hour'].values).all(), f"{fmt}: streamed sales keep the hour")
+            report(len(mermas_stream) == len(mermas_mem), f"{fmt}: streamed mermas row count matches")
+
+# ==========================================
+# 6. OPERATIONS (array sampling vs per-row loops)
+# ==========================================
+def check_operations_generator():
+    print("[INFO] Operations generator: array sampling vs per-row loops...")
+    _, items_summary = gen_v2.load_items_summary()
+    sales = gen_v2.generate_sales(gen_v2.date_range, items_summary, np.random.default_rng(42))
+    daily_stats = ops.build_daily_stats(sales)
+
+    checks = [
+        ('rrhh', ops.generate_staffing_per_row, ops.generate_staffing, ['role', 'shift_type', 'total_pay']),
+        ('reviews', ops.generate_reviews_per_row, ops.generate_reviews, ['platform', 'rating', 'sentiment_label', 'text']),
+        ('reservas', ops.generate_reservations_per_row, ops.generate_reservations, ['pax', 'status', 'time', 'channel']),
+    ]
+    for name, legacy_fn, fast_fn, cols in checks:
+        np.random.seed(42)
+        legacy, t_legacy = timed(legacy_fn, daily_stats)
+        fast, t_fast = timed(fast_fn, daily_stats, np.random.default_rng(42))
+        print(f"[INFO] {name}: per-row {t_legacy:.2f}s, arrays {t_fast:.3f}s ({t_legacy / t_fast:.0f}x)")
+
+        report(list(fast.columns) == list(legacy.columns), f"{name} schema unchanged")
+        ratio = len(fast) / len(legacy)
+        report(0.95 <= ratio <= 1.05, f"{name} row count within 5% ({len(fast):,} vs {len(legacy):,})")
+        for col in cols:
+            report(same_distribution(legacy[col], fast[col]), f"{name} '{col}' distribution equivalent")
+        report((fast['date'].map(type) == type(legacy['date'].iloc[0])).all(), f"{name} dates keep the same type")
+        report(t_legacy / t_fast >= 10, f"{name} array generator is >=10x faster")
+
+    reservas = ops.generate_reservations(daily_stats, np.random.default_rng(42))
+    blocked = pd.to_datetime(reservas['date']).map(ops.is_promo_date)
+    report(not blocked.any(), "No reservations on promo days")
+    report(reservas['reservation_id'].is_unique, "Reservation ids unique")
+
+    same_seed = ops.generate_staffing(daily_stats, np.random.default_rng(42))
+    report(same_seed.equals(ops.generate_staffing(daily_stats, np.random.default_rng(42))), "Operations reproducible for a fixed seed")
+
+# ==========================================
+# 7. RECIPE BOM (matrix product vs per-row loop)
+# ==========================================
+def check_bom_consumption():
+    print("[INFO] Ingredient consumption: BOM matrix product vs per-row loop...")
+    _, items_summary = gen_v2.load_items_summary()
+    ficha = pd.read_csv('ficha_tecnica.csv')
+    dates = gen_v2.date_range
+    ventas, mermas = gen_v2.generate_dataset(dates, items_summary, gen_v2.build_ficha_df(), seed=42)
+    mermas['date'] = pd.to_datetime(mermas['date'])
+
+    legacy, t_legacy = timed(purchases.daily_consumption_per_row, ventas, mermas, ficha, dates)
+    bom, t_build = timed(RecipeBOM, ficha, list(purchases.SUPPLIERS.keys()))
+    fast, t_fast = timed(bom.daily_consumption, dates, ventas, mermas)
+    print(f"[INFO] {len(ventas) + len(mermas):,} rows: per-row {t_legacy:.2f}s, BOM build {t_build:.3f}s + product {t_fast:.4f}s ({t_legacy / (t_build + t_fast):.0f}x)")
+
+    legacy_df = pd.DataFrame.from_dict(legacy, orient='index')[list(fast.columns)]
+    report(np.array_equal(legacy_df.values, fast.values), "BOM daily consumption identical to per-row loop")
+    report(np.array_equal(fast.sum().values, legacy_df.sum().values), "BOM category totals identical")
+    usage = bom.usage(ventas['item_name'], ventas['qty_sold'])
+    report(np.isclose(usage.sum(), fast.values.sum() - bom.usage(mermas['item_name'], mermas['merma_qty']).sum()),
+           "Row-level BOM usage sums to daily consumption")
+    report(t_build + t_fast < t_legacy, "BOM consumption faster than per-row loop")
+
+# ==========================================
+# 8. INGREDIENT CATALOG (trie matcher + incremental cache)
+# ==========================================
+def check_ingredient_catalog():
+    print("[INFO] Ingredient catalog: Aho-Corasick catalog vs regex/linear scan...")
+    ficha = pd.read_csv('ficha_tecnica.csv')
+    keys = ['raw_name', 'clean_name', 'qty_g', 'category']
+
+    legacy, t_legacy = timed(lambda: {r.item_name: parse_ingredients(r.ingredients) for r in ficha.itertuples()})
+    catalog = IngredientCatalog(path=None)
+    _, t_cold = timed(catalog.update, ficha)
+    mismatches = sum(
+        [{k: ing[k] for k in keys} for ing in catalog.dish(item)] != parsed
+        for item, parsed in legacy.items()
+    )
+    report(mismatches == 0, f"Catalog matches parse_ingredients for {len(legacy)} dishes ({mismatches} mismatches)")
+
+    # Matcher agrees with the ordered substring scan, including overlapping keywords
+    matcher = KeywordMatcher(INGREDIENT_CATEGORY_MAP.keys())
+    keywords = list(INGREDIENT_CATEGORY_MAP.keys())
+    rng = np.random.default_rng(0)
+    texts = [' '.join(rng.choice(keywords + ['x', 'de', 'con'], size=3)) for _ in range(2000)]
+    texts += ['pancetta', 'salsa de tomate', 'aceite de oliva', 'lomo ahumado', 'camarones al ajillo']
+    linear = [next((i for i, k in enumerate(keywords) if k in t), None) for t in texts]
+    report([matcher.first(t) for t in texts] == linear, f"Aho-Corasick matcher agrees with linear scan on {len(texts):,} strings")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog.json')
+        first = IngredientCatalog(path).update(ficha)
+        reloaded, t_warm = timed(lambda: IngredientCatalog(path).update(ficha))
+        report(first['parsed'] == len(legacy) and reloaded['parsed'] == 0,
+               f"Persisted catalog reused on reload ({reloaded['reused']} dishes, 0 parsed)")
+
+        extra = ficha.iloc[[0]].assign(item_name='Plato Nuevo', ingredients='["salmón (120g)", "arroz"]')
+        edited = ficha.copy()
+        edited.loc[1, 'ingredients'] = '["pollo (200g)"]'
+        stats = IngredientCatalog(path).update(pd.concat([edited, extra], ignore_index=True))
+        report(stats['parsed'] == 2, f"Only new/edited dishes re-parsed ({stats})")
+        new_dish = IngredientCatalog(path).dish('Plato Nuevo')
+        report([(i['category'], i['qty'], i['unit']) for i in new_dish] == [('seafood', 120.0, 'g'), ('grocery', 100.0, 'g')],
+               "New dish parsed with quantities, units and categories")
+
+    print(f"[INFO] {len(legacy)} dishes: regex+scan {t_legacy * 1000:.1f}ms, catalog cold {t_cold * 1000:.1f}ms, warm reload {t_warm * 1000:.1f}ms")
+
+# ==========================================
+# 9. INVENTORY SIMULATION (policy sweep vs day-by-day loop)
+# ==========================================
+def check_inventory_simulation():
+    print("[INFO] Inventory simulation: vectorized policies vs day-by-day loop...")
+    _, items_summary = gen_v2.load_items_summary()
+    dates = gen_v2.date_range
+    ventas, mermas = gen_v2.generate_dataset(dates, items_summary, gen_v2.build_ficha_df(), seed=42)
+    bom = RecipeBOM(pd.read_csv('ficha_tecnica.csv'), list(purchases.SUPPLIERS.keys()))
+    consumption = bom.daily_consumption(dates, ventas, mermas)
+    daily_consumption = {d.date(): row for d, row in consumption.to_dict('index').items()}
+
+    (legacy_log, legacy_inventory), t_legacy = timed(purchases.simulate_purchases_per_day, daily_consumption, dates)
+    (_, orders, ending), t_fast = timed(inventory_sim.simulate_policies, consumption, [inventory_sim.BASE_POLICY],
+                                        purchases.INGREDIENT_COSTS, lost_sales=False, record_orders=True)
+    fast_log = purchases.build_purchase_log(orders[0], dates, list(purchases.SUPPLIERS.keys()))
+    report(pd.DataFrame(fast_log).equals(pd.DataFrame(legacy_log)), f"Base policy reproduces the purchase log ({len(fast_log):,} POs)")
+    report(np.allclose(ending[0], list(legacy_inventory.values())), "Base policy ending inventory matches")
+    print(f"[INFO] 1 policy: day-by-day {t_legacy:.2f}s, vectorized {t_fast:.3f}s")
+
+    policies = inventory_sim.policy_grid(
+        buffer_pcts=np.linspace(0, 0.5, 11), min_order_kgs=(0.0, 0.5, 1.0, 2.0, 5.0), lead_time_days=(0, 1, 2)
+    )
+    (metrics, _, _), t_sweep = timed(inventory_sim.simulate_policies, consumption, policies, purchases.INGREDIENT_COSTS)
+    print(f"[INFO] {len(policies)} policies x {len(dates)} days in {t_sweep:.2f}s")
+    report(t_sweep < 10, f"Sweep of {len(policies)} policies runs in seconds ({t_sweep:.2f}s)")
+
+    # More buffer never hurts availability and always holds more stock
+    same_rest = metrics[(metrics['lead_time_days'] == 1) & (metrics['min_order_kg'] == 0.0)
+                        & metrics['order_days'].apply(lambda d: d == (0, 3))].sort_values('buffer_pct')
+    report(same_rest['fill_rate'].is_monotonic_increasing, "Fill rate increases with the safety buffer")
+    report(same_rest['avg_on_hand_kg'].is_monotonic_increasing, "Average on-hand stock increases with the safety buffer")
+
+# ==========================================
+# 10. PURCHASE SUGGESTIONS (forecast -> BOM -> POs)
+# ==========================================
+def check_purchase_suggestions():
+    print("[INFO] Purchase suggestions: perfect forecast reproduces compras, backtest runs...")
+    _, items_summary = gen_v2.load_items_summary()
+    dates = gen_v2.date_range
+    ventas, mermas = gen_v2.generate_dataset(dates, items_summary, gen_v2.build_ficha_df(), seed=42)
+    mermas['date'] = pd.to_datetime(mermas['date'])
+    categories = list(purchases.SUPPLIERS.keys())
+    bom = RecipeBOM(pd.read_csv('ficha_tecnica.csv'), categories)
+    consumption = bom.daily_consumption(dates, ventas, mermas)
+    _, orders, _ = inventory_sim.simulate_policies(consumption, [inventory_sim.BASE_POLICY], purchases.INGREDIENT_COSTS,
+                                                   lost_sales=False, record_orders=True)
+    compras = pd.DataFrame(purchases.build_purchase_log(orders[0], dates, categories))
+    compras['date'] = pd.to_datetime(compras['date'])
+
+    # With a perfect item-level forecast (sales + mermas), suggestions are the recorded purchases
+    start, end = pd.Timestamp('2025-06-01'), pd.Timestamp('2025-06-30')
+    window = lambda df: df[(df['date'] >= start) & (df['date'] <= end + pd.Timedelta(days=7))]
+    perfect = pd.concat([window(ventas)[['date', 'item_name', 'qty_sold']],
+                         window(mermas).rename(columns={'merma_qty': 'qty_sold'})[['date', 'item_name', 'qty_sold']]])
+    on_hand = suggestions.on_hand_at(start, compras, consumption)
+    lines, t_month = timed(suggestions.suggest_purchase_orders, perfect, bom, on_hand, start, end)
+    actual = compras[(compras['date'] >= start) & (compras['date'] <= end)]
+    report(len(lines) == len(actual), f"Perfect forecast: same number of PO lines ({len(lines)} vs {len(actual)})")
+    # Book stock is rebuilt from kg-rounded compras, so the first order of the month can drift by ~0.1 kg
+    diff = np.abs(lines['suggested_kg'].values - actual['quantity_kg'].values)
+    first_day = (lines['order_date'] == lines['order_date'].min()).values
+    report(diff[first_day].max() <= 0.15 and diff[~first_day].max() <= 0.011,
+           f"Perfect forecast: suggested kg match compras (max diff {diff.max():.2f} kg)")
+    report(lines.groupby(['order_date', 'supplier'])['po_id'].nunique().eq(1).all(), "One PO per supplier and order day")
+    print(f"[INFO] Month of suggestions in {t_month * 1000:.0f}ms")
+
+    (by_supplier, by_month), t_bt = timed(suggestions.backtest, ventas, mermas, compras, bom,
+                                          pd.period_range('2025-01', '2025-06', freq='M'))
+    total_error = by_month['suggested_clp'].sum() / by_month['actual_clp'].sum() - 1
+    print(f"[INFO] Backtest 6 months in {t_bt:.2f}s, total cost error {total_error:+.1%}")
+    report(set(by_supplier['supplier']) <= {s['name'] for s in purchases.SUPPLIERS.values()}, "Backtest suppliers come from SUPPLIERS")
+    report(abs(total_error) < 0.15, "Seasonal-naive backtest spend within 15% of actual purchases")
+
+# ==========================================
+# 11. PAYABLES LEDGER (incremental vs full rebuild)
+# ==========================================
+def check_payables_ledger():
+    print("[INFO] Payables ledger: incremental sync vs full rebuild...")
+    compras = pd.read_csv('compras.csv')
+    half = len(compras) // 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, ledger_path = os.path.join(tmp, 'compras.csv'), os.path.join(tmp, 'ledger.npz')
+        compras.iloc[:half].to_csv(csv_path, index=False)
+        first = PayablesLedger(ledger_path).sync_csv(csv_path)
+        compras.iloc[half:].to_csv(csv_path, mode='a', header=False, index=False)
+        incremental = PayablesLedger(ledger_path)
+        second, t_sync = timed(incremental.sync_csv, csv_path)
+        report(first == half and second == len(compras) - half,
+               f"Second sync folds only appended POs ({second} of {len(compras)}, {t_sync * 1000:.1f}ms)")
+        _, t_noop = timed(PayablesLedger(ledger_path).sync_csv, csv_path)
+
+        full = PayablesLedger(path=None)
+        _, t_full = timed(full.sync_csv, csv_path)
+        same = incremental.suppliers == full.suppliers and np.array_equal(incremental.due, full.due) \
+            and np.array_equal(incremental.received, full.received)
+        report(same, "Incremental ledger identical to full rebuild")
+        print(f"[INFO] full build {t_full * 1000:.1f}ms, no-op sync {t_noop * 1000:.1f}ms")
+
+        compras.iloc[:10].to_csv(csv_path, index=False)  # Rewritten file
+        report(PayablesLedger(ledger_path).sync_csv(csv_path) == 10, "Rewritten compras.csv triggers a rebuild")
+
+    # Outstanding = POs received by as_of and due after it
+    compras['date'] = pd.to_datetime(compras['date'])
+    compras['due_date'] = pd.to_datetime(compras['due_date'])
+    as_of = compras['date'].quantile(0.7)
+    expected = compras[(compras['date'] <= as_of) & (compras['due_date'] > as_of)].groupby('supplier')['total_cost_clp'].sum()
+    owed = full.outstanding(as_of)
+    report(np.allclose(owed.reindex(expected.index).values, expected.values) and np.isclose(owed.sum(), expected.sum()),
+           f"Outstanding per supplier matches open POs at {as_of.date()}")
+
+    end = as_of + pd.Timedelta(days=30)
+    revenue = pd.Series(1000000.0, index=pd.date_range(compras['date'].min(), end))
+    cash, t_cash = timed(cash_position, full, revenue, as_of + pd.Timedelta(days=1), end, 5000000)
+    due_30 = compras[(compras['due_date'] > as_of) & (compras['due_date'] <= end)]['total_cost_clp'].sum()
+    report(np.isclose(cash['cash'].iloc[-1], 5000000 + 30 * 1000000 - due_30), "Cash position = opening + revenue - payments due")
+    print(f"[INFO] 30-day cash position in {t_cash * 1000:.1f}ms")
+
+    # Weekday-shaped revenue: the seasonal-naive projection repeats each weekday's level
+    known_days = pd.date_range(end=as_of.normalize(), periods=8 * 7)
+    known = pd.Series(1000000.0 + 100000.0 * known_days.dayofweek, index=known_days)
+    projected = projected_revenue(known, end)
+    future = projected.index > known_days[-1]
+    report(projected.index.equals(pd.date_range(known_days[0], end)) and projected[~future].equals(known)
+           and np.allclose(projected[future].values, 1000000.0 + 100000.0 * projected.index[future].dayofweek),
+           f"Projected revenue keeps actuals and projects {future.sum()} days by weekday")
+
+
+def check_feature_store():
+    print("[INFO] Feature store: incremental updates vs batch rebuild...")
+    ventas = pd.read_csv('ventas_sinteticas_3anos.csv')
+    reservas = pd.read_csv('reservas.csv')
+    with open('promociones_reales.json', 'r', encoding='utf-8') as f:
+        engine = PromotionEngine(json.load(f))
+
+    def batch(sales, res):
+        sales, res = sales.assign(date=pd.to_datetime(sales['date'])), res.assign(date=pd.to_datetime(res['date']))
+        return build_features_batch(sales, res, engine).reset_index(drop=True)
+
+    def same(store, sales, res):
+        try:
+            pd.testing.assert_frame_equal(store.ml_dataset(), batch(sales, res), check_exact=True)
+            return True
+        except AssertionError:
+            return False
+
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        # Appends in row chunks (boundaries fall in the middle of days)
+        dates = ventas['date'].unique()
+        cut = int((ventas['date'] < dates[-60]).sum())
+        store = FeatureStore(path=None)
+        store.ingest(ventas.iloc[:cut], reservas)
+        chunk_stats = [store.ingest(ventas.iloc[i:i + 997]) for i in range(cut, len(ventas), 997)]
+        appended_ok = same(store, ventas, reservas)
+
+        # Last day appended in one go vs full batch rebuild
+        last = ventas['date'] == dates[-1]
+        store = FeatureStore(path=None)
+        store.ingest(ventas[~last], reservas)
+        stats_day, t_day = timed(store.ingest, ventas[last])
+        _, t_batch = timed(batch, ventas, reservas)
+        day_ok = same(store, ventas, reservas)
+
+        # Late rows for a stored day and a backfilled missing day
+        late = ventas[ventas['date'] == dates[400]].head(3)
+        stats_late = store.ingest(late)
+        late_ok = same(store, pd.concat([ventas, late]), reservas)
+
+        gap = ventas['date'] == dates[500]
+        store = FeatureStore(path=None)
+        store.ingest(ventas[~gap], reservas)
+        store.ingest(ventas[gap])
+        backfill_ok = same(store, ventas, reservas)
+
+    report(appended_ok and all(s['recomputed_rows'] == 0 for s in chunk_stats),
+           f"Appending in {len(chunk_stats)} row chunks matches batch (ring buffer only)")
+    report(day_ok and stats_day['new_days'] == 1 and stats_day['recomputed_rows'] == 0,
+           "One appended day matches batch without touching stored rows")
+    print(f"[INFO] append one day {t_day * 1000:.1f}ms vs batch rebuild {t_batch * 1000:.1f}ms")
+    report(late_ok and stats_late['recomputed_rows'] == 30,
+           f"Late rows for a stored day recompute only its window ({stats_late['recomputed_rows']} rows)")
+    report(backfill_ok, "Backfilled missing day matches batch")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sales_path, res_path = os.path.join(tmp, 'ventas.csv'), os.path.join(tmp, 'reservas.csv')
+        store_path = os.path.join(tmp, 'store.pkl')
+        ventas.iloc[:cut].to_csv(sales_path, index=False)
+        reservas.to_csv(res_path, index=False)
+        FeatureStore(store_path).sync_csv(sales_path, res_path)
+        ventas.iloc[cut:].to_csv(sales_path, mode='a', header=False, index=False)
+        with quiet:
+            persisted = FeatureStore(store_path)
+            stats = persisted.sync_csv(sales_path, res_path)
+            synced_ok = same(persisted, ventas, reservas)
+        report(synced_ok and not stats['rebuilt'] and stats['new_days'] == 60,
+               "Persisted store syncs only the appended CSV rows")
+
+
+def check_chunked_aggregation():
+    print("[INFO] Out-of-core daily aggregation vs in-memory groupby...")
+    spec = daily_aggregates.DAILY_SALES_SPEC
+    ventas = pd.read_csv('ventas_sinteticas_3anos.csv')
+    expected = ventas.groupby('date').agg(**spec)
+
+    def same(daily):
+        daily = daily.reindex(expected.index)
+        exact = [c for c, (_, how) in spec.items() if how != 'mean']
+        means = [c for c, (_, how) in spec.items() if how == 'mean']
+        return daily[exact].astype(float).equals(expected[exact].astype(float)) \
+            and np.allclose(daily[means].values, expected[means].values, rtol=1e-12, atol=0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'ventas.csv')
+        ventas.to_csv(csv_path, index=False)
+        chunked = daily_aggregates.aggregate_file(csv_path, chunksize=7919)
+        report(same(chunked.result()) and chunked.rows == len(ventas), "CSV in 7919-row chunks matches in-memory groupby")
+
+        parquet_path = os.path.join(tmp, 'ventas.parquet')
+        with gen_v2.TableWriter(parquet_path, 'parquet') as writer:
+            for i in range(0, len(ventas), 20000):
+                writer.write(ventas.iloc[i:i + 20000])
+        report(same(daily_aggregates.aggregate_file(parquet_path, chunksize=5000).result()),
+               "Parquet row groups match in-memory groupby")
+
+        half = len(ventas) // 2
+        left = daily_aggregates.PartialAggregator().update(ventas.iloc[:half])
+        right = daily_aggregates.PartialAggregator().update(ventas.iloc[half:])
+        report(same(left.merge(right).result()), "Merged partial states of two halves match")
+
+        # Same history 4x longer (dates shifted by 3 years per copy)
+        big_path = os.path.join(tmp, 'ventas_4x.csv')
+        dates = pd.to_datetime(ventas['date'])
+        for k in range(4):
+            shifted = ventas.assign(date=(dates + pd.DateOffset(years=3 * k)).dt.strftime('%Y-%m-%d'))
+            shifted.to_csv(big_path, mode='a', header=(k == 0), index=False)
+
+        def peak_mb(fn, *args, **kwargs):
+            tracemalloc.start()
+            fn(*args, **kwargs)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak / 1e6
+
+        in_memory = lambda path: pd.read_csv(path).groupby('date').agg(**spec)
+        chunk_1x = peak_mb(daily_aggregates.daily_sales, csv_path, chunksize=20000)
+        chunk_4x = peak_mb(daily_aggregates.daily_sales, big_path, chunksize=20000)
+        memory_1x = peak_mb(in_memory, csv_path)
+        memory_4x = peak_mb(in_memory, big_path)
+        report(chunk_4x < chunk_1x * 1.5 and chunk_4x < memory_4x / 3,
+               f"Chunked peak memory independent of file size ({chunk_1x:.0f}MB -> {chunk_4x:.0f}MB for 4x rows; "
+               f"in-memory {memory_1x:.0f}MB -> {memory_4x:.0f}MB)")
+
+
+def check_hourly_cube():
+    print("[INFO] Hourly demand cube and intraday forecast...")
+    _, items_summary = gen_v2.load_items_summary()
+    sales = gen_v2.generate_sales(gen_v2.date_range, items_summary, np.random.default_rng(42))
+
+    cube, t_cube = timed(HourlyCube.from_sales, sales)
+    expected = sales.groupby([sales['date'], 'hour', 'item_type']).agg(
+        orders=('qty_sold', 'size'), qty=('qty_sold', 'sum'), revenue=('revenue', 'sum'))
+    cells = cube.to_frame('orders').set_index(['date', 'hour', 'category'])
+    d = (expected.index.get_level_values(0) - cube.start).days
+    h = expected.index.get_level_values(1)
+    c = pd.Index(cube.categories).get_indexer(expected.index.get_level_values(2))
+    same = len(cells) == len(expected) and (cube.orders[d, h, c] == expected['orders'].values).all() \
+        and (cube.qty[d, h, c] == expected['qty'].values).all() and np.allclose(cube.revenue[d, h, c], expected['revenue'].values)
+    report(same and cube.orders.sum() == len(sales), f"Cube matches groupby(date, hour, item_type) ({t_cube * 1000:.0f}ms)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'ventas.csv')
+        sales.to_csv(csv_path, index=False)
+        chunked = HourlyCube.from_file(csv_path, chunksize=5000)
+    order = pd.Index(chunked.categories).get_indexer(cube.categories)
+    report(chunked.start == cube.start and np.array_equal(chunked.orders[:, :, order], cube.orders)
+           and np.array_equal(chunked.qty[:, :, order], cube.qty), "Cube built from CSV chunks matches in-memory cube")
+
+    start = cube.dates[-1] - pd.Timedelta(days=6)
+    forecast, t_week = timed(forecast_intraday, cube, start, 7)
+    report(t_week < 1.0 and len(forecast) == 7 * (PERIOD_OF_HOUR >= 0).sum(),
+           f"Per-hour forecast for a week in {t_week * 1000:.1f}ms")
+
+    scores = intraday_backtest(cube, cube.dates[-1] - pd.Timedelta(weeks=26), 24)
+    report((scores['mae_model'] < scores['mae_naive']).all(),
+           "Intraday model beats same-day-last-week on every service period (MAPE "
+           + ", ".join(f"{p} {m:.0%}" for p, m in scores['mape_model'].items()) + ")")
+
+
+def check_metrics_engine():
+    print("[INFO] Historical analysis: factorized single pass vs per-metric groupbys...")
+
+    def same_metrics(a, b):
+        for name, expected in vars(b).items():
+            got = getattr(a, name)
+            try:
+                if isinstance(expected, pd.Series):
+                    pd.testing.assert_series_equal(got, expected, check_freq=False)
+                elif isinstance(expected, pd.DataFrame):
+                    pd.testing.assert_frame_equal(got, expected)
+                elif got != expected:
+                    return False
+            except AssertionError:
+                return False
+        return True
+
+    df = analysis.load_sales()
+    report(same_metrics(analysis.compute_metrics(df), analysis.compute_metrics_multipass(df)),
+           "Single-pass metrics identical to the original report")
+
+    # 10x data: every order copied 10 times under new ids
+    big = pd.concat([df.assign(order_id=df['order_id'] + f'-{k}') for k in range(10)], ignore_index=True)
+    fast, t_fast = timed(analysis.compute_metrics, big)
+    slow, t_slow = timed(analysis.compute_metrics_multipass, big)
+    report(same_metrics(fast, slow), f"10x data ({len(big):,} rows): metrics identical")
+    report(t_fast * 2 < t_slow, f"10x data: single pass {t_fast:.2f}s vs multipass {t_slow:.2f}s ({t_slow / t_fast:.1f}x)")
+
+
+def synthetic_baskets(n_orders, n_items, rng):
+    """Order lines with 1-5 items per order and planted pairs (item 2k -> 2k+1 half the time)"""
+    sizes = rng.integers(1, 6, n_orders)
+    order_id = np.repeat(np.arange(n_orders), sizes)
+    weights = 1.0 / np.arange(1, n_items + 1)
+    item = rng.choice(n_items, size=len(order_id), p=weights / weights.sum())
+    companion = np.where((item % 2 == 0) & (rng.random(len(item)) < 0.5), item + 1, -1)
+    extra = companion >= 0
+    order_id = np.concatenate([order_id, order_id[extra]])
+    item = np.concatenate([item, companion[extra]])
+    return pd.DataFrame({'order_id': order_id, 'item_name': np.char.add('item_', item.astype(str))})
+
+
+def check_market_basket():
+    print("[INFO] Market basket: sparse co-occurrence vs brute-force self-join...")
+    rng = np.random.default_rng(7)
+    lines = synthetic_baskets(20000, 30, rng)
+    result = market_basket.basket_analysis(lines, min_support=0.002, top=10 ** 6)
+
+    baskets = lines.drop_duplicates()
+    joined = baskets.merge(baskets, on='order_id')
+    joined = joined[joined['item_name_x'] < joined['item_name_y']]
+    brute = joined.groupby(['item_name_x', 'item_name_y']).size()
+    brute = brute[brute >= 0.002 * baskets['order_id'].nunique()]
+    got = result['pairs'].assign(key=lambda p: [tuple(sorted(k)) for k in zip(p['item_a'], p['item_b'])]).set_index('key')['orders']
+    report(len(got) == len(brute) and all(got[k] == n for k, n in brute.items()), f"Pair counts match the self-join ({len(brute)} pairs)")
+
+    triple = joined.merge(baskets, on='order_id')
+    triple = triple[triple['item_name_y'] < triple['item_name']].groupby(['item_name_x', 'item_name_y', 'item_name']).size()
+    triple = triple[triple >= 0.002 * baskets['order_id'].nunique()]
+    got = result['triples'].assign(key=lambda t: [tuple(sorted(k)) for k in zip(t['item_a'], t['item_b'], t['item_c'])]).set_index('key')['orders']
+    report(len(got) == len(triple) and all(got[k] == n for k, n in triple.items()), f"Triple counts match the self-join ({len(triple)} triples)")
+
+    top = result['pairs'].iloc[0]
+    report({top['item_a'], top['item_b']} in [{f'item_{2 * k}', f'item_{2 * k + 1}'} for k in range(15)],
+           f"Planted pair ranks first by lift ({top['item_a']} + {top['item_b']}, lift {top['lift']:.1f})")
+
+    big = synthetic_baskets(1000000, 200, rng)
+    _, t_big = timed(market_basket.basket_analysis, big, 0.0005)
+    report(t_big < 10, f"{len(big):,} order lines analysed in {t_big:.1f}s")
+
+
+def check_slot_index():
+    print("[INFO] Peak-hours slot index vs groupby on the filtered history...")
+    df = analysis.load_sales()
+    index, t_build = timed(SlotIndex, df)
+    minutes = df['order_time'].str[:2].astype(int) * 60 + df['order_time'].str[3:5].astype(int)
+    df = df.assign(weekday=df['order_date'].dt.dayofweek, slot=minutes // 15, hour=minutes // 60)
+
+    def groupby_heatmap(start, end, categories, measure, hourly):
+        f = df[(df['order_date'] >= start) & (df['order_date'] <= end) & df['item_type'].isin(categories)]
+        agg = {'orders': ('order_id', 'nunique'), 'items': ('quantity', 'sum'), 'revenue': ('total_line_price', 'sum')}[measure]
+        return f.groupby(['weekday', 'hour' if hourly else 'slot']).agg(value=agg)['value'].unstack(fill_value=0)
+
+    rng = np.random.default_rng(11)
+    categories = index.categories
+    ok = True
+    t_index = t_groupby = 0.0
+    for k in range(6):
+        first = pd.Timestamp('2023-01-01') + pd.Timedelta(days=int(rng.integers(0, 700)))
+        start, end = first, first + pd.Timedelta(days=int(rng.integers(7, 365)))
+        selected = list(rng.choice(categories, size=int(rng.integers(1, len(categories) + 1)), replace=False))
+        measure, hourly = ['orders', 'items', 'revenue'][k % 3], k % 2 == 0
+        got, t = timed(index.heatmap, start, end, selected, measure, hourly=hourly)
+        t_index += t
+        expected, t = timed(groupby_heatmap, start, end, selected, measure, hourly)
+        t_groupby += t
+        slots = [int(c[:2]) if hourly else (int(c[:2]) * 60 + int(c[3:])) // 15 for c in got.columns]
+        got = pd.DataFrame(got.values, columns=slots).reindex(index=expected.index, columns=expected.columns)
+        ok &= np.allclose(got.values, expected.values)
+    report(ok, "Weekday x slot orders/items/revenue match groupby for random date/category filters")
+    report(t_index < t_groupby, f"Filter change: index {t_index / 6 * 1000:.1f}ms vs groupby {t_groupby / 6 * 1000:.1f}ms "
+                                f"(one-off build {t_build * 1000:.0f}ms)")
+
+
+def check_staff_scheduler():
+    print("[INFO] Staff scheduler: MILP vs brute force, coverage and solve time...")
+    daily = pd.read_csv('dataset_ml_diario.csv', parse_dates=['date']).tail(7)
+    items = scheduler.period_demand(daily['date'], daily['qty_sold'].values)
+    staff, t_week = timed(lambda: scheduler.optimize_schedule(items)[0])
+    report(t_week < 1, f"7-day schedule solved in {t_week * 1000:.0f}ms")
+
+    covers = scheduler.SHIFT_COVERS[:, scheduler.OPEN_HOURS]          # (shifts, open hours)
+    on_duty = staff @ covers                                          # (days, roles, open hours)
+    capacity = np.array([ops.ROLES[r]['capacity'] for r in scheduler.SCHEDULED_ROLES])
+    needed = items[:, scheduler.PERIOD_OF_HOUR[scheduler.OPEN_HOURS]][:, None, :] / capacity[None, :, None]
+    report((on_duty >= np.maximum(needed, 1) - 1e-9).all(), "Every open hour covered for every role")
+
+    # Brute force over every shift combination of each (day, role)
+    rate = np.array([ops.ROLES[r]['cost'] for r in scheduler.SCHEDULED_ROLES])
+    grid = np.array(np.meshgrid(*[np.arange(8)] * covers.shape[0], indexing='ij')).reshape(covers.shape[0], -1).T
+    best_cost = 0
+    for d in range(len(items)):
+        for r in range(len(rate)):
+            feasible = ((grid @ covers) >= np.maximum(needed[d, r], 1) - 1e-9).all(axis=1)
+            best_cost += grid[feasible].sum(axis=1).min() * rate[r]
+    milp_cost = (staff.sum(axis=2) * rate).sum()
+    report(milp_cost == best_cost, f"MILP cost equals the brute-force optimum (${milp_cost * ops.SHIFT_HOURS:,.0f})")
+
+    rrhh = pd.read_csv('rrhh_turnos.csv', parse_dates=['date'])
+    actual = rrhh[rrhh['date'].isin(daily['date']) & (rrhh['role'] != 'Admin')]['total_pay'].sum()
+    print(f"[INFO] Optimal week ${milp_cost * ops.SHIFT_HOURS:,.0f} vs generated shifts ${actual:,.0f}")
+
+    year = pd.read_csv('dataset_ml_diario.csv', parse_dates=['date']).tail(364)
+    _, t_year = timed(scheduler.optimize_schedule, scheduler.period_demand(year['date'], year['qty_sold'].values))
+    report(t_year < 5, f"52-week schedule solved in {t_year:.2f}s")
+
+
+def check_labor_cube():
+    print("[INFO] Labor cube: slices vs merge/groupby on rrhh_turnos x daily sales...")
+    rrhh = pd.read_csv('rrhh_turnos.csv', parse_dates=['date'])
+    sales = pd.read_csv('ventas_sinteticas_3anos.csv', usecols=['date', 'revenue', 'qty_sold'], parse_dates=['date'])
+    cube, t_build = timed(LaborCube.from_frames, rrhh, sales)
+    daily = sales.groupby('date')[['revenue', 'qty_sold']].sum()
+
+    def reference(start, end, roles, shift_types, by):
+        shifts = rrhh[(rrhh['date'] >= start) & (rrhh['date'] <= end)
+                      & rrhh['role'].isin(roles) & rrhh['shift_type'].isin(shift_types)]
+        days = daily[(daily.index >= start) & (daily.index <= end)]
+        if by == 'weekday':
+            labor = shifts.groupby(shifts['date'].dt.dayofweek)[['hours_worked', 'total_pay']].sum()
+            out = days.groupby(days.index.dayofweek).sum().join(labor)
+        else:
+            labor = shifts.groupby(['role', 'date'])[['hours_worked', 'total_pay']].sum().reset_index()
+            out = labor.merge(days, left_on='date', right_index=True).groupby('role').sum(numeric_only=True)
+        out = out.dropna(subset=['hours_worked'])
+        return pd.DataFrame({'revenue_per_hour': out['revenue'] / out['hours_worked'],
+                             'labor_cost_pct': out['total_pay'] / out['revenue']}).values
+
+    rng = np.random.default_rng(5)
+    ok = True
+    t_cube = t_ref = 0.0
+    for k in range(6):
+        start = pd.Timestamp('2023-01-01') + pd.Timedelta(days=int(rng.integers(0, 700)))
+        end = start + pd.Timedelta(days=int(rng.integers(30, 365)))
+        roles = list(rng.choice(cube.roles, size=int(rng.integers(1, len(cube.roles) + 1)), replace=False))
+        shift_types = list(rng.choice(cube.shift_types, size=int(rng.integers(1, len(cube.shift_types) + 1)), replace=False))
+        by = ['weekday', 'role'][k % 2]
+        got, t = timed(cube.summary, by, start, end, roles=roles, shift_types=shift_types)
+        t_cube += t
+        expected, t = timed(reference, start, end, roles, shift_types, by)
+        t_ref += t
+        got = got.dropna(subset=['revenue_per_hour'])[['revenue_per_hour', 'labor_cost_pct']].values
+        ok &= got.shape == expected.shape and np.allclose(got, expected)
+    report(ok, "Revenue per labor-hour and labor cost % match merge/groupby for random slices")
+    report(t_cube < t_ref, f"Slice: cube {t_cube / 6 * 1000:.1f}ms vs merge/groupby {t_ref / 6 * 1000:.1f}ms "
+                           f"(one-off build {t_build * 1000:.0f}ms)")
+
+    # Planted outliers: five times the shifts of a few days -> over-staffed
+    planted = cube.daily().query('hours > 0').index[[200, 400, 600]]
+    rrhh_over = pd.concat([rrhh] + [rrhh[rrhh['date'].isin(planted)]] * 4, ignore_index=True)
+    flagged = LaborCube.from_frames(rrhh_over, sales).outlier_days()
+    report(all(d in flagged.index and flagged.loc[d, 'status'] == 'sobre-dotado' for d in planted),
+           f"Planted over-staffed days flagged ({len(flagged)} outlier days in total)")
+
+
+def check_occupancy():
+    print("[INFO] Table occupancy: sweep line vs per-reservation loops, booking queries...")
+    reservations = pd.read_csv('reservas.csv')
+    walk_ins = occupancy.walk_in_parties(pd.read_csv('dataset_ml_diario.csv'))
+    model, t_build = timed(occupancy.OccupancyModel, reservations, walk_ins)
+    report(t_build < 2, f"{len(model.dates)} days x {model.n_slots} slots simulated in {t_build * 1000:.0f}ms "
+                        f"({len(model.overbooked_slots())} overbooked slots)")
+
+    # Reference occupancy for a sample of days: loop over the day's reservations
+    plain = occupancy.OccupancyModel(reservations)
+    held = reservations[reservations['status'].isin(occupancy.HELD_STATUSES)]
+    ok = True
+    for date, day_res in list(held.groupby('date'))[::40]:
+        expected = np.zeros_like(plain.parties[0])
+        for t, pax in zip(occupancy.to_minutes(day_res['time']), day_res['pax']):
+            slot = (t - occupancy.OPEN_MINUTE) // plain.slot_minutes
+            expected[slot:slot + plain.dwell_slots, plain.table_class(pax)] += 1
+        ok &= np.array_equal(plain.parties[(pd.Timestamp(date) - plain.start).days], expected)
+    report(ok, "Seated parties per slot match a per-reservation loop")
+
+    rng = np.random.default_rng(3)
+    dates = pd.to_datetime(held['date'].unique())
+    queries = [(dates[rng.integers(len(dates))], f"{rng.choice([13, 14, 19, 20, 21, 22, 23])}:00", int(rng.choice([2, 4, 6, 8, 10])))
+               for _ in range(300)]
+    answers, t_query = timed(lambda: [plain.can_accept(*q) for q in queries])
+    expected, t_ref = timed(lambda: [occupancy.can_accept_per_row(reservations, *q) for q in queries])
+    report(answers == expected, f"can_accept matches minute-by-minute checks ({sum(answers)}/{len(queries)} accepted)")
+    report(t_query < t_ref, f"Query {t_query / len(queries) * 1e6:.0f}us vs rebuild {t_ref / len(queries) * 1000:.1f}ms")
+
+    date, time_, pax = queries[0]
+    booked = occupancy.OccupancyModel(reservations)
+    booked.book(date, time_, pax)
+    extra = pd.DataFrame([{'reservation_id': 'RES-X', 'date': str(date.date()), 'time': time_, 'pax': pax,
+                           'customer_name': 'Cliente X', 'status': 'Show', 'channel': 'Web'}])
+    rebuilt = occupancy.OccupancyModel(pd.concat([reservations, extra], ignore_index=True))
+    report(np.array_equal(booked.free_window, rebuilt.free_window), "book() updates the day like a full rebuild")
+
+    # Bookings outside the history extend it with empty days instead of wrapping around / failing
+    last = booked.parties[-1].copy()
+    before, after = plain.start - pd.Timedelta(days=365), plain.dates[-1] + pd.Timedelta(days=30)
+    outside = pd.DataFrame([{'reservation_id': f'RES-OUT{i}', 'date': str(d.date()), 'time': '21:00', 'pax': 4,
+                           'customer_name': 'Cliente X', 'status': 'Show', 'channel': 'Web'}
+                          for i, d in enumerate([before, after])])
+    accepted = [booked.can_accept(d, '21:00', 4) for d in (before, after)]
+    for d in (before, after):
+        booked.book(d, '21:00', 4)
+    rebuilt = occupancy.OccupancyModel(pd.concat([reservations, extra, outside], ignore_index=True))
+    report(all(accepted) and np.array_equal(booked.parties[-31], last) and booked.dates.equals(rebuilt.dates)
+           and np.array_equal(booked.parties, rebuilt.parties) and np.array_equal(booked.free_window, rebuilt.free_window),
+           f"Out-of-range bookings extend the history ({booked.dates[0].date()} .. {booked.dates[-1].date()}) like a rebuild")
+
+
+def check_noshow_model():
+    print("[INFO] No-show scoring: per-reservation cache, expected pax...")
+    reservations = pd.read_csv('reservas.csv')
+    history, upcoming = noshow_model.upcoming_split(reservations, 30)
+    model = noshow_model.NoShowModel().fit(history)
+    p = model.predict(noshow_model.reservation_features(upcoming))
+    report(((p > 0) & (p < 1)).all(), f"Model fit on {len(history):,} reservations (base no-show rate {model.base_rate:.1%})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'scores.pkl')
+        scorer = noshow_model.NoShowScorer(path)
+        scores, t_first = timed(scorer.score, upcoming, model)
+        report(scorer.last_rescored == len(upcoming) and np.allclose(scores.values, p),
+               f"First batch: {len(upcoming)} reservations scored in {t_first * 1000:.1f}ms, equal to predict()")
+
+        # Edit one booking and add a new one: only those two go to the model (after a reload from disk)
+        edited = upcoming.copy()
+        edited.iloc[0, edited.columns.get_loc('pax')] += 2
+        extra = edited.iloc[[1]].assign(reservation_id='RES-NEW', channel='Phone')
+        edited = pd.concat([edited, extra], ignore_index=True)
+        scorer = noshow_model.NoShowScorer(path)
+        scores = scorer.score(edited, model)
+        fresh = model.predict(noshow_model.reservation_features(edited))
+        report(scorer.last_rescored == 2 and np.allclose(scores.values, fresh),
+               f"Reload + edit: {scorer.last_rescored} of {len(edited)} rescored, scores equal a fresh batch")
+        scorer.score(edited, model)
+        report(scorer.last_rescored == 0, "Unchanged batch: nothing rescored")
+
+        retrained = noshow_model.NoShowModel(C=0.1).fit(history)
+        scorer.score(edited, retrained)
+        report(scorer.last_rescored == len(edited), "Retrained model invalidates the cache")
+
+    # Row-by-row scoring for the timing baseline
+    features = noshow_model.reservation_features(upcoming)
+    _, t_batch = timed(model.predict, features)
+    per_row, t_rows = timed(lambda: [model.predict(features.iloc[[i]])[0] for i in range(len(features))])
+    report(np.allclose(per_row, p) and t_batch < t_rows,
+           f"Batch {t_batch * 1000:.1f}ms vs row-by-row {t_rows * 1000:.0f}ms")
+
+    scores = pd.Series(p, index=upcoming.index)
+    daily = noshow_model.expected_pax(upcoming, scores)
+    active = upcoming['status'] != 'Cancelled'
+    dates = pd.date_range(pd.to_datetime(upcoming['date']).min(), pd.to_datetime(upcoming['date']).max())
+    by_period = noshow_model.expected_pax_by_period(upcoming, scores, dates)
+    report(daily['booked_pax'].sum() == upcoming.loc[active, 'pax'].sum()
+           and np.isclose(daily['expected_pax'].sum(), (upcoming['pax'] * (1 - scores))[active].sum())
+           and np.isclose(by_period.sum(), daily['expected_pax'].sum()),
+           f"Expected pax {daily['expected_pax'].sum():,.0f} of {daily['booked_pax'].sum():,} booked, consistent per day and period")
+
+
+def check_profiler(n_spans=100000):
+    print("[INFO] Dashboard profiler: spans, trace export, overhead when off...")
+    profiler = Profiler(enabled=True)
+    with profiler.span('view', 'view'):
+        with profiler.span('step', 'step', rows=3):
+            time.sleep(0.002)
+        profiler.instrument(np, 'np', 'figure').ones(3)
+    token = profiler.begin('llm', 'llm')
+    profiler.end(token)
+    table = profiler.table()
+    report(list(table['kind']) == ['view', 'step', 'figure', 'llm'] and table['name'].iloc[2].strip() == 'np.ones'
+           and table['duration_ms'].iloc[1] >= 2 and table['duration_ms'].iloc[0] >= table['duration_ms'].iloc[1:3].sum(),
+           f"Nested spans recorded ({len(table)}), instrumented module calls timed as 'np.ones'")
+    profiler.record_memory(frame=pd.DataFrame({'a': np.arange(1000), 'b': ['x'] * 1000}))
+    trace = json.loads(json.dumps(profiler.trace()))
+    events = trace['traceEvents']
+    report(all(e['ph'] == 'X' and e['dur'] >= 0 for e in events) and events[1]['args'] == {'rows': '3'}
+           and trace['otherData']['frame_memory_bytes']['frame'] > 8000,
+           f"Chrome trace export: {len(events)} events + frame memory")
+
+    off = Profiler(enabled=False)
+    report(off.instrument(np, 'np') is np and off.begin('x') is None and off.table().empty, "Disabled: modules untouched, nothing recorded")
+
+    def spans():
+        for _ in range(n_spans):
+            with off.span('x', 'step'):
+                pass
+    _, t_off = timed(spans)
+    report(t_off / n_spans < 2e-6, f"Disabled span overhead {t_off / n_spans * 1e9:.0f}ns per span")
+
+
+def check_benchmark():
+    print("[INFO] Benchmark suite: measurement, in-process targets, baseline comparison...")
+    stats = benchmark.measure(lambda: np.ones(2_000_000), repeat=2)
+    report(len(stats['runs']) == 2 and 15 < stats['peak_mb'] < 20,
+           f"measure(): best of {len(stats['runs'])} runs, tracemalloc peak {stats['peak_mb']:.1f} MB for a 16 MB array")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = benchmark.run_scale(1, '.', repeat=1, generators=False)
+    targets = [r['target'] for r in results]
+    report(targets == ['load_data', 'train_model', 'forecast_week', 'menu_matrix', 'get_dashboard_context', 'prepare_features'],
+           f"In-process targets run on the project data ({sum(r['seconds'] for r in results):.2f}s total)")
+
+    base = {'results': [
+        {'scale': 1, 'target': 'steady', 'seconds': 1.0, 'peak_mb': 100.0},
+        {'scale': 1, 'target': 'slowed', 'seconds': 1.0, 'peak_mb': 100.0},
+        {'scale': 1, 'target': 'tiny', 'seconds': 0.01, 'peak_mb': 1.0},
+        {'scale': 1, 'target': 'heavier', 'seconds': 1.0, 'peak_mb': 100.0},
+    ]}
+    current = [
+        {'scale': 1, 'target': 'steady', 'seconds': 1.2, 'peak_mb': 105.0},
+        {'scale': 1, 'target': 'slowed', 'seconds': 2.0, 'peak_mb': 100.0},
+        {'scale': 1, 'target': 'tiny', 'seconds': 0.03, 'peak_mb': 3.0},
+        {'scale': 1, 'target': 'heavier', 'seconds': 1.0, 'peak_mb': 150.0},
+        {'scale': 5, 'target': 'steady', 'seconds': 9.0, 'peak_mb': 900.0},
+    ]
+    status = benchmark.compare(current, base).set_index(['scale', 'target'])['status'].to_dict()
+    report(status == {(1, 'steady'): 'ok', (1, 'slowed'): 'slower', (1, 'tiny'): 'ok',
+                      (1, 'heavier'): 'more memory', (5, 'steady'): 'new'},
+           "Baseline comparison flags slowdowns / memory growth, ignores noise floors and new targets")
+
+
+def check_answer_cache():
+    print("[INFO] Assistant answer cache: hits, near-duplicates, TTL, LRU, invalidation, reload...")
+    question = "¿Cuánto vendimos de pizza pepperoni en diciembre 2024 los fines de semana?"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.json')
+        data_path = os.path.join(tmp, 'ventas.csv')
+        with open(data_path, 'w') as f:
+            f.write("date,revenue\n2024-12-01,1000\n")
+        version = compute_data_version([data_path])
+
+        cache = AnswerCache(path)
+        report(cache.get(question, version) is None and not os.path.exists(path), "Miss does not write the cache file")
+        cache.put(question, version, "A1")
+        report(cache.get("cuanto vendimos de PIZZA pepperoni en diciembre 2024 los fines de semana", version) == "A1",
+               "Exact hit after normalization (case, accents, punctuation)")
+        reworded = "Dime por favor: los fines de semana de diciembre 2024, ¿cuánto vendimos de pizza pepperoni?"
+        report(cache.get(reworded, version) is None and cache.get(reworded, version, fuzzy=True) == "A1",
+               "Reworded question (stopwords, word order) hits only with fuzzy matching")
+        other_year = question.replace("2024", "2025")
+        cache.put("¿Cuántas mermas de hamburguesa clásica hubo en enero 2025?", version, "A2")
+        saved, mtime = dict(cache.stats), os.stat(path).st_mtime_ns
+        report(cache.get(other_year, version, fuzzy=True) is None
+               and cache.get("¿Cuántas mermas de pizza clásica hubo en enero 2025?", version, fuzzy=True) is None,
+               "Different year / dish is a miss even with fuzzy matching")
+        cache.get(question, version)
+        reloaded = AnswerCache(path)
+        report(os.stat(path).st_mtime_ns == mtime and reloaded.stats == saved != cache.stats,
+               "get() keeps hit/miss stats in memory; the file is written by put() only")
+        report(reloaded.get(question, version) == "A1" and reloaded.get(reworded, version, fuzzy=True) == "A1",
+               f"Reload from disk keeps answers and the near-duplicate index ({len(reloaded.entries)} entries)")
+
+        with open(data_path, 'a') as f:
+            f.write("2024-12-02,2000\n")
+        new_version = compute_data_version([data_path])
+        report(new_version != version and cache.get(question, new_version, fuzzy=True) is None,
+               "Regenerated data changes the version and invalidates answers")
+
+        lru = AnswerCache(os.path.join(tmp, 'lru.json'), max_entries=3)
+        for i in range(3):
+            lru.put(f"ventas del local {i}", version, f"L{i}")
+            time.sleep(0.002)
+        lru.get("ventas del local 0", version)
+        lru.put("ventas del local 3", version, "L3")
+        report(len(lru.entries) == 3 and lru.get("ventas del local 1", version) is None
+               and lru.get("ventas del local 0", version) == "L0",
+               "LRU evicts the least recently used entry at max_entries")
+
+        expiring = AnswerCache(os.path.join(tmp, 'ttl.json'), ttl_seconds=60)
+        expiring.put(question, version, "A1")
+        for entry in expiring.entries.values():
+            entry['created'] -= 61
+        report(expiring.get(question, version, fuzzy=True) is None and not expiring.entries,
+               "Entries older than the TTL expire")
+
+
+def check_load_test_data(branches=2, years=0.25):
+    print(f"[INFO] Load-test dataset: {branches} branches x {years:g} years, layout, manifest, seeds...")
+    expected = {'ventas_sinteticas_3anos.csv', 'mermas.csv', 'rrhh_turnos.csv', 'reviews_clientes.csv',
+                'reservas.csv', 'compras.csv', 'dataset_ml_diario.csv'} | set(load_test.SHARED_FILES)
+    with tempfile.TemporaryDirectory() as tmp:
+        (out_dir, manifest), t_build = timed(load_test.build_load_test_dataset, branches, years, seed=5,
+                                             root=os.path.join(tmp, 'a'), batch_size=5000)
+        rerun_dir, _ = load_test.build_load_test_dataset(branches, years, seed=5, root=os.path.join(tmp, 'b'),
+                                                         batch_size=5000)
+        branch_ids = [f"B{b + 1:02d}" for b in range(branches)]
+        report([b['branch_id'] for b in manifest['branches']] == branch_ids,
+               f"{branches} branches built in {t_build:.1f}s ({sum(manifest['total_rows'].values()):,} rows)")
+
+        def branch_file(root, branch_id, name):
+            return os.path.join(root, f"branch={branch_id}", name)
+
+        report(all(expected <= set(os.listdir(os.path.join(out_dir, f"branch={b}"))) for b in branch_ids),
+               "Each branch=BNN directory has the project root's data file names")
+
+        counts_ok = all(len(pd.read_csv(branch_file(out_dir, b['branch_id'], name))) == n
+                        for b in manifest['branches'] for name, n in b['rows'].items())
+        totals_ok = all(manifest['total_rows'][name] == sum(b['rows'][name] for b in manifest['branches'])
+                        for name in manifest['total_rows'])
+        report(counts_ok and totals_ok and set(manifest['total_rows']) == expected - set(load_test.SHARED_FILES),
+               "manifest.json row counts match the files")
+
+        def read(root, branch_id, name):
+            with open(branch_file(root, branch_id, name), 'rb') as f:
+                return f.read()
+        sales = 'ventas_sinteticas_3anos.csv'
+        report(read(out_dir, 'B01', sales) != read(out_dir, 'B02', sales), "Branches get different seeds (B01 != B02 sales)")
+        report(all(read(out_dir, b, name) == read(rerun_dir, b, name)
+                   for b in branch_ids for name in expected - set(load_test.SHARED_FILES)),
+               "Rerun with the same seed is byte-identical")
+
+
+if __name__ == '__main__':
+    check_sales_generator()
+    check_promo_engine()
+    check_mermas()
+    check_sharded_generation()
+    check_streaming_writer()
+    check_load_test_data()
+    check_operations_generator()
+    check_bom_consumption()
+    check_ingredient_catalog()
+    check_inventory_simulation()
+    check_purchase_suggestions()
+    check_payables_ledger()
+    check_feature_store()
+    check_chunked_aggregation()
+    check_hourly_cube()
+    check_metrics_engine()
+    check_market_basket()
+    check_slot_index()
+    check_staff_scheduler()
+    check_labor_cube()
+    check_occupancy()
+    check_noshow_model()
+    check_profiler()
+    check_benchmark()
+    check_answer_cache()
+
+    if FAILURES:
+        print(f"[ERROR] {len(FAILURES)} check(s) failed.")
+        sys.exit(1)
+    print("[SUCCESS] All checks passed.")